@@ -0,0 +1,51 @@
+"""
+Compares peak memory and time of reverse() on an unrolled time-stepping loop against checkpoint_reverse() with
+different snapshot budgets. Run from the repository root with:
+
+    python benchmarks/bench_checkpoint.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import reverse, checkpoint_reverse, sin
+
+
+def step(s):
+    return [s[0] + 0.01 * s[1], s[1] - 0.01 * sin(s[0])]
+
+
+def loss(s):
+    return s[0] * s[1]
+
+
+def unrolled(x, n):
+    for _ in range(n):
+        x = step(x)
+    return loss(x)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+if __name__ == "__main__":
+    n = 20_000
+    print(f"{n} steps")
+    print(f"{'mode':>24} {'peak bytes':>12} {'time (s)':>9} {'overhead':>9}")
+    peak, elapsed = measure(lambda: reverse(lambda x: unrolled(x, n), [1.0, 0.5]))
+    print(f"{'reverse() unrolled':>24} {peak:>12} {elapsed:>9.3f} {0.0:>9.2f}")
+    for snapshots in (None, 50, 10):
+        reports = []
+        peak, elapsed = measure(lambda: reports.append(checkpoint_reverse(step, loss, [1.0, 0.5], n, snapshots)[2]))
+        label = f"checkpoint, {reports[0]['snapshots']} snapshots"
+        print(f"{label:>24} {peak:>12} {elapsed:>9.3f} {reports[0]['overhead']:>9.2f}")
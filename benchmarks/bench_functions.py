@@ -0,0 +1,42 @@
+"""
+Times each elementary function on a Node with a scalar value: the value and derivative kernel run on the math module
+(what the functions use for scalars), the same kernel run through NumPy's scalar dispatch, and the whole function call
+including the new Node. Run from the repository root with:
+
+    python benchmarks/bench_functions.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import functions
+from autodiff_package.node import Node
+
+# Each function with a value inside its domain, and its other arguments
+VALUES = {'sin': (0.7,), 'cos': (0.7,), 'tan': (0.7,), 'exp': (0.7,), 'log': (0.7,), 'logbase': (0.7, 2.0),
+          'logistic': (0.7,), 'arcsin': (0.7,), 'arccos': (0.7,), 'arctan': (0.7,), 'sinh': (0.7,),
+          'cosh': (0.7,), 'tanh': (0.7,), 'sqrt': (0.7,)}
+
+# Functions that run the kernel of another, with their result scaled (logbase is log divided by the log of the base)
+KERNELS = {'logbase': 'log'}
+
+
+def per_call(statement, number=100_000):
+    return min(timeit.repeat(statement, number=number, repeat=3)) / number * 1e9
+
+
+if __name__ == "__main__":
+    print(f"{'function':>9} {'math kernel (ns)':>17} {'numpy kernel (ns)':>18} {'Node call (ns)':>15}")
+    for name, (value, *args) in VALUES.items():
+        kernel = getattr(functions, '_' + KERNELS.get(name, name))
+        function = getattr(functions, name)
+        node = Node(value)
+        scalar = np.float64(value)
+        fast = per_call(lambda: kernel(value, functions._MATH))
+        slow = per_call(lambda: kernel(scalar, np))
+        call = per_call(lambda: function(node, *args))
+        print(f"{name:>9} {fast:>17.0f} {slow:>18.0f} {call:>15.0f}")
@@ -0,0 +1,41 @@
+"""
+Measures the time taken to import autodiff_package in a new interpreter, and to differentiate a first scalar function.
+
+Each measurement starts a fresh interpreter, as a short-lived worker would, and reports the best of several runs
+of python -X importtime, along with the time to import NumPy on its own for comparison.
+
+Run from the repository root with:
+
+    python benchmarks/bench_import.py
+"""
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+CASES = [('import numpy', 'import numpy', 'numpy'),
+         ('import autodiff_package', 'import autodiff_package', 'autodiff_package'),
+         ('first reverse()', 'import autodiff_package as ad; ad.reverse(lambda x: ad.sin(x[0]) * x[1], [1.0, 2.0])', None)]
+
+
+def cumulative(code, module):
+    """The cumulative import time of module in microseconds, or the whole run's wall time when module is None"""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    if module is None:
+        code = f"import time; start = time.perf_counter(); {code}; print(int(1e6 * (time.perf_counter() - start)))"
+        return int(subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout)
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env,
+                            capture_output=True, text=True, check=True).stderr
+    for line in stderr.splitlines():
+        if line.split('|')[-1].strip() == module:
+            return int(line.split('|')[1])
+
+def best_of(repeat, code, module):
+    return min(cumulative(code, module) for _ in range(repeat))
+
+
+if __name__ == "__main__":
+    print(f"{'':>24} {'ms':>8}")
+    for name, code, module in CASES:
+        print(f"{name:>24} {best_of(5, code, module) / 1000:8.1f}")
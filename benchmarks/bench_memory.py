@@ -0,0 +1,65 @@
+"""
+Measures the memory held by a recorded graph, in bytes per operation, using tracemalloc.
+
+Each case builds a graph of a few hundred thousand operations, keeps it alive, and reports
+the traced memory of the live graph and the untraced time taken to build it.
+
+Run from the repository root with:
+
+    python benchmarks/bench_memory.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import sin
+from autodiff_package.node import Node
+
+
+def binary_chain(x, n):
+    """n multiplications and n additions, each with two Node parents"""
+    y = x
+    for _ in range(n):
+        y = y * x + y
+    return y
+
+def unary_chain(x, n):
+    """n calls to an elementary function, each with one Node parent"""
+    y = x
+    for _ in range(n):
+        y = sin(y)
+    return y
+
+def constant_chain(x, n):
+    """n operations combining a Node with a constant"""
+    y = x
+    for _ in range(n):
+        y = 0.5 * y + 1.0
+    return y / 2
+
+
+CASES = [('binary', binary_chain, 2), ('unary', unary_chain, 1), ('constant', constant_chain, 2)]
+
+def measure(build, ops_per_step, steps=200_000):
+    start = time.perf_counter()
+    graph = build(Node(0.5), steps)
+    elapsed = time.perf_counter() - start
+    del graph
+
+    tracemalloc.start()
+    graph = build(Node(0.5), steps)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del graph
+    ops = ops_per_step * steps
+    return current / ops, peak / ops, elapsed
+
+
+if __name__ == "__main__":
+    print(f"{'graph':>10} {'bytes/op':>10} {'peak bytes/op':>14} {'build (s)':>10}")
+    for name, build, ops_per_step in CASES:
+        per_op, peak_per_op, elapsed = measure(build, ops_per_step)
+        print(f"{name:>10} {per_op:10.1f} {peak_per_op:14.1f} {elapsed:10.3f}")
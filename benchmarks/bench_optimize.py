@@ -0,0 +1,57 @@
+"""
+Reports the number of tape entries before and after optimize(), and the time to replay and sweep each tape.
+
+Run from the repository root with:
+
+    python benchmarks/bench_optimize.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import record, sin, cos, exp, log, sqrt
+from autodiff_package.optimization import optimize
+from autodiff_package.node import Node
+
+
+def repeated_terms(x):
+    """The same subexpressions written out several times, as in hand-expanded formulas"""
+    return [sin(x[0]) * x[1] + sin(x[0]) * x[1] * cos(x[2]) + exp(sin(x[0]) * x[1]),
+            cos(x[2]) * sin(x[0]) * x[1] - sqrt(x[1] * x[1] + x[2] * x[2])]
+
+def pairwise_energy(x, n=12):
+    """A sum over pairs that recomputes each distance for the energy and for a penalty term"""
+    total = 0
+    for i in range(n):
+        for j in range(i + 1, n):
+            total = total + 1 / sqrt((x[i] - x[j]) ** 2 + 1) + log((x[i] - x[j]) ** 2 + 1) * 0.1
+    return total
+
+WEIGHTS = [Node(0.5 + 0.1 * i, 0) for i in range(20)]
+
+def scaled_features(x, n=20):
+    """Fixed model weights held in Nodes, so operations on them alone are recorded and can be folded"""
+    return sum(exp(x[i] * (WEIGHTS[i] * WEIGHTS[i]) / sqrt(WEIGHTS[i] + 1)) * log(WEIGHTS[i] + 2) for i in range(n))
+
+
+def best_of(fn, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    print(f"{'model':>18} {'before':>7} {'after':>6} {'folded':>7} {'merged':>7} {'removed':>8} {'replay before (ms)':>19} {'replay after (ms)':>18}")
+    for fun, n in ((repeated_terms, 3), (pairwise_energy, 12), (scaled_features, 20)):
+        x = [0.1 * (i + 1) for i in range(n)]
+        tape = record(fun, x)
+        optimized, report = optimize(tape)
+        before = best_of(lambda: (tape.forward(x), tape.jacobian())) * 1000
+        after = best_of(lambda: (optimized.forward(x), optimized.jacobian())) * 1000
+        print(f"{fun.__name__:>18} {report['before']:>7} {report['after']:>6} {report['folded']:>7} "
+              f"{report['merged']:>7} {report['removed']:>8} {before:>19.3f} {after:>18.3f}")
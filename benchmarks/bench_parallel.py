@@ -0,0 +1,50 @@
+"""
+Times the rows of a Jacobian split across process pools of increasing size, against a single process.
+
+Each output is a deep chain over every input, so every reverse sweep does the same amount of work. The speedup is only
+near-linear up to the number of cores, and the first column includes pickling the tape once per block. Run from the
+repository root with:
+
+    python benchmarks/bench_parallel.py
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import record, parallel_jacobian, sin
+
+
+def residuals(x, m=64, depth=400):
+    """m outputs, each a chain of depth operations mixing every input"""
+    outputs = []
+    for i in range(m):
+        y = x[i % len(x)]
+        for k in range(depth):
+            y = sin(y) * x[k % len(x)] + 0.5
+        outputs.append(y)
+    return outputs
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    tape = record(residuals, [0.1 * i for i in range(32)])
+    serial = best_of(tape.jacobian)
+    print(f"{len(tape)} entries, {len(tape.outputs)} outputs, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8}")
+    print(f"{'serial':>8} {serial:>9.4f} {1.0:>8.2f}")
+    for workers in (1, 2, 4, 8):
+        with ProcessPoolExecutor(workers) as executor:
+            parallel_jacobian(tape, mode='reverse', executor=executor)
+            elapsed = best_of(lambda: parallel_jacobian(tape, mode='reverse', executor=executor))
+        print(f"{workers:>8} {elapsed:>9.4f} {serial / elapsed:>8.2f}")
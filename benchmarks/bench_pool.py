@@ -0,0 +1,52 @@
+"""
+Compares repeated reverse sweeps with and without a NodePool: the time per call, and the garbage collections run.
+
+Each call records and sweeps a graph of about ten thousand operations. Without a pool the cyclic garbage
+collector is triggered many times while each graph is allocated, and walks the Nodes alive each time. A pool
+reusing Nodes is measured last, as the Node.__new__ it installs stays for the rest of the process.
+
+Run from the repository root with:
+
+    python benchmarks/bench_pool.py
+"""
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import reverse, sin, NodePool
+
+
+def loss(x):
+    y = 0
+    for i in range(2500):
+        y = y + sin(x[0] * i) * x[1]
+    return y
+
+def collections():
+    return sum(generation['collections'] for generation in gc.get_stats())
+
+def best_of(repeat, function):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measure(pool, calls=20):
+    reverse(loss, [0.1, 0.2], pool=pool)
+    gc.collect()
+    start = collections()
+    elapsed = best_of(5, lambda: [reverse(loss, [0.1, 0.2], pool=pool) for _ in range(calls)]) / calls
+    return elapsed, (collections() - start) / (5 * calls)
+
+
+if __name__ == "__main__":
+    print(f"{'':>8} {'ms/call':>10} {'collections/call':>17} {'reused/call':>12}")
+    for name, pool in [('graph', None), ('pool', NodePool()), ('reuse', NodePool(reuse=True))]:
+        elapsed, collected = measure(pool)
+        reused = pool.stats()['last']['reused'] if pool is not None else 0
+        print(f"{name:>8} {1000 * elapsed:10.2f} {collected:17.1f} {reused:12d}")
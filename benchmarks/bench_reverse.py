@@ -0,0 +1,61 @@
+"""
+Benchmarks the reverse mode sweep on deep graphs with heavily shared subexpressions.
+
+Compares the topologically sorted sweep used by reverse() with the per-path recursion it replaced.
+The per-path walk revisits every shared node once per path, so it is only run for small depths.
+
+Run from the repository root with:
+
+    python benchmarks/bench_reverse.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import reverse, sin
+
+
+def shared(depth):
+    """Every level reuses the previous level twice in 4 operations, so there are 4*depth + 1 nodes and 2**depth root-to-leaf paths"""
+    def f(x):
+        y = x
+        for _ in range(depth):
+            y = 0.5 * sin(y * y + y)
+        return y
+    return f
+
+
+def per_path_reverse(f, val):
+    """The recursive per-path sweep reverse() used before the graph was topologically sorted"""
+    from autodiff_package.node import Node
+    x = Node(val, id=0)
+    root_node = f(x)
+    gradients = {}
+
+    def compute_gradients(node, path_value):
+        if node.child:
+            for child_node, loc_grad in node.child:
+                derivative = loc_grad * path_value
+                gradients[child_node] = gradients.get(child_node, 0) + derivative
+                compute_gradients(child_node, derivative)
+
+    compute_gradients(root_node, 1)
+    return root_node.real, gradients.get(x, 0)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10000)
+    print(f"{'depth':>8} {'nodes':>8} {'per-path (s)':>14} {'topological (s)':>16}")
+    for depth in (8, 10, 12, 14, 2000, 4000, 8000):
+        nodes = 4 * depth + 1
+        old = f"{timed(per_path_reverse, shared(depth), 0.5):14.4f}" if depth <= 14 else f"{'-':>14}"
+        new = timed(reverse, shared(depth), 0.5)
+        print(f"{depth:>8} {nodes:>8} {old} {new:16.4f}")
@@ -0,0 +1,62 @@
+"""
+Measures throughput and latency of the gradient server under concurrent load, against calling grad() per request.
+
+Many clients each submit requests one after another for the same function. Without batching, each request is a
+blocking grad() call on the event loop. Run from the repository root with:
+
+    python benchmarks/bench_server.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import grad, sin, exp
+from autodiff_package.server import GradientServer
+
+
+def function(x):
+    return x[0] * sin(x[1]) + exp(x[2] / 4) * x[3] - x[0] * x[2]
+
+
+async def client(submit, requests, latencies):
+    rng = np.random.default_rng(len(latencies))
+    for _ in range(requests):
+        x = list(rng.random(4))
+        start = time.perf_counter()
+        await submit(x)
+        latencies.append(time.perf_counter() - start)
+
+
+async def load(submit, clients, requests):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(submit, requests, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, 1e3 * np.percentile(latencies, 99)
+
+
+async def unbatched(x):
+    # Yields once, as a request arriving over the network would, so requests from different clients interleave
+    await asyncio.sleep(0)
+    return grad(function, x)
+
+
+async def main(clients=1000, requests=10):
+    print(f"{clients} clients x {requests} requests")
+    print(f"{'mode':>22} {'requests/s':>11} {'p99 (ms)':>9}")
+    throughput, p99 = await load(unbatched, clients, requests)
+    print(f"{'grad() per request':>22} {throughput:>11.0f} {p99:>9.2f}")
+    for max_latency in (0.001, 0.005):
+        async with GradientServer(max_batch=512, max_latency=max_latency) as server:
+            server.register('f', function)
+            throughput, p99 = await load(lambda x: server.submit('f', x), clients, requests)
+        print(f"{f'server, {max_latency * 1e3:g} ms window':>22} {throughput:>11.0f} {p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Compares reverse mode on the Node graph and on the array-backed Tape, end to end: evaluating the function, recording
+its graph, and sweeping it, with the best wall time of several runs and the peak memory traced in a separate run.
+
+Run from the repository root with:
+
+    python benchmarks/bench_tape.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import reverse, record, sin, exp
+
+
+def deep(x, n=100_000):
+    """A long chain, where each level holds one or two entries"""
+    y = x[0]
+    for _ in range(n):
+        y = sin(y) * x[1] + 0.5
+    return y
+
+def wide(x, n=65_536):
+    """Many independent terms summed in a balanced tree, so each level holds many entries"""
+    terms = [exp(x[i % 2] * (1 / (i + 1))) for i in range(n)]
+    while len(terms) > 1:
+        terms = [terms[i] + terms[i + 1] for i in range(0, len(terms), 2)]
+    return terms[0]
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def peak(fn):
+    """The peak memory traced while fn runs, in bytes"""
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == "__main__":
+    x0 = [0.3, 0.9]
+    print(f"{'graph':>6} {'entries':>8} {'Node peak':>11} {'Tape peak':>11} {'Node (s)':>9} {'Tape (s)':>9}")
+    for name, fun in (('deep', deep), ('wide', wide)):
+        run_graph = lambda: reverse(fun, x0, backend='graph')
+        run_tape = lambda: reverse(fun, x0, backend='tape')
+        entries = len(record(fun, x0))
+        print(f"{name:>6} {entries:>8} {peak(run_graph):>11} {peak(run_tape):>11} "
+              f"{best_of(run_graph):>9.4f} {best_of(run_tape):>9.4f}")
@@ -0,0 +1,177 @@
+"""
+A benchmark suite timing every differentiation engine on graphs of different shapes, with a regression check.
+
+Each case runs one engine (grad, reverse, reverse on a tape, reverse with a NodePool) on one graph shape
+(wide-shallow, deep-chain, diamond-shared, many-output, many-input) and records the best wall time of several runs,
+the peak memory traced by tracemalloc in a separate run, and the number of Nodes in the graph from profile().
+Engines are entries of ENGINES and shapes are entries of SHAPES, so a new engine is benchmarked on every shape by
+adding one function.
+
+Results can be saved as JSON and compared with an earlier run. A case whose time or peak memory grew by more than
+the threshold (25% by default), or whose graph has more Nodes, is reported as a regression and the run exits with
+status 1. Timings are only comparable between runs on the same machine, so keep baselines local.
+
+Run from the repository root with:
+
+    python benchmarks/suite.py --save baseline.json
+    python benchmarks/suite.py --compare baseline.json [--threshold 0.25] [--quick]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from autodiff_package import grad, reverse, sin, cos, exp, NodePool, profile
+
+
+def wide_shallow(n):
+    """Many independent terms of a few operations each, summed into one output"""
+    def f(x):
+        y = 0
+        for i in range(n):
+            y = y + sin(x[0] * i) * cos(x[1] + i)
+        return y
+    return f, [0.3, 0.7]
+
+def deep_chain(n):
+    """One long chain of operations, each depending only on the previous one"""
+    def f(x):
+        y = x
+        for _ in range(n):
+            y = sin(y) * 0.5 + 0.1
+        return y
+    return f, 0.4
+
+def diamond_shared(n):
+    """Every level uses the previous level twice, so the number of paths doubles with each level"""
+    def f(x):
+        y = x
+        for _ in range(n):
+            y = 0.5 * sin(y * y + y)
+        return y
+    return f, 0.5
+
+def many_output(n):
+    """A function of a few inputs returning n outputs that share their intermediate values"""
+    def f(x):
+        s = x[0] * x[1] + exp(x[2])
+        return [s * i + x[i % 3] for i in range(n)]
+    return f, [0.1, 0.2, 0.3]
+
+def many_input(n):
+    """One output depending on each of n inputs"""
+    def f(x):
+        y = 0
+        for i in range(n):
+            y = y + x[i] * x[(i + 1) % n]
+        return y
+    return f, [0.01 * i for i in range(n)]
+
+
+# Each shape with its size for a full run and for a quick run
+SHAPES = {'wide-shallow': (wide_shallow, 2000, 200),
+          'deep-chain': (deep_chain, 5000, 500),
+          'diamond-shared': (diamond_shared, 2000, 200),
+          'many-output': (many_output, 200, 20),
+          'many-input': (many_input, 200, 20)}
+
+ENGINES = {'grad': lambda f, x: grad(f, x),
+           'reverse': lambda f, x: reverse(f, x),
+           'reverse-tape': lambda f, x: reverse(f, x, backend='tape'),
+           'reverse-pool': lambda f, x: reverse(f, x, pool=NodePool())}
+
+
+def best_of(repeat, function, min_seconds=0.02):
+    """The best time per call over repeat samples, each calling function often enough to take at least min_seconds"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+        loops *= 2
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+def measure(engine, f, x, repeat):
+    """The best wall time, the peak traced memory, and the Nodes counted by profile() for one case"""
+    run = lambda: engine(f, x)
+    seconds = best_of(repeat, run)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    with profile() as p:
+        run()
+    return {'seconds': seconds, 'peak_bytes': peak, 'nodes': sum(p.nodes.values()) if p.calls else None}
+
+def run_suite(quick=False, repeat=5, engines=None, shapes=None):
+    """Runs every engine on every shape and returns the results keyed by 'shape/engine'"""
+    results = {}
+    for shape in shapes or SHAPES:
+        build, size, quick_size = SHAPES[shape]
+        f, x = build(quick_size if quick else size)
+        for name in engines or ENGINES:
+            results[f"{shape}/{name}"] = measure(ENGINES[name], f, x, repeat)
+    return results
+
+def regressions(results, baseline, threshold=0.25):
+    """Returns a line for each case that got slower, used more memory, or recorded more Nodes than in the baseline"""
+    found = []
+    for case, result in results.items():
+        before = baseline.get(case)
+        if before is None:
+            continue
+        for key in ('seconds', 'peak_bytes'):
+            if before[key] and result[key] > (1 + threshold) * before[key]:
+                found.append(f"{case}: {key} {before[key]:.6g} -> {result[key]:.6g} (+{100 * (result[key] / before[key] - 1):.0f}%)")
+        if before['nodes'] is not None and result['nodes'] is not None and result['nodes'] > before['nodes']:
+            found.append(f"{case}: nodes {before['nodes']} -> {result['nodes']}")
+    return found
+
+def table(results, baseline=None):
+    lines = [f"{'case':>28} {'ms':>10} {'peak KiB':>10} {'nodes':>8} {'vs base':>8}"]
+    for case, result in results.items():
+        nodes = '-' if result['nodes'] is None else result['nodes']
+        before = (baseline or {}).get(case)
+        change = f"{result['seconds'] / before['seconds']:7.2f}x" if before and before['seconds'] else f"{'-':>8}"
+        lines.append(f"{case:>28} {1000 * result['seconds']:10.2f} {result['peak_bytes'] / 1024:10.1f} {nodes:>8} {change}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark every engine on every graph shape')
+    parser.add_argument('--quick', action='store_true', help='use small graphs, for a fast check')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case, the best of which is kept')
+    parser.add_argument('--engine', action='append', choices=list(ENGINES), help='only run the given engines')
+    parser.add_argument('--shape', action='append', choices=list(SHAPES), help='only run the given shapes')
+    parser.add_argument('--save', metavar='FILE', help='write the results to FILE as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='compare with the results saved in FILE')
+    parser.add_argument('--threshold', type=float, default=0.25, help='the relative increase reported as a regression')
+    args = parser.parse_args()
+
+    results = run_suite(args.quick, args.repeat, args.engine, args.shape)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print(table(results, baseline))
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+    if baseline is not None:
+        found = regressions(results, baseline, args.threshold)
+        for line in found:
+            print('REGRESSION', line)
+        sys.exit(1 if found else 0)
@@ -1,8 +1,71 @@
-from autodiff_package.differentiate import grad, reverse
+from autodiff_package.differentiate import grad, grad_batch, reverse, hvp, hessian, jvp, vjp, jvp_batch, vjp_batch
 from autodiff_package.functions import *
+from autodiff_package.node import NodePool
+from autodiff_package.profiling import profile
+
+# Everything else is imported on first use, as tapes, sparse Jacobians, process pools, and the asyncio server
+# import NumPy, multiprocessing, or asyncio, which short-lived programs differentiating scalars do not need
+_LAZY = {'Tape': 'tape',
+         'record': 'tape',
+         'optimize': 'optimization',
+         'generate': 'codegen',
+         'compile_tape': 'codegen',
+         'sparsity_pattern': 'sparse',
+         'color': 'sparse',
+         'sparse_jacobian': 'sparse',
+         'jacobian': 'auto',
+         'parallel_jacobian': 'parallel',
+         'GradientServer': 'server',
+         'checkpoint_reverse': 'checkpoint',
+         'primitive': 'primitives',
+         'taylor': 'taylor_mode',
+         'TaylorNode': 'taylor_mode',
+         'GradientCache': 'cache',
+         'cached_reverse': 'cache',
+         'cached_grad': 'cache',
+         'iter_gradients': 'streaming',
+         'save_gradients': 'streaming',
+         'compile': 'compiled'} # compile is left out of __all__ so star imports do not shadow the builtin compile
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(f'{__name__}.{_LAZY[name]}'), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ['grad',
+           'grad_batch',
            'reverse',
+           'hvp',
+           'hessian',
+           'jvp',
+           'vjp',
+           'jvp_batch',
+           'vjp_batch',
+           'Tape',
+           'record',
+           'optimize',
+           'generate',
+           'compile_tape',
+           'sparsity_pattern',
+           'color',
+           'sparse_jacobian',
+           'jacobian',
+           'parallel_jacobian',
+           'GradientServer',
+           'checkpoint_reverse',
+           'primitive',
+           'NodePool',
+           'profile',
+           'taylor',
+           'TaylorNode',
+           'GradientCache',
+           'cached_reverse',
+           'cached_grad',
+           'iter_gradients',
+           'save_gradients',
            'sin',
            'cos',
            'tan',
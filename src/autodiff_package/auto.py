@@ -0,0 +1,142 @@
+"""
+A module that picks forward or reverse mode for a Jacobian from its shape and the size of the function's graph.
+
+jacobian(fun, val) records the graph of the functions once, counts its operations, and estimates the cost of each mode:
+forward mode carries every input's tangent through the graph in one sweep, so its cost grows with the number of inputs,
+while reverse mode sweeps the graph once per output. When both dimensions are large it also traces the sparsity
+pattern and considers the compressed strategies of sparse_jacobian. Every mode runs on the graph already recorded, so
+the functions are evaluated once whichever is chosen. The cheapest estimate is run, and the chosen mode and every
+estimate are returned with the Jacobian so they can be logged.
+"""
+import numpy as np
+try:
+    from autodiff_package.node import Node, topological_order
+    from autodiff_package.differentiate import _backward, _tangents
+    from autodiff_package.sparse import _trace, _pattern, _compressed, color
+except:
+    from node import Node, topological_order
+    from differentiate import _backward, _tangents
+    from sparse import _trace, _pattern, _compressed, color
+
+# Estimated costs, in units of the time to create one Node. A forward tangent adds 1/FORWARD_WIDTH of that per operation
+# (the NumPy arithmetic on the tangent vector), and a reverse sweep 1/REVERSE_WIDTH per operation (the Python loop)
+FORWARD_WIDTH = 500
+REVERSE_WIDTH = 8
+
+# Sparsity is only traced when the Jacobian has at least this many rows and columns and the cheaper of the dense
+# modes costs at least this many evaluations, as the pattern itself costs about one more pass over the graph
+SPARSE_MIN_SIZE = 16
+SPARSE_MIN_COST = 3
+
+MODES = ('auto', 'forward', 'reverse', 'sparse')
+
+def estimate(n_inputs, n_outputs, n_ops, colors=None):
+    """
+    Estimate the cost of computing a Jacobian in each mode
+
+    Parameters
+    ----------
+    n_inputs, n_outputs :
+        The dimensions of the Jacobian
+    n_ops :
+        The number of operations in the recorded graph of the functions
+    colors :
+        Optional pair of the number of column colors and row colors of the sparsity pattern. The compressed
+        strategies include one pass to trace the pattern
+
+    Returns
+    -------
+    Costs: dict
+        The estimated cost of 'forward' and 'reverse' mode, and of 'sparse forward' and 'sparse reverse' if colors
+        were given, in units of the time to create one Node
+    """
+    costs = {'forward': n_ops * (1 + n_inputs / FORWARD_WIDTH),
+             'reverse': n_ops * (1 + n_outputs / REVERSE_WIDTH)}
+    if colors is not None:
+        column_colors, row_colors = colors
+        costs['sparse forward'] = n_ops * (2 + column_colors / FORWARD_WIDTH)
+        costs['sparse reverse'] = n_ops * (2 + row_colors / REVERSE_WIDTH)
+    return costs
+
+def jacobian(fun, val, mode='auto'):
+    """
+    Calculate the Jacobian of function(s), choosing forward or reverse mode by the shape of the Jacobian and a cost model
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function, which may return a list
+    val :
+        Value to evaluate the derivatives at. Either a list or a single value
+    mode :
+        'auto' (the default) to run the cheapest estimate, or 'forward', 'reverse', or 'sparse' (the cheaper of the
+        compressed strategies) to run that mode
+
+    Returns
+    -------
+    Function values: list
+        Each output evaluated at val
+    Jacobian: array
+        The partial derivatives, with one row per output and one column per value
+    Plan: dict
+        The chosen 'mode', its estimated 'cost', the estimated 'costs' of every mode considered, and the
+        'inputs', 'outputs', and 'ops' the estimates were based on
+
+    Examples
+    --------
+    >>> values, J, plan = jacobian(lambda x: x[0] * x[1] + sin(x[2]), [1.0, 2.0, 0.0])
+    >>> print(plan['mode'], J)
+    forward [[2. 1. 1.]]
+    >>> values, J, plan = jacobian(lambda x: sum(x[i] * x[i] for i in range(1000)), list(range(1000)))
+    >>> print(plan['mode'])
+    reverse
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode `{mode}`")
+    if not isinstance(val, list):
+        functions = fun if isinstance(fun, list) else [fun]
+        fun = [lambda x, f=f: f(x[0]) for f in functions]
+        val = [val]
+    n = len(val)
+
+    # Records the graph once, which every mode then sweeps, and counts its operations
+    nodes, outputs = _trace(fun, val)
+    roots = [output for output in outputs if isinstance(output, Node)]
+    order = topological_order(roots)
+    m = len(outputs)
+    n_ops = max(len(order) - n, 1)
+
+    costs = estimate(n, m, n_ops)
+    if mode == 'sparse' or (mode == 'auto' and min(n, m) >= SPARSE_MIN_SIZE
+                            and min(costs.values()) >= SPARSE_MIN_COST * n_ops):
+        rows, cols = _pattern(nodes, outputs)
+        colors = {'sparse forward': color(rows, cols, (m, n), 'forward'),
+                  'sparse reverse': color(rows, cols, (m, n), 'reverse')}
+        costs = estimate(n, m, n_ops, [int(c.max(initial=-1)) + 1 for c in colors.values()])
+    if mode == 'auto':
+        chosen = min(costs, key=costs.get)
+    elif mode == 'sparse':
+        chosen = min(('sparse forward', 'sparse reverse'), key=costs.get)
+    else:
+        chosen = mode
+    plan = {'mode': chosen, 'cost': costs[chosen], 'costs': costs, 'inputs': n, 'outputs': m, 'ops': n_ops}
+
+    values = [output.real if isinstance(output, Node) else output for output in outputs]
+    if chosen == 'forward':
+        _tangents(order, nodes, np.eye(n))
+        J = np.zeros((m, n))
+        for i, output in enumerate(outputs):
+            if isinstance(output, Node):
+                J[i] = output.id
+    elif chosen == 'reverse':
+        J = np.zeros((m, n))
+        for i, root_node in enumerate(outputs):
+            if isinstance(root_node, Node):
+                _backward(order, root_node)
+                J[i] = [node.id for node in nodes]
+    else:
+        _, data = _compressed(nodes, outputs, rows, cols, colors[chosen], chosen.split()[1])
+        J = np.zeros((m, n))
+        J[rows, cols] = data
+    return values, J, plan
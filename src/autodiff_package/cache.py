@@ -0,0 +1,306 @@
+"""
+A module that memoizes the results of grad() and reverse(), for callers that ask for the same derivatives again.
+
+A GradientCache maps a function and the values it is evaluated at to the values and Jacobian returned for them, and
+keeps the most recently used results within a number of entries and a number of bytes. A function is identified by
+the function object itself (or by a name given for it), together with a fingerprint of the state it reads: the values
+captured by its closure, the globals it refers to, its default arguments, the attributes it reads from modules of
+the program (such as cfg.scale), and the same state of the functions of the program it calls. Changing any of them
+changes the key. Functions and modules of this package, the standard library, and installed packages are identified
+by themselves alone, as are classes, so state kept in those (or in the attributes of a class) is not seen: call
+invalidate() after changing it. A function reading an object that cannot be fingerprinted (a lock, say) must be
+declared pure, which keys it on its identity alone. Entries are looked up and stored under a lock, so one cache may
+be shared by threads; the derivatives themselves are computed outside of it.
+
+The functions of the program a function calls, and the modules of the program it reads, are followed _DEPTH levels
+deep (which also stops recursion). Past that they are identified by themselves alone, like library functions, so
+state read only that far down is not seen: call invalidate() after changing it, or pass the function a name.
+
+Floats are keyed by their exact bits, so NaN inputs are found again and 0.0 and -0.0 are kept apart. Arrays are
+fingerprinted by hashing their contents on every lookup, which costs a few milliseconds per MB, as an array that can be
+written to may have changed in place. Read-only arrays (a.setflags(write=False), with no writable base) are
+hashed once and recognised by their identity afterwards.
+"""
+import hashlib
+import os
+import sys
+import sysconfig
+import threading
+import types
+import weakref
+from collections import OrderedDict
+try:
+    from autodiff_package.differentiate import grad, reverse
+    from autodiff_package.lazy import numpy as np, NumPyValue
+except:
+    from differentiate import grad, reverse
+    from lazy import numpy as np, NumPyValue
+
+class _Unfingerprintable(Exception):
+    """Raised for a value the state of a function cannot be fingerprinted from"""
+
+# Values that are their own fingerprint. Floats are fingerprinted by their bits instead, as NaN is not equal to itself
+# and 0.0 is equal to -0.0
+_PLAIN = (type(None), bool, int, str, bytes)
+
+# How many levels of the functions a function calls, and of the modules it reads, are part of its state
+_DEPTH = 3
+
+# Fingerprints of read-only arrays by id, with a weak reference to tell the array apart from a later one with its id
+_FROZEN = {}
+
+# Objects fingerprinted by their identity, whose contents are not part of the state of a function
+_OPAQUE = (type, types.BuiltinFunctionType)
+
+# Directories holding this package, the standard library, and installed packages, whose modules and functions are
+# fingerprinted by their identity: their state is not the program's, and is often not fingerprintable
+_LIBRARIES = tuple(os.path.join(os.path.abspath(path), '') for path in
+                   {os.path.dirname(__file__)} | {sysconfig.get_path(name) for name in ('stdlib', 'platstdlib', 'purelib', 'platlib')})
+
+def _library(module):
+    """Whether a module belongs to this package, the standard library, or an installed package"""
+    if module is None or module.__name__ in sys.builtin_module_names:
+        return module is not None
+    path = getattr(module, '__file__', None)
+    return path is not None and os.path.abspath(path).startswith(_LIBRARIES)
+
+def _fingerprint(value, depth=0, attributes=()):
+    """
+    A hashable summary of a value, which changes whenever the value does
+
+    attributes are the names the code reading the value may look up on it, which are fingerprinted for a module
+    """
+    if isinstance(value, _PLAIN):
+        return value
+    if isinstance(value, float):
+        return ('float', float.hex(value))
+    if isinstance(value, complex):
+        return ('complex', float.hex(value.real), float.hex(value.imag))
+    if isinstance(value, NumPyValue):
+        return _array(value)
+    if isinstance(value, (tuple, list)):
+        return (type(value).__name__,) + tuple(_fingerprint(item, depth) for item in value)
+    if isinstance(value, dict):
+        return ('dict',) + tuple((_fingerprint(key, depth), _fingerprint(item, depth)) for key, item in value.items())
+    if isinstance(value, _OPAQUE):
+        return value
+    if isinstance(value, types.ModuleType):
+        if _library(value) or depth >= _DEPTH:
+            return value
+        # A module of the program, whose attributes the function reads (cfg.scale) are part of its state
+        return (value,) + tuple((name, _fingerprint(vars(value)[name], depth + 1, attributes))
+                                for name in sorted(attributes) if name in vars(value))
+    if isinstance(value, types.FunctionType):
+        # Functions of the program a function calls are part of its state, up to _DEPTH levels deep, while functions
+        # of libraries, such as the elementary functions of this package, are not
+        if depth >= _DEPTH or _library(sys.modules.get(value.__module__)):
+            return value
+        return (value, _state(value, depth + 1))
+    raise _Unfingerprintable(type(value))
+
+def _frozen(array):
+    """Whether the contents of an array cannot change: neither it nor any array it is a view of is writable"""
+    while isinstance(array, np.ndarray):
+        if array.flags.writeable:
+            return False
+        array = array.base
+    return array is None
+
+def _array(value):
+    """The fingerprint of a NumPy value, hashing its contents unless it is a read-only array hashed before"""
+    cached = _FROZEN.get(id(value))
+    if cached is not None and cached[0]() is value:
+        return cached[1]
+    array = np.ascontiguousarray(value)
+    fingerprint = ('array', array.shape, array.dtype.str, hashlib.blake2b(array.tobytes(), digest_size=16).digest())
+    if isinstance(value, np.ndarray) and _frozen(value):
+        key = id(value)
+        _FROZEN[key] = (weakref.ref(value, lambda _: _FROZEN.pop(key, None)), fingerprint)
+    return fingerprint
+
+def _names(code):
+    """The global and attribute names a code object and the functions defined inside it may refer to"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _names(const)
+    return names
+
+def _state(function, depth=0):
+    """A fingerprint of everything a function reads besides its arguments"""
+    if not isinstance(function, types.FunctionType):
+        raise _Unfingerprintable(type(function))
+    names = _names(function.__code__)
+    cells = tuple(_fingerprint(cell.cell_contents, depth, names) for cell in function.__closure__ or ())
+    globals_ = tuple((name, _fingerprint(function.__globals__[name], depth, names))
+                     for name in sorted(names) if name in function.__globals__)
+    return (cells, globals_, _fingerprint(function.__defaults__, depth), _fingerprint(function.__kwdefaults__, depth))
+
+def _size(value):
+    """The approximate number of bytes held by a result"""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size(item) for item in value)
+    if isinstance(value, NumPyValue):
+        return sys.getsizeof(value) + getattr(value, 'nbytes', 0)
+    return sys.getsizeof(value)
+
+def _copy(value):
+    """A copy of a result that shares nothing mutable with the cached one"""
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    if isinstance(value, NumPyValue) and getattr(value, 'ndim', 0):
+        return value.copy()
+    return value
+
+class GradientCache:
+    """
+    A least recently used cache of the results of grad() and reverse()
+
+    Parameters
+    ----------
+    maxsize :
+        The most results kept
+    max_bytes :
+        The most bytes of results kept, estimated from the sizes of their values and Jacobians. None for no limit
+
+    Examples
+    --------
+    >>> cache = GradientCache(maxsize=2)
+    >>> f = lambda x: x[0] * sin(x[1])
+    >>> _ = cache.reverse(f, [1.0, 2.0]); _ = cache.reverse(f, [1.0, 2.0])
+    >>> print(cache.stats()['hits'], cache.stats()['misses'])
+    1 1
+    """
+
+    def __init__(self, maxsize=128, max_bytes=64 * 2 ** 20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, mode, function, val, seed, name, pure):
+        """The key of a call: the mode, the functions or their name, their state unless pure, and the values"""
+        functions = tuple(function) if isinstance(function, list) else (function,)
+        try:
+            state = None if pure else tuple(_state(f) for f in functions)
+            inputs = (_fingerprint(val), _fingerprint(seed))
+        except _Unfingerprintable as error:
+            raise ValueError(f"Cannot fingerprint a value of {error.args[0]} read by the function or given as its input, "
+                             f"declare the function pure to cache it on its identity alone") from None
+        return (mode, name if name is not None else functions, state, inputs)
+
+    def _call(self, mode, differentiate, function, val, seed, name, pure):
+        key = self._key(mode, function, val, seed, name, pure)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(entry[0])
+            self.misses += 1
+
+        result = differentiate(function, val, seed)
+        size = _size(result)
+        with self._lock:
+            if key not in self._entries and (self.max_bytes is None or size <= self.max_bytes):
+                self._entries[key] = (_copy(result), size)
+                self.bytes += size
+                while len(self._entries) > self.maxsize or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                    self.bytes -= self._entries.popitem(last=False)[1][1]
+                    self.evictions += 1
+        return result
+
+    def reverse(self, function, val, seed=None, name=None, pure=False):
+        """
+        Returns reverse(function, val, seed), from the cache when it holds the result
+
+        Parameters
+        ----------
+        function, val, seed :
+            As for reverse()
+        name :
+            Optional name to identify the function by, in place of the function object, so that functions
+            created again for each call (a lambda in a loop, say) share their results
+        pure :
+            Whether the function depends on nothing but its arguments. Its closure and globals are then not fingerprinted
+        """
+        return self._call('reverse', reverse, function, val, seed, name, pure)
+
+    def grad(self, function, val, seed=None, name=None, pure=False):
+        """Returns grad(function, val, seed), from the cache when it holds the result, with name and pure as for reverse"""
+        return self._call('grad', grad, function, val, seed, name, pure)
+
+    def invalidate(self, function=None, name=None):
+        """Removes the results of a function, or of the functions given a name, or every result when neither is given"""
+        with self._lock:
+            for key in list(self._entries):
+                functions = key[1]
+                if (function is None and name is None) or functions == name or \
+                        (function is not None and isinstance(functions, tuple) and function in functions):
+                    self.bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """Removes every result and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.bytes = 0
+
+    def stats(self):
+        """Returns the hits, misses, evictions, the number of results and their bytes, and the limits"""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'size': len(self._entries),
+                    'bytes': self.bytes,
+                    'maxsize': self.maxsize,
+                    'max_bytes': self.max_bytes}
+
+# The cache cached_reverse and cached_grad use when none is given
+default_cache = GradientCache()
+
+def cached_reverse(function, val, seed=None, name=None, pure=False, cache=None):
+    """
+    Calculate the derivatives of function(s) with reverse(), reusing the result of an earlier call with the same arguments
+
+    Parameters
+    ----------
+    function, val, seed :
+        As for reverse()
+    name :
+        Optional name to identify the function by, in place of the function object
+    pure :
+        Whether the function depends on nothing but its arguments, so that its closure and globals are not fingerprinted.
+        Needed for functions that read objects which cannot be fingerprinted
+    cache :
+        The GradientCache to use. Defaults to default_cache
+
+    Returns
+    -------
+    The values and Jacobian, as returned by reverse()
+
+    Examples
+    --------
+    >>> scale = 2.0
+    >>> f = lambda x: scale * x[0] * x[1]
+    >>> print(cached_reverse(f, [1.0, 3.0]))
+    ([6.0], [[6.0, 2.0]])
+    >>> scale = 3.0
+    >>> print(cached_reverse(f, [1.0, 3.0]))
+    ([9.0], [[9.0, 3.0]])
+    """
+    return (cache if cache is not None else default_cache).reverse(function, val, seed, name, pure)
+
+def cached_grad(function, val, seed=None, name=None, pure=False, cache=None):
+    """
+    Calculate the derivatives of function(s) with grad(), reusing the result of an earlier call with the same arguments
+
+    The parameters are those of cached_reverse, and the values and Jacobian are returned as by grad()
+    """
+    return (cache if cache is not None else default_cache).grad(function, val, seed, name, pure)
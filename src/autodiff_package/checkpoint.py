@@ -0,0 +1,131 @@
+"""
+A module that differentiates long time-stepping loops in reverse mode with bounded memory, by checkpointing.
+
+reverse() keeps the graph of a whole computation alive until its sweep ends. checkpoint_reverse(step, loss, val, n_steps)
+instead runs the loop on plain values, holds at most a fixed number of snapshots of the state, and during the backward
+pass recomputes each step from the nearest snapshot before recording its graph and sweeping it. Snapshots are placed by
+the binomial schedule of Revolve (Griewank and Walther), which needs the fewest recomputed steps for a given number of
+snapshots: with c snapshots and r recomputations of each step, up to binomial(c + r, c) steps can be reversed.
+"""
+from math import comb
+try:
+    from autodiff_package.node import Node, topological_order
+    from autodiff_package.differentiate import _sweep
+except:
+    from node import Node, topological_order
+    from differentiate import _sweep
+
+def _advance(step, state, n):
+    """Runs n steps on plain values"""
+    for _ in range(n):
+        state = step(state)
+        state = [s.real if isinstance(s, Node) else s for s in state]
+    return state
+
+def _vjp(function, state, adjoint):
+    """
+    Records the graph of function at state and sweeps it once with the given adjoints of its outputs,
+    returning the output values and the adjoint of every input
+    """
+    nodes = [Node(v, 0, id=0) for v in state]
+    outputs = function(nodes)
+    if not isinstance(outputs, (list, tuple)):
+        outputs = [outputs]
+    _sweep(topological_order([output for output in outputs if isinstance(output, Node)]), outputs, adjoint)
+    values = [output.real if isinstance(output, Node) else output for output in outputs]
+    return values, [node.id for node in nodes]
+
+def _repetitions(steps, snapshots):
+    """The fewest recomputations of each step needed to reverse steps steps with the given number of snapshots"""
+    r = 0
+    while comb(snapshots + r, snapshots) < steps:
+        r += 1
+    return r
+
+def _place(step, stack):
+    """
+    Splits the frame on top of the stack by the binomial schedule until it is a single step or has no snapshots
+    to spare, pushing the snapshot of each split, and returns the number of steps run to reach them
+    """
+    advanced = 0
+    state, steps, free = stack[-1]
+    while steps > 1 and free > 0:
+        # The right part is reversed with one snapshot less, and the left part with one recomputation less
+        r = _repetitions(steps, free)
+        split = max(1, steps - comb(free - 1 + r, free - 1))
+        stack[-1] = (state, split, free)
+        state, steps, free = _advance(step, state, split), steps - split, free - 1
+        stack.append((state, steps, free))
+        advanced += split
+    return advanced
+
+def checkpoint_reverse(step, loss, val, n_steps, snapshots=None):
+    """
+    Calculate the gradient of a loss of the final state of a time-stepping loop, using reverse mode with checkpointing
+
+    Parameters
+    ----------
+    step :
+        The function advancing the state by one step, must be inputted using Python's lambda syntax.
+        Takes the state as a list and returns the next state as a list of the same length
+    loss :
+        The function of the final state to differentiate, returning a single value
+    val :
+        The initial state. Either a list or a single value
+    n_steps :
+        The number of steps to run
+    snapshots :
+        The most states held at once besides the initial state. Defaults to the fewest that reverse the loop
+        recomputing each step at most twice. 0 recomputes every step from the initial state
+
+    Returns
+    -------
+    Value: float
+        The loss of the final state
+    Gradient:
+        The partial derivatives of the loss with respect to each value of the initial state (a float for a single value)
+    Report: dict
+        The number of 'steps', the number of steps 'recomputed' during the backward pass on top of the one forward pass,
+        their ratio as the 'overhead', the 'snapshots' allowed, and the most snapshots 'held' at once
+
+    Examples
+    --------
+    >>> step = lambda s: [s[0] + 0.01 * s[1], s[1] - 0.01 * sin(s[0])]
+    >>> value, gradient, report = checkpoint_reverse(step, lambda s: s[0], [1.0, 0.0], 1000, snapshots=10)
+    >>> print(report['held'] <= 10, report['recomputed'] <= 4 * 1000)
+    True True
+    """
+    is_vallist = isinstance(val, list)
+    if not is_vallist:
+        step_one, loss_one = step, loss
+        step = lambda s: [step_one(s[0])]
+        loss = lambda s: loss_one(s[0])
+        val = [val]
+    if snapshots is None:
+        snapshots = 1
+        while comb(snapshots + 2, snapshots) < n_steps:
+            snapshots += 1
+    report = {'steps': n_steps, 'recomputed': 0, 'snapshots': snapshots, 'held': 0}
+
+    # Each frame holds a state and the number of steps after it still to be reversed, with the snapshots it may use.
+    # Frames are reversed from the top of the stack, so the states of the frames below are the snapshots held.
+    # The one forward pass on plain values places the first snapshots of the schedule on its way to the final state,
+    # so the steps up to them are never run again, and with as many snapshots as steps nothing is recomputed
+    stack = [(list(val), n_steps, snapshots)]
+    _place(step, stack)
+    report['held'] = len(stack) - 1
+    state, steps, _ = stack[-1]
+    value, adjoint = _vjp(lambda s: [loss(s)], _advance(step, state, steps), [1.0])
+
+    while stack:
+        # The frame on top is a single step, or has no snapshots to spare: each step is recomputed from its state
+        state, steps, free = stack.pop()
+        for k in range(steps - 1, -1, -1):
+            report['recomputed'] += k
+            adjoint = _vjp(step, _advance(step, state, k), adjoint)[1]
+        if stack:
+            report['recomputed'] += _place(step, stack)
+            report['held'] = max(report['held'], len(stack) - 1)
+
+    report['overhead'] = report['recomputed'] / n_steps if n_steps else 0.0
+    return value[0], adjoint if is_vallist else adjoint[0], report
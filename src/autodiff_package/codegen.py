@@ -0,0 +1,212 @@
+"""
+A module that generates straight-line Python source code from a recorded tape.
+
+generate(tape) writes out one statement per entry for the values, and one per edge for a reverse sweep from each output,
+using plain float arithmetic and the math module (or NumPy, so the same code runs elementwise over arrays).
+compile_tape(tape) compiles that source once, caches it, and returns the resulting function, which evaluates values
+and partial derivatives without creating any Nodes.
+"""
+import itertools
+import math
+from collections import OrderedDict
+import numpy as np
+from types import SimpleNamespace
+try:
+    from autodiff_package.primitives import PRIMITIVES
+    from autodiff_package import functions as _f
+except:
+    from primitives import PRIMITIVES
+    import functions as _f
+
+# Names of the elementary functions in each backend
+_NAMES = {
+    'math': {'sin': 'math.sin', 'cos': 'math.cos', 'tan': 'math.tan', 'exp': 'math.exp', 'log': 'math.log',
+             'arcsin': 'math.asin', 'arccos': 'math.acos', 'arctan': 'math.atan', 'sinh': 'math.sinh',
+             'cosh': 'math.cosh', 'tanh': 'math.tanh', 'sqrt': 'math.sqrt'},
+    'numpy': {'sin': 'np.sin', 'cos': 'np.cos', 'tan': 'np.tan', 'exp': 'np.exp', 'log': 'np.log',
+              'arcsin': 'np.arcsin', 'arccos': 'np.arccos', 'arctan': 'np.arctan', 'sinh': 'np.sinh',
+              'cosh': 'np.cosh', 'tanh': 'np.tanh', 'sqrt': 'np.sqrt'},
+}
+
+# Templates for the value and partial derivatives of each operation on two parents {a} and {b}, where {v} is the value itself
+_BINARY = {
+    'add': ('{a} + {b}', '1.0', '1.0'),
+    'sub': ('{a} - {b}', '1.0', '-1.0'),
+    'mul': ('{a} * {b}', '{b}', '{a}'),
+    'div': ('{a} / {b}', '1.0 / {b}', '-{v} / {b}'),
+    'pow': ('{a} ** {b}', '{b} * {a} ** ({b} - 1)', '{v} * {log}({a})'),
+}
+
+def _infix(symbol):
+    """The methods of _Source for a binary operator, writing both operands in parentheses"""
+    return (lambda a, b: _Source(f"({a} {symbol} {b})"), lambda a, b: _Source(f"({b} {symbol} {a})"))
+
+class _Source(str):
+    """The source of an expression, on which the kernels of functions.py write out the formulas they compute"""
+    __add__, __radd__ = _infix('+')
+    __sub__, __rsub__ = _infix('-')
+    __mul__, __rmul__ = _infix('*')
+    __truediv__, __rtruediv__ = _infix('/')
+
+    def __neg__(self):
+        return _Source(f"(-{self})")
+
+# The elementary functions as fields to be filled in with the name of each function in the backend
+_FIELDS = SimpleNamespace(**{name: lambda v, name=name: _Source(f"{{{name}}}({v})") for name in _NAMES['math']})
+
+# Templates for the value and partial derivative of each operation on one parent {a} with the constant operand {c}.
+# {logc} is the natural logarithm of the constant
+_UNARY = {
+    'add': ('{a} + {c}', '1.0'),
+    'sub': ('{a} - {c}', '1.0'),
+    'rsub': ('{c} - {a}', '-1.0'),
+    'mul': ('{a} * {c}', '{c}'),
+    'div': ('{a} / {c}', '1.0 / {c}'),
+    'rdiv': ('{c} / {a}', '-{v} / {a}'),
+    'pow': ('{a} ** {c}', '{c} * {a} ** ({c} - 1)'),
+    'rpow': ('{c} ** {a}', '{v} * {logc}'),
+    'neg': ('-{a}', '-1.0'),
+    'logbase': tuple(template / _Source('{logc}') for template in _f._log(_Source('{a}'), _FIELDS)),
+}
+
+# The elementary functions are written out by their kernels in functions.py, so the generated code computes the same
+# formulas as reverse(). Where a partial derivative reuses the value, as for tan and the logistic function, it reads {v}
+for _name in ('sin', 'cos', 'tan', 'log', 'logistic', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh', 'tanh', 'sqrt'):
+    _value, _partial = getattr(_f, '_' + _name)(_Source('{a}'), _FIELDS)
+    _UNARY[_name] = (_value, _partial.replace(_value, '{v}'))
+
+# Compiled functions, keyed by their source, of which the most recently used _CACHE_SIZE are kept. The source embeds
+# the constants of its tape, so without a bound every distinct trace would stay compiled for the life of the process
+_CACHE = OrderedDict()
+_CACHE_SIZE = 256
+_COUNTER = itertools.count()
+
+def _literal(value):
+    """Writes a float as a Python literal, in parentheses if it is negative"""
+    if math.isnan(value) or math.isinf(value):
+        return f"float('{value}')"
+    return f"({value!r})" if value < 0 or (value == 0 and math.copysign(1, value) < 0) else repr(value)
+
+def generate(tape, backend='math', name='evaluate'):
+    """
+    Generate the source of a Python function that evaluates a tape and its reverse sweeps
+
+    Parameters
+    ----------
+    tape :
+        The Tape to generate code for
+    backend :
+        'math' for scalar inputs, using float arithmetic and the math module, or 'numpy' for inputs that may be arrays
+    name :
+        The name of the generated function
+
+    Returns
+    -------
+    Source: str
+        The source of a function taking a list of input values and returning the output values, the Jacobian with one
+        row per output, and the values of the kept entries of the tape (which guard the branches of compiled functions)
+    """
+    if backend not in _NAMES:
+        raise ValueError(f"Unknown backend `{backend}`")
+    names = _NAMES[backend]
+    ops = tape.ops
+    parents = [[p for p in pair if p >= 0] for pair in tape.parents[:tape.size].tolist()]
+    const = tape.const[:tape.size].tolist()
+    values = tape.values[:tape.size].tolist()
+
+    lines = [f"def {name}(x):"]
+    for k, i in enumerate(tape.inputs.tolist()):
+        lines.append(f"    v{i} = x[{k}]")
+
+    # Forward statements, with every partial derivative that is not a literal kept in a variable for the reverse sweeps
+    partials = {}
+    for i in range(tape.size):
+        op = ops[i]
+        if op == 'input':
+            continue
+        if op == 'const':
+            lines.append(f"    v{i} = {_literal(values[i])}")
+            continue
+        if op in PRIMITIVES:
+            # Registered primitives are called through the function that gives their value and partial derivatives
+            arguments = ', '.join(f"v{p}" for p in parents[i])
+            derivatives = ', '.join(f"d{i}_{k}" for k in range(len(parents[i])))
+            lines.append(f"    v{i}, ({derivatives},) = primitives['{op}']({arguments})")
+            for k in range(len(parents[i])):
+                partials[i, k] = f"d{i}_{k}"
+            continue
+        fields = dict(names, v=f"v{i}", a=f"v{parents[i][0]}", log=names['log'])
+        if len(parents[i]) == 2:
+            fields['b'] = f"v{parents[i][1]}"
+            templates = _BINARY[op]
+        else:
+            fields['c'] = _literal(const[i])
+            if op in ('rpow', 'logbase'):
+                # As in reverse(), the log of a negative constant is NaN and of zero -inf, rather than an error
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    fields['logc'] = _literal(float(np.log(const[i])))
+            templates = _UNARY[op]
+        lines.append(f"    v{i} = {templates[0].format(**fields)}")
+        for k, template in enumerate(templates[1:]):
+            partial = template.format(**fields)
+            if partial in ('1.0', '-1.0') or partial == fields.get('c'):
+                partials[i, k] = partial
+            else:
+                lines.append(f"    d{i}_{k} = {partial}")
+                partials[i, k] = f"d{i}_{k}"
+
+    # One reverse sweep per output, over the entries that output depends on
+    rows = []
+    for j, output in enumerate(tape.outputs.tolist()):
+        assigned = {output}
+        lines.append(f"    a{output} = 1.0")
+        for i in range(output, -1, -1):
+            if i not in assigned:
+                continue
+            for k, p in enumerate(parents[i]):
+                partial = partials[i, k]
+                if partial == '1.0':
+                    term = f"a{i}"
+                elif partial == '-1.0':
+                    term = f"-a{i}"
+                else:
+                    term = f"a{i} * {partial}"
+                lines.append(f"    a{p} {'+=' if p in assigned else '='} {term}")
+                assigned.add(p)
+        row = ', '.join(f"a{i}" if i in assigned else '0.0' for i in tape.inputs.tolist())
+        rows.append(f"[{row}]")
+        lines.append(f"    g{j} = [{row}]")
+
+    outputs = ', '.join(f"v{i}" for i in tape.outputs.tolist())
+    jacobian = ', '.join(f"g{j}" for j in range(len(rows)))
+    kept = ', '.join(f"v{i}" for i in tape.kept)
+    lines.append(f"    return [{outputs}], [{jacobian}], [{kept}]")
+    return '\n'.join(lines) + '\n'
+
+def compile_tape(tape, backend='math'):
+    """
+    Generate, compile, and cache a Python function that evaluates a tape and its reverse sweeps
+
+    The function takes a list of input values and returns the output values, the Jacobian with one row per output,
+    and the values of the kept entries of the tape. Functions are cached by their source, so tapes with the same
+    operations and constants share one compiled function, and the least recently used are dropped past _CACHE_SIZE.
+    With the 'math' backend, math domain errors raise ValueError and overflows raise OverflowError where NumPy
+    would return NaN or inf.
+
+    Examples
+    --------
+    >>> evaluate = compile_tape(record(lambda x: x[0] * sin(x[1]), [2.0, 0.0]))
+    >>> print(evaluate([3.0, 0.0]))
+    ([0.0], [[0.0, 3.0]], [])
+    """
+    source = generate(tape, backend)
+    function = _CACHE.get(source)
+    if function is not None:
+        _CACHE.move_to_end(source)
+        return function
+    namespace = {'math': math, 'np': np, 'primitives': PRIMITIVES}
+    exec(compile(source, f"<autodiff codegen {next(_COUNTER)}>", 'exec'), namespace)
+    function = _CACHE[source] = namespace['evaluate']
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return function
@@ -0,0 +1,180 @@
+"""
+A module that compiles functions into tapes that are recorded once and replayed many times.
+
+compile(f, n_inputs) returns a CompiledFunction. Its first call traces f into a Tape; later calls evaluate the
+tape at the new inputs, with generated code or by replaying it, instead of running f again. Every comparison made with a Node while tracing is kept as a guard,
+and the function is only traced again when a guard decides differently at the new inputs, i.e. when control flow changes.
+"""
+import numpy as np
+try:
+    import autodiff_package.node as node
+    from autodiff_package.node import Node
+    from autodiff_package.tape import Tape
+    from autodiff_package.optimization import optimize
+    from autodiff_package.codegen import compile_tape
+except:
+    import node
+    from node import Node
+    from tape import Tape
+    from optimization import optimize
+    from codegen import compile_tape
+
+_COMPARE = {'gt': np.greater, 'lt': np.less, 'ge': np.greater_equal, 'le': np.less_equal}
+
+class CompiledFunction:
+    """
+    A function traced into tapes, which evaluates its values and partial derivatives at new inputs without calling it again.
+
+    Each trace is kept together with the guards for the branches it took, as (operator, position of the node among the
+    kept entries of the tape, position of the other node or None, constant other operand, result). Up to max_traces traces
+    are cached, so functions that switch between a few branches do not have to be traced again. Comparisons are logged
+    per thread and per trace, so functions can be traced in several threads at once, or inside a function being traced.
+    Unless optimize is False, each tape is optimized after tracing, and the report of the last optimization is kept in report.
+    With the 'codegen' backend each tape is turned into generated Python code, and with the 'tape' backend it is replayed.
+    """
+
+    def __init__(self, function, n_inputs=None, max_traces=8, optimize=True, backend='codegen'):
+        """Initializes a compiled function that has not been traced yet"""
+        if backend not in ('codegen', 'tape'):
+            raise ValueError(f"Unknown backend `{backend}`")
+        self.function = function
+        self.n_inputs = n_inputs
+        self.max_traces = max_traces
+        self.optimize = optimize
+        self.backend = backend
+        self.traces = []
+        self.trace_count = 0
+        self.report = None
+
+    def __call__(self, val):
+        """
+        Evaluates the function and its partial derivatives at val
+
+        Returns the function values and the Jacobian in the same form as reverse().
+        """
+        if self.n_inputs is None:
+            x = [val]
+        else:
+            x = list(val)
+            if len(x) != self.n_inputs:
+                raise ValueError('Value does not match the number of inputs of the compiled function')
+
+        result = self._select(x)
+        if result is None:
+            _, evaluate, guards = self._trace(x)
+            # The guards of the new trace hold at x, so any error it raises there is the function's own. It is
+            # raised before the trace is cached, so a trace that cannot be evaluated never displaces another
+            values, jacobian, _ = evaluate(x)
+            self._cache(evaluate, guards)
+            result = [float(v) for v in values], jacobian
+        values, jacobian = result
+        if self.n_inputs is None:
+            return values, [float(row[0]) for row in jacobian]
+        return values, [[float(v) for v in row] for row in jacobian]
+
+    def _select(self, x):
+        """Evaluates the cached traces at x and returns the values and Jacobian of the first one whose guards all hold, or None"""
+        for i, (evaluate, guards) in enumerate(self.traces):
+            try:
+                values, jacobian, kept = evaluate(x)
+            except (ArithmeticError, ValueError):
+                # The whole trace is evaluated before its guards are checked, so a trace of another branch can fail
+                # at inputs its guards would reject (the log of a negative number, say). That is a guard miss
+                continue
+            if all(self._holds(kept, guard) for guard in guards):
+                if i:
+                    self.traces.insert(0, self.traces.pop(i))
+                return [float(v) for v in values], jacobian
+        return None
+
+    @staticmethod
+    def _holds(kept, guard):
+        """Checks whether a guarded comparison gives the same result with the values of the kept entries"""
+        op, left, right, const, result = guard
+        other = kept[right] if right is not None else const
+        return bool(_COMPARE[op](kept[left], other)) == result
+
+    def trace(self, x):
+        """Runs the function with Nodes at x, records its graph and guards on a new tape, and caches it"""
+        tape, evaluate, guards = self._trace(x)
+        self._cache(evaluate, guards)
+        return tape
+
+    def _cache(self, evaluate, guards):
+        """Puts a trace first in the cache, dropping the least recently used past max_traces"""
+        self.traces.insert(0, (evaluate, guards))
+        del self.traces[self.max_traces:]
+
+    def _trace(self, x):
+        """Runs the function with Nodes at x and returns its tape, the function evaluating the tape, and its guards"""
+        inputs = [Node(v, 0) for v in x]
+        logs = node.comparison_logs()
+        logs.append([])
+        try:
+            outputs = []
+            functions = self.function if isinstance(self.function, list) else [self.function]
+            for f in functions:
+                output = f(inputs[0] if self.n_inputs is None else inputs)
+                outputs.extend(output if isinstance(output, (list, tuple)) else [output])
+        finally:
+            comparisons = logs.pop()
+
+        keep = []
+        guards = []
+        for op, left, right, result in comparisons:
+            keep.append(left)
+            if isinstance(right, Node):
+                keep.append(right)
+                guards.append((op, len(keep) - 2, len(keep) - 1, None, bool(result)))
+            else:
+                guards.append((op, len(keep) - 1, None, float(right), bool(result)))
+        tape = Tape.from_graph(inputs, outputs, keep)
+        if self.optimize:
+            tape, self.report = optimize(tape)
+
+        evaluate = compile_tape(tape) if self.backend == 'codegen' else _replay(tape)
+        self.trace_count += 1
+        return tape, evaluate, guards
+
+def _replay(tape):
+    """Returns a function that replays a tape at new inputs, in the same form as the functions made by compile_tape"""
+    def evaluate(x):
+        tape.forward(x)
+        return tape.output_values, tape.jacobian().tolist(), tape.values[tape.kept].tolist()
+    return evaluate
+
+def compile(function, n_inputs=None, max_traces=8, optimize=True, backend='codegen'):
+    """
+    Compile function(s) into a callable that records their computational graph once and replays it at new inputs
+
+    Parameters
+    ----------
+    function :
+        The function to be compiled, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function,
+        and a function may return a list of outputs
+    n_inputs :
+        The number of values the function takes as a list, or None for a function of a single value
+    max_traces :
+        How many traces, one per set of branches taken, are kept
+    optimize :
+        Whether to fold constants, merge common subexpressions, and drop dead entries of each traced tape
+    backend :
+        'codegen' to evaluate each traced tape with generated Python code, or 'tape' to replay the tape's arrays
+
+    Returns
+    -------
+    CompiledFunction: compiled
+        A callable taking a value (or a list of n_inputs values) and returning the function values and the
+        Jacobian, in the same form as reverse(). Only comparisons made with Nodes (<, >, <=, >=) are guarded;
+        branches on values read out of a Node some other way are fixed by the first trace.
+
+    Examples
+    --------
+    >>> f = compile(lambda x: x[0] * x[1] if x[0] > 0 else -x[1], 2)
+    >>> print(f([2, 3]))
+    ([6.0], [[3.0, 2.0]])
+    >>> print(f([-1, 3]))
+    ([-3.0], [[0.0, -1.0]])
+    """
+    return CompiledFunction(function, n_inputs, max_traces, optimize, backend)
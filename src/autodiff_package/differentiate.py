@@ -6,14 +6,28 @@ Each takes one or multiple function arguments and one or multiple values to eval
 Both return both the partial derivates and the values of each function.
 
 """
-import numpy as np
-from collections import defaultdict
+import contextlib
+import time
 try:
-    from autodiff_package.node import Node
+    from autodiff_package.node import Node, topological_order
+    from autodiff_package.lazy import numpy as np
+    from autodiff_package import profiling
 except:
-    from node import Node
+    from node import Node, topological_order
+    from lazy import numpy as np
+    import profiling
 
-def grad(fun, val, seed=None):
+def _tapes():
+    """Imports record and parallel_jacobian when they are first needed, as tapes need NumPy and process pools"""
+    try:
+        from autodiff_package.tape import record
+        from autodiff_package.parallel import parallel_jacobian
+    except:
+        from tape import record
+        from parallel import parallel_jacobian
+    return record, parallel_jacobian
+
+def grad(fun, val, seed=None, workers=None, executor=None):
     """
     Calculate the derivative of a function evaluated at a specific input, with an optional seed
     
@@ -25,7 +39,13 @@ def grad(fun, val, seed=None):
     val :
         Value to evaluate the derivative at. Either a list or a single value
     seed : 
-        The weights of each derivative. Must be the same dimension as the val parameter
+        The weights of each derivative. Must be the same dimension as the val parameter,
+        or a matrix with one row per value and one column per direction to take derivatives in
+    workers :
+        Optional number of processes to split the directions across. The functions are recorded once on a Tape,
+        which is sent to the processes in place of the functions, so lambdas can be used (scalar values only)
+    executor :
+        Optional concurrent.futures executor to run the processes in, instead of a new process pool
     
     Returns
     -------
@@ -36,7 +56,8 @@ def grad(fun, val, seed=None):
     If a multivector function: 
     Jacobian: array
         An array of lists of dual numbers, with the real portion being the real output of the function, 
-        and the dual param being the partial derivative with respect to that value
+        and the dual param being the partial derivative with respect to that value.
+        Each function is evaluated once, with every partial derivative propagated together as an array of duals
     
     Examples
     --------
@@ -52,14 +73,6 @@ def grad(fun, val, seed=None):
 
     """ 
 
-    # Make sure every entry is a Node and has real and dual parts
-    # (this allows it to handle vector functions with partial derivatives equal to 0)
-    def check_ans(e):
-        """ Checks that the input is a Node, and if it is not, one is created with a real value of the input and a dual value of 0 """
-        if isinstance(e, Node):
-            return e
-        return Node(e,0)
-
     # Function and value to lists
     is_vallist = True
     if not isinstance(fun,list):
@@ -68,48 +81,332 @@ def grad(fun, val, seed=None):
         val = [val]
         is_vallist = False
 
-    # check input and seed are of the same shape
-    seed_shape = np.shape(seed)
-    val_shape = np.shape(val)
-    if seed is not None and seed_shape != val_shape:
+    # check input and seed are of the same shape. A seed may also be a matrix holding one direction per column
+    if seed is not None and np.shape(seed) != np.shape(val) and np.shape(seed)[:1] != np.shape(val):
         raise ValueError('Value and seed are not of same dimension')
 
-    ans = []
-    jacobian = []
-    for f in fun:
+    if workers is not None or executor is not None:
+        return _grad_parallel(fun, val if is_vallist else val[0], seed, workers, executor)
 
-        # Not a list of values per function. Answer could have multiple dimensions, jacobian only has one dimension
-        if not is_vallist:
-            z = Node(val[0])
-            ans.append(f(z).real)
-            jacobian.append(f(z).dual)
+    # Each input carries its whole tangent in its dual: a row of the identity matrix, or its row of the seed.
+    # A single evaluation of each function then gives every partial derivative (or directional derivative) at once
+    if not is_vallist:
+        nodes = Node(val[0])
+    else:
+        tangents = np.eye(len(val)) if seed is None else np.asarray(seed, dtype=float)
+        nodes = [Node(val[i], tangents[i]) for i in range(len(val))]
 
-        else:
-            # Real value for the function
-            ans.append(f(val))
+    # Make sure every entry is a Node and has real and dual parts
+    # (this allows it to handle vector functions with partial derivatives equal to 0)
+    def check_ans(e):
+        """ Checks that the input is a Node, and if it is not, one is created with a real value of the input and a dual value of 0 """
+        if isinstance(e, Node):
+            return e
+        return Node(e, np.zeros(tangents.shape[1:]) if is_vallist else 0)
 
-            # Finds the partial derivative at each value in the vector
-            partial_list = []
-            for i in range(len(val)):
+    ans = []
+    jacobian = []
+    profiler = profiling.active
+    for f in fun:
 
-                partial_seed = val.copy()
-                partial_seed[i] = Node(val[i])
-                ans_partial = check_ans(f(partial_seed))
+        # A function may return a list of outputs, each of which gets its own row in the jacobian
+        if profiler is not None:
+            start = time.perf_counter()
+        outputs = f(nodes)
+        if not isinstance(outputs, (list, tuple)):
+            outputs = [outputs]
+        if profiler is not None:
+            elapsed = time.perf_counter() - start
+            profiler.graph(topological_order([output for output in outputs if isinstance(output, Node)]), elapsed)
 
-                partial_list.append(ans_partial.dual)
+        for output in outputs:
+            output = check_ans(output)
 
-            # Appends a list of dual nums: 
-                # real output for function at val, and partial derivative w/ respect to that variable at val
-            if seed is not None:
-                partial_list = np.dot(partial_list,seed)
-            jacobian.append(partial_list)
+            # Real value for the function, and the partial derivatives with respect to each value
+            # (the directional derivatives if a seed was given)
+            ans.append(output.real)
+            jacobian.append(output.dual)
 
     # Return the whole jacobian, unless it was a single vector function, in which only return that function's partial derivatives
     # Right now, answer is a list of answers, jacobian is potentially a list of lists of jacobians
   
     return ans, jacobian
 
-def reverse(function, val, seed=None):
+def _grad_parallel(fun, val, seed, workers, executor):
+    """Runs grad() by recording every function onto one Tape and splitting the tangent directions across processes"""
+    record, parallel_jacobian = _tapes()
+    tape = record(fun, val)
+    jacobian = parallel_jacobian(tape, seed, 'forward', workers, executor)
+    if not isinstance(val, list) or (seed is not None and np.ndim(seed) == 1):
+        return tape.output_values, [row[0] for row in jacobian]
+    return tape.output_values, list(jacobian)
+
+def grad_batch(fun, X):
+    """
+    Calculate the values and derivatives of a function at many input points at once using forward mode
+
+    Every input holds a whole column of points as a NumPy array, so the function is evaluated once for the whole
+    batch with vectorized NumPy operations rather than once per point.
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function
+    X :
+        Array of points to evaluate at, with shape (N, n) for functions of a list of n values,
+        or shape (N,) for functions of a single value
+
+    Returns
+    -------
+    Values: array
+        The function evaluated at each point, with shape (N,), or (N, m) for a vector function with m outputs
+    Jacobian: array
+        The derivatives at each point, with shape (N, n), or (N, m, n) for a vector function with m outputs.
+        For functions of a single value the last axis is dropped.
+
+    Examples
+    --------
+    >>> X = np.array([[1.0, 2.0], [3.0, 4.0]])
+    >>> values, jacobian = grad_batch(lambda x: x[0] * x[1], X)
+    >>> print(values)
+    [ 2. 12.]
+    >>> print(jacobian)
+    [[2. 1.]
+     [4. 3.]]
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim not in (1, 2):
+        raise ValueError('Points must be given as an array of shape (N,) or (N, n)')
+    N = X.shape[0]
+
+    # The tangent axis comes first in every dual, so that it broadcasts against the (N,) real values
+    if X.ndim == 1:
+        nodes = Node(X, np.ones(N))
+        tangent_shape = (N,)
+    else:
+        n = X.shape[1]
+        tangents = np.eye(n)[:, :, None]
+        nodes = [Node(X[:, i], tangents[i]) for i in range(n)]
+        tangent_shape = (n, N)
+
+    is_funlist = isinstance(fun, list)
+    if not is_funlist:
+        fun = [fun]
+
+    values = []
+    jacobian = []
+    for f in fun:
+        outputs = f(nodes)
+        if isinstance(outputs, (list, tuple)):
+            is_funlist = True
+        else:
+            outputs = [outputs]
+        for output in outputs:
+            if isinstance(output, Node):
+                values.append(np.broadcast_to(output.real, (N,)))
+                jacobian.append(np.broadcast_to(output.dual, tangent_shape).T)
+            else:
+                values.append(np.broadcast_to(output, (N,)))
+                jacobian.append(np.zeros(tangent_shape).T)
+
+    if not is_funlist:
+        return np.array(values[0]), np.array(jacobian[0])
+    return np.stack(values, axis=1), np.stack(jacobian, axis=1)
+
+def _backward(order, root_node):
+    """
+    Runs a single reverse sweep over a topologically ordered graph, accumulating the partial
+    derivative of root_node with respect to each node in that node's id
+    """
+    for node in order:
+        node.id = 0
+    root_node.id = 1
+    for node in reversed(order):
+        for child_node, loc_grad in zip(node.parents, node.partials):
+            child_node.id += loc_grad * node.id
+
+def _sweep(order, roots, adjoints):
+    """
+    Runs a single reverse sweep over a topologically ordered graph starting from several roots at once, each with
+    its own adjoint (a number, or an array to sweep many adjoints together), and leaves each node's adjoint in its id
+    """
+    for node in order:
+        node.id = 0
+    for root_node, adjoint in zip(roots, adjoints):
+        if isinstance(root_node, Node):
+            root_node.id = root_node.id + adjoint
+    for node in reversed(order):
+        for child_node, loc_grad in zip(node.parents, node.partials):
+            child_node.id += loc_grad * node.id
+
+def _tangents(order, inputs, seed):
+    """
+    Runs a forward sweep over a topologically ordered graph that has already been recorded, carrying the rows of seed
+    from the input Nodes, and leaves each node's tangent in its id
+    """
+    for node in order:
+        node.id = 0
+    for node, row in zip(inputs, seed):
+        node.id = row
+    for node in order:
+        parents = node.parents
+        if len(parents) == 1:
+            node.id = node.partials[0] * parents[0].id
+        elif len(parents) == 2:
+            partials = node.partials
+            node.id = partials[0] * parents[0].id + partials[1] * parents[1].id
+        elif parents:
+            node.id = sum(loc_grad * parent.id for parent, loc_grad in zip(parents, node.partials))
+
+def _outputs(fun, nodes):
+    """Evaluates one or a list of functions, each of which may return a list, and returns the list of all outputs"""
+    outputs = []
+    for f in (fun if isinstance(fun, list) else [fun]):
+        output = f(nodes)
+        outputs.extend(output if isinstance(output, (list, tuple)) else [output])
+    return outputs
+
+def jvp(fun, val, vec):
+    """
+    Calculate the Jacobian-vector product of function(s) with one forward pass, without forming the Jacobian
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function, which may return a list
+    val :
+        Value to evaluate the derivatives at. Either a list or a single value
+    vec :
+        The tangent vector, of the same dimension as val
+
+    Returns
+    -------
+    Function values: list
+        Each output evaluated at val
+    Product: list
+        The derivative of each output along vec
+
+    Examples
+    --------
+    >>> values, product = jvp(lambda x: [x[0] * x[1], sin(x[0])], [2.0, 3.0], [1.0, 1.0])
+    >>> print(product)
+    [5.0, -0.4161468365471424]
+    """
+    if np.shape(val) != np.shape(vec):
+        raise ValueError('Value and vector are not of same dimension')
+    return _jvp(fun, val, vec)
+
+def jvp_batch(fun, val, vecs):
+    """
+    Calculate Jacobian-vector products with many tangent vectors in one forward pass, carrying them all as vector duals
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, as for jvp
+    val :
+        Value to evaluate the derivatives at. Either a list or a single value
+    vecs :
+        The tangent vectors, as an array of shape (k, n) with one vector per row, or (k,) for a single value
+
+    Returns
+    -------
+    Function values: list
+        Each output evaluated at val
+    Products: array
+        The derivative of each output along each vector, with shape (k, m) for m outputs
+    """
+    vecs = np.asarray(vecs, dtype=float)
+    if vecs.shape[1:] != np.shape(val):
+        raise ValueError('Value and vectors are not of same dimension')
+    values, products = _jvp(fun, val, list(vecs.T) if isinstance(val, list) else vecs)
+    return values, np.array([np.broadcast_to(product, vecs.shape[:1]) for product in products]).T.reshape(len(vecs), -1)
+
+def _jvp(fun, val, tangents):
+    """Evaluates the functions once on Nodes whose duals are the given tangents"""
+    if isinstance(val, list):
+        nodes = [Node(val[i], tangents[i]) for i in range(len(val))]
+    else:
+        nodes = Node(val, tangents)
+    outputs = _outputs(fun, nodes)
+    values = [output.real if isinstance(output, Node) else output for output in outputs]
+    products = [output.dual if isinstance(output, Node) else 0.0 for output in outputs]
+    return values, products
+
+def vjp(fun, val, cot):
+    """
+    Calculate the vector-Jacobian product of function(s) with one reverse sweep, without forming the Jacobian
+
+    The graph is recorded once and swept once from every output together, with the adjoint of each output
+    set to its entry of cot.
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function, which may return a list
+    val :
+        Value to evaluate the derivatives at. Either a list or a single value
+    cot :
+        The cotangent vector, with one entry per output (a single value for a single output)
+
+    Returns
+    -------
+    Function values: list
+        Each output evaluated at val
+    Product:
+        cot multiplied by the Jacobian, with one entry per value (a single value if val is)
+
+    Examples
+    --------
+    >>> values, product = vjp(lambda x: [x[0] * x[1], sin(x[0])], [2.0, 3.0], [1.0, 2.0])
+    >>> print(product)
+    [2.1677063269057152, 2.0]
+    """
+    return _vjp(fun, val, list(np.atleast_1d(cot)))
+
+def vjp_batch(fun, val, cots):
+    """
+    Calculate vector-Jacobian products with many cotangent vectors in one reverse sweep, carrying them all as vector adjoints
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, as for vjp
+    val :
+        Value to evaluate the derivatives at. Either a list or a single value
+    cots :
+        The cotangent vectors, as an array of shape (k, m) with one vector per row
+
+    Returns
+    -------
+    Function values: list
+        Each output evaluated at val
+    Products: array
+        Each cotangent vector multiplied by the Jacobian, with shape (k, n), or (k,) for a single value
+    """
+    cots = np.atleast_2d(np.asarray(cots, dtype=float))
+    values, products = _vjp(fun, val, list(cots.T))
+    k = len(cots)
+    if not isinstance(val, list):
+        return values, np.broadcast_to(products, (k,)).copy()
+    return values, np.array([np.broadcast_to(product, (k,)) for product in products]).T.reshape(k, len(val))
+
+def _vjp(fun, val, adjoints):
+    """Records the graph of the functions once and sweeps it once, with the given adjoint for each output"""
+    nodes = [Node(v, id=0) for v in val] if isinstance(val, list) else Node(val, id=0)
+    outputs = _outputs(fun, nodes)
+    if len(adjoints) != len(outputs):
+        raise ValueError('Cotangent and outputs are not of same dimension')
+    _sweep(topological_order([output for output in outputs if isinstance(output, Node)]), outputs, adjoints)
+    values = [output.real if isinstance(output, Node) else output for output in outputs]
+    if isinstance(val, list):
+        return values, [node.id for node in nodes]
+    return values, nodes.id
+
+def reverse(function, val, seed=None, backend='graph', workers=None, executor=None, pool=None):
     """
     Calculate the derivative of function(s) evaluated at specific input(s) using reverse mode automatic differentiation
     Parameters
@@ -117,10 +414,24 @@ def reverse(function, val, seed=None):
     function :
         The function to be differentiated, must be inputted using Python's lambda syntax
         Can be either a list of lambda functions (a vector function), or a single lambda function
+        A function may also return a list of outputs. Its graph is then recorded once and swept once per output,
+        so intermediate values shared between the outputs are only computed once
     val :
         Value to evaluate the derivative at. Either a list or a single value
     seed :
         Optional seed vector. The weights of each derivative. Must be the same dimension as the val parameter
+    backend :
+        How the computational graph is stored for the reverse sweep. 'graph' (the default) sweeps the linked Nodes,
+        while 'tape' records the graph into the arrays of a Tape and sweeps over integer indices (scalar values only)
+    workers :
+        Optional number of processes to split the outputs across. The functions are recorded once on a Tape,
+        which is sent to the processes in place of the functions, so lambdas can be used (scalar values only)
+    executor :
+        Optional concurrent.futures executor to run the processes in, instead of a new process pool
+    pool :
+        Optional NodePool. The graph of each function is then built and swept with the garbage collector paused,
+        and released in bulk as soon as it has been swept. The functions must not keep Nodes of their graph to
+        differentiate later
 
     Returns
     -------
@@ -147,13 +458,9 @@ def reverse(function, val, seed=None):
     
     # If values are given in a list, a new list is created with each value as a Node
     if isinstance(val, list): 
-        seed_shape = np.shape(seed)
-        val_shape = np.shape(val)
-        if seed is not None and seed_shape != val_shape:
+        if seed is not None and np.shape(seed) != np.shape(val):
             raise ValueError('Value and seed are not of same dimension')
-        node_vals = list(np.full(val_shape, Node(0,0)))
-        for i in range(len(val)):
-            node_vals[i] = Node(val[i], id=0)
+        node_vals = [Node(val[i], id=0) for i in range(len(val))]
 
     # If a single value is given, one Node is created with that value 
     else:
@@ -163,50 +470,181 @@ def reverse(function, val, seed=None):
     if not isinstance(function,list):
         function = [function]
 
+    if workers is not None or executor is not None:
+        return _reverse_tape(function, val, seed, workers, executor)
+    if backend == 'tape':
+        return _reverse_tape(function, val, seed)
+    if backend != 'graph':
+        raise ValueError(f"Unknown backend `{backend}`")
+
     Jacobian = []
     function_vals = []
-    for f in function:
-        partial = []
+    profiler = profiling.active
 
-        # Adds value of each function to list of all function values
-        root_node = f(node_vals)
-        function_vals.append(root_node.real)
+    # A pool pauses the garbage collector until every graph is swept
+    with pool if pool is not None else contextlib.nullcontext():
+        for f in function:
 
-        gradients = defaultdict(lambda: Node(0))
-        
-        def compute_gradients(root_node, path_value):
-            if root_node.child:
-                for child_node, loc_grad in root_node.child:
+            # Records the graph of the function once. A function may return a list of outputs that share intermediate nodes
+            if profiler is not None:
+                start = time.perf_counter()
+            outputs = f(node_vals)
+            if not isinstance(outputs, (list, tuple)):
+                outputs = [outputs]
+            order = topological_order([root_node for root_node in outputs if isinstance(root_node, Node)])
+            if profiler is not None:
+                built = time.perf_counter()
 
-                    # Calculates the partial derivative of the function based on the elementary function used
-                    derivative = loc_grad * path_value  
-                    gradients[child_node] += derivative
+            for root_node in outputs:
+                partial = []
 
-                    # Updates the id of the node to be the partial derivative value and continues traversing
-                    child_node.id = gradients[child_node].real
-                    compute_gradients(child_node, derivative)
+                # Adds value of each output to list of all function values
+                function_vals.append(root_node.real if isinstance(root_node, Node) else root_node)
 
-        # Traverses down the computational graph of the function starting from the root node
-        compute_gradients(root_node, path_value=1)  
-    
-        # Stores the partial derivatives of a function and resets each id of the node
-        if isinstance(val, list):
-            for i in range(len(val)):
-                partial.append(node_vals[i].id)
-                node_vals[i].id = 0
-        else:
-            partial = node_vals.id
-            node_vals.id = 0
+                # Sweeps the stored topological order once per output, starting from that output's root node
+                if isinstance(root_node, Node):
+                    if profiler is None:
+                        _backward(order, root_node)
+                    else:
+                        profiler.sweep(order, root_node)
+
+                # Stores the partial derivatives of the output and resets each id of the node
+                if isinstance(val, list):
+                    for i in range(len(val)):
+                        partial.append(node_vals[i].id)
+                        node_vals[i].id = 0
+                else:
+                    partial = node_vals.id
+                    node_vals.id = 0
+
+                # If a seed vector is provided, the directional derivative is found for each output by taking dot product with partial derivatives
+                if seed is not None:
+                    partial = np.dot(partial, seed)
+
+                # Creates Jacobian that contains the partial derivatives of all outputs
+                Jacobian.append(partial)
+
+            if profiler is not None:
+                profiler.graph(order, built - start, time.perf_counter() - built)
 
-        # If a seed vector is provided, the directional derivative is found for each function by taking dot product with partial derivatives
+            # Frees the swept graph at once
+            if pool is not None:
+                pool.release(order)
+
+    # Return the Jacobian and function values of all inputted functions
+    return function_vals, Jacobian, 
+
+def _second_order(fun, val, tangents):
+    """
+    Runs one reverse sweep over a function whose values are themselves Nodes carrying the tangents in their duals,
+    so each adjoint holds a partial derivative in its real part and its derivative along the tangents in its dual
+    """
+    inner = [Node(val[i], tangents[i]) for i in range(len(val))]
+    nodes = [Node(inner[i], 0, id=0) for i in range(len(val))]
+    output = fun(nodes)
+    if not isinstance(output, Node):
+        return output, np.zeros(len(val)), np.zeros((len(val),) + np.shape(tangents[0]))
+    _backward(topological_order([output]), output)
+
+    # Inputs the output does not depend on keep an adjoint of 0
+    value = output.real.real if isinstance(output.real, Node) else output.real
+    gradient = np.array([node.id.real if isinstance(node.id, Node) else node.id for node in nodes], dtype=float)
+    curvature = np.array([node.id.dual if isinstance(node.id, Node) else np.zeros(np.shape(tangents[0]))
+                          for node in nodes], dtype=float)
+    return value, gradient, curvature
+
+def hvp(fun, val, vec):
+    """
+    Calculate the product of the Hessian of a scalar function with a vector using forward-over-reverse mode
+
+    The function is evaluated once on Nodes whose values are forward mode Nodes seeded with the vector, and swept
+    once in reverse. The adjoints are then forward mode Nodes too, holding the gradient in their real parts and the
+    Hessian-vector product in their duals, at a small constant multiple of the cost of one gradient.
+
+    Parameters
+    ----------
+    fun :
+        The scalar function to be differentiated, must be inputted using Python's lambda syntax
+    val :
+        Value to evaluate the derivatives at. Either a list or a single value
+    vec :
+        The vector to multiply the Hessian by. Must be the same dimension as the val parameter
+
+    Returns
+    -------
+    Value: float
+        The function evaluated at val
+    Gradient: array
+        The partial derivatives of the function with respect to each value (a float for a single value)
+    Product: array
+        The Hessian at val multiplied by vec (a float for a single value)
+
+    Examples
+    --------
+    >>> value, gradient, product = hvp(lambda x: x[0] ** 2 * x[1], [1.0, 2.0], [1.0, 0.0])
+    >>> print(value, gradient, product)
+    2.0 [4. 1.] [4. 2.]
+    """
+    if np.shape(val) != np.shape(vec):
+        raise ValueError('Value and vector are not of same dimension')
+    if not isinstance(val, list):
+        value, gradient, product = _second_order(lambda x: fun(x[0]), [val], [vec])
+        return value, gradient[0], product[0]
+    return _second_order(fun, val, vec)
+
+def hessian(fun, val):
+    """
+    Calculate the Hessian of a scalar function using forward-over-reverse mode
+
+    Every tangent direction is carried at once as a vector dual, as in grad(), so a single forward evaluation and a
+    single reverse sweep give the whole Hessian rather than one Hessian-vector product per direction.
+
+    Parameters
+    ----------
+    fun :
+        The scalar function to be differentiated, must be inputted using Python's lambda syntax
+    val :
+        Value to evaluate the derivatives at. Either a list or a single value
+
+    Returns
+    -------
+    Value: float
+        The function evaluated at val
+    Gradient: array
+        The partial derivatives of the function with respect to each value (a float for a single value)
+    Hessian: array
+        The matrix of second partial derivatives, with shape (n, n) (a float for a single value)
+
+    Examples
+    --------
+    >>> value, gradient, H = hessian(lambda x: x[0] ** 2 * x[1], [1.0, 2.0])
+    >>> print(H)
+    [[4. 2.]
+     [2. 0.]]
+    """
+    if not isinstance(val, list):
+        value, gradient, H = _second_order(lambda x: fun(x[0]), [val], [1.0])
+        return value, gradient[0], H[0]
+    return _second_order(fun, val, np.eye(len(val)))
+
+def _reverse_tape(function, val, seed, workers=None, executor=None):
+    """
+    Runs reverse() by recording every function onto one Tape and sweeping its arrays once per output,
+    with the outputs split across processes if workers or an executor are given
+    """
+    record, parallel_jacobian = _tapes()
+    tape = record(function, val)
+    if workers is not None or executor is not None:
+        rows = parallel_jacobian(tape, None, 'reverse', workers, executor)
+    else:
+        rows = [tape.gradient(j) for j in range(len(tape.outputs))]
+    Jacobian = []
+    for partial in rows:
+        partial = list(partial) if isinstance(val, list) else partial[0]
         if seed is not None:
             partial = np.dot(partial, seed)
-            
-        # Creates Jacobian that contains the partial derivatives of all inputted functions
         Jacobian.append(partial)
-    
-    # Return the Jacobian and function values of all inputted functions
-    return function_vals, Jacobian, 
+    return tape.output_values, Jacobian
 
 if __name__ == "__main__": # pragma: no cover
     pass
\ No newline at end of file
@@ -1,147 +1,222 @@
 """
 A module that defines  helper functions for performing additional operations with the Node class as defined in node.py
+
+Each function is built on a kernel that computes its value and derivative together, sharing the work between them
+(sine and cosine, one exponential for the logistic function, tanh for its own derivative). Kernels run on the math
+module for Python and NumPy scalars, which is much faster than NumPy's dispatch on single values, falling back to
+NumPy where math raises (so domain errors give NaN with a warning, as before), on NumPy for arrays, and on the
+functions of this module when the values are themselves Nodes.
 """
-import numpy as np
 import math
+import sys
+from types import SimpleNamespace
 try:
-    from autodiff_package.node import Node
+    from autodiff_package.node import Node, CONSTANTS, OPERANDS, _any_zero
+    from autodiff_package.lazy import numpy as np
 except:
-    from node import Node
+    from node import Node, CONSTANTS, OPERANDS, _any_zero
+    from lazy import numpy as np
+
+# The math module under NumPy's names of its functions
+_MATH = SimpleNamespace(sin=math.sin, cos=math.cos, tan=math.tan, exp=math.exp, log=math.log, sqrt=math.sqrt,
+                        arcsin=math.asin, arccos=math.acos, arctan=math.atan,
+                        sinh=math.sinh, cosh=math.cosh, tanh=math.tanh)
+
+def _apply(kernel, x):
+    """Runs a kernel on a value with math for scalars, NumPy for arrays, and this module for Nodes"""
+    if isinstance(x, (int, float)):
+        try:
+            return kernel(x, _MATH)
+        except (ValueError, OverflowError, ZeroDivisionError):
+            return kernel(np.float64(x), np)
+    return kernel(x, sys.modules[__name__] if isinstance(x, Node) else np)
+
+def _sin(v, lib):
+    return lib.sin(v), lib.cos(v)
+
+def _cos(v, lib):
+    return lib.cos(v), -lib.sin(v)
+
+def _tan(v, lib):
+    t = lib.tan(v)
+    return t, 1 + t * t
+
+def _exp(v, lib):
+    e = lib.exp(v)
+    return e, e
+
+def _log(v, lib):
+    return lib.log(v), 1 / v
+
+def _logistic(v, lib):
+    s = 1 / (1 + lib.exp(-v))
+    return s, s * (1 - s)
+
+def _arcsin(v, lib):
+    return lib.arcsin(v), 1 / lib.sqrt(1 - v * v)
+
+def _arccos(v, lib):
+    return lib.arccos(v), -1 / lib.sqrt(1 - v * v)
+
+def _arctan(v, lib):
+    return lib.arctan(v), 1 / (1 + v * v)
+
+def _sinh(v, lib):
+    return lib.sinh(v), lib.cosh(v)
+
+def _cosh(v, lib):
+    return lib.cosh(v), lib.sinh(v)
+
+def _tanh(v, lib):
+    t = lib.tanh(v)
+    return t, 1 - t * t
+
+def _sqrt(v, lib):
+    r = lib.sqrt(v)
+    return r, 0.5 / r
+
+def _inverse_log(base):
+    """1 / log(base), dividing with NumPy for base 1 so that it is inf with a warning, as log(x) / log(1) was"""
+    log_base = _apply(_log, base)[0]
+    if _any_zero(log_base):
+        log_base = np.asarray(log_base, dtype=float)
+    return 1 / log_base
+
+def _unary(x, kernel, op):
+    """Returns the Node for a kernel applied to a Node, with the derivative as the local partial of the reverse sweep"""
+    value, derivative = _apply(kernel, x.real)
+    return Node(value, derivative * x.dual, parents = (x,), partials = (derivative,), op = op)
+
+def _method(x, name, *args):
+    """Calls the method of the same name on values that define their own elementary functions, such as TaylorNodes"""
+    if getattr(type(x), '_elementary', False):
+        return getattr(x, name)(*args)
+    raise TypeError(f"Unsupported type `{type(x)}`")
 
 def sin(self):
     """Returns sine of the given node, integer, or float value"""
-    if not isinstance(self, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(self)}`")
-    if isinstance(self,(int,float)):
-        return np.sin(self)
+    if not isinstance(self, OPERANDS):
+        return _method(self, 'sin')
+    if not isinstance(self, Node):
+        return _apply(_sin, self)[0]
     else:
-        local_grads = [(self, np.cos(self.real))]
-        return Node(np.sin(self.real), np.cos(self.real) * self.dual, child = local_grads)
+        return _unary(self, _sin, 'sin')
 
 def cos(self):
     """Returns cosine of the given node, integer, or float value"""
-    if not isinstance(self, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(self)}`")
-    if isinstance(self,(int,float)):
-        return np.cos(self)
-    local_grads = [(self, -np.sin(self.real))]
-    return Node(np.cos(self.real), -1 * np.sin(self.real) * self.dual, child = local_grads)
+    if not isinstance(self, OPERANDS):
+        return _method(self, 'cos')
+    if not isinstance(self, Node):
+        return _apply(_cos, self)[0]
+    return _unary(self, _cos, 'cos')
 
 def tan(self):
     """Returns tangent at the given node, integer, or float"""
-    if not isinstance(self, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(self)}`")
-    if isinstance(self,(int,float)):
-        return np.tan(self)
-    local_grads = [(self, (1/np.cos(self.real))**2)]
-    return Node(np.tan(self.real), self.dual/np.cos(self.real)** 2, child = local_grads)
+    if not isinstance(self, OPERANDS):
+        return _method(self, 'tan')
+    if not isinstance(self, Node):
+        return _apply(_tan, self)[0]
+    return _unary(self, _tan, 'tan')
 
 def exp(self):
     """Returns the value of e raised to the power of the given node, integer, or float"""
-    if not isinstance(self, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(self)}`")
-    if isinstance(self,(int,float)):
-        return np.exp(self)
-    return self.__rpow__(math.e)
+    if not isinstance(self, OPERANDS):
+        return _method(self, 'exp')
+    if not isinstance(self, Node):
+        return _apply(_exp, self)[0]
+    # Recorded as e ** self, so tapes and generated code treat it like any other power of a constant
+    value, derivative = _apply(_exp, self.real)
+    return Node(value, derivative * self.dual, parents = (self,), partials = (derivative,), op = 'rpow', const = math.e)
 
 def log(self):
     """Returns the natural logarithm of the given node, integer, or float"""
-    if not isinstance(self, (int,float, Node)):
-        raise TypeError(f"Unsupported type `{type(self)}`")
+    if not isinstance(self, OPERANDS):
+        return _method(self, 'log')
     if isinstance(self,Node):
-        if self.real == 0:
+        if _any_zero(self.real):
             raise ValueError("Cannot take log of 0")
-        local_grads = [(self, 1/self.real)]
-        return Node(np.log(self.real), 1/self.real * self.dual, child = local_grads)
-    if self == 0:
+        return _unary(self, _log, 'log')
+    if _any_zero(self):
         raise ValueError("Cannot take log of 0")
-    return np.log(self)
+    return _apply(_log, self)[0]
 
 
 def logbase(self, other):
     """Returns the log of a given node, integer, or float with a base of other, an integer or float"""
-    if not isinstance(other, (int,float)):
+    if not isinstance(other, CONSTANTS):
         raise TypeError(f"Unsupported type `{type(other)}`")
-    if not isinstance(self, (int,float,Node)):
-        raise TypeError(f"Unsupported type `{type(self)}`")
-    if isinstance(self,(int,float)):
-        return np.log(self) / np.log(other)
-    local_grads = [(self, 1/self.real/np.log(other))]
-    return Node(np.log(self.real) / np.log(other), 1 / self.real / np.log(other) * self.dual, child = local_grads)
+    if not isinstance(self, OPERANDS):
+        return _method(self, 'logbase', other)
+    scale = _inverse_log(other)
+    if not isinstance(self, Node):
+        return _apply(_log, self)[0] * scale
+    value, derivative = _apply(_log, self.real)
+    return Node(value * scale, derivative * scale * self.dual, parents = (self,), partials = (derivative * scale,), op = 'logbase', const = other)
 
 def logistic(self):
     """Returns the logistic function of the given node, integer, or float"""
-    if not isinstance(self, (Node,int,float)):
-        raise TypeError(f"Unsupported type `{type(self)}`")
-    if isinstance(self, (int, float)):
-        return 1/(1 + np.exp(-self))
-    negated = -self.real
-    local_grads = [(self, exp(self.real)/((1+exp(self.real))**2))]
-    return Node(1/(1 + exp(negated)), exp(self.real)/((1+exp(self.real))**2), child = local_grads)
+    if not isinstance(self, OPERANDS):
+        return _method(self, 'logistic')
+    if not isinstance(self, Node):
+        return _apply(_logistic, self)[0]
+    return _unary(self, _logistic, 'logistic')
 
 
 def arcsin(x):
     """Returns the inverse sine of the given node, integer, or float"""
-    if not isinstance(x, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(x)}`")
-    if isinstance(x,(int,float)):
-        return np.arcsin(x)
-    local_grads = [(x, 1/np.sqrt(1-x.real**2))]
-    return Node(np.arcsin(x.real), x.dual/np.sqrt(1-(x.real**2)), child = local_grads)
+    if not isinstance(x, OPERANDS):
+        return _method(x, 'arcsin')
+    if not isinstance(x, Node):
+        return _apply(_arcsin, x)[0]
+    return _unary(x, _arcsin, 'arcsin')
 
 def arccos(x):
     """Returns the inverse of the cosine of the given node, integer, or float"""
-    if not isinstance(x, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(x)}`")
-    if isinstance(x,(int,float)):
-        return np.arccos(x)
-    local_grads = [(x, -1/np.sqrt(1-x.real**2))]
-    return Node(np.arccos(x.real), -x.dual/np.sqrt(1-x.real**2), child = local_grads)
+    if not isinstance(x, OPERANDS):
+        return _method(x, 'arccos')
+    if not isinstance(x, Node):
+        return _apply(_arccos, x)[0]
+    return _unary(x, _arccos, 'arccos')
 
 def arctan(x):
     """Returns the inverse tangent of the given node, integer, or float"""
-    if not isinstance(x, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(x)}`")
-    if isinstance(x,(int,float)):
-        return np.arctan(x)
-    local_grads = [x, 1/(1+x.real**2)]
-    return Node(np.arctan(x.real), x.dual/(1+x.real**2), child = local_grads)
+    if not isinstance(x, OPERANDS):
+        return _method(x, 'arctan')
+    if not isinstance(x, Node):
+        return _apply(_arctan, x)[0]
+    return _unary(x, _arctan, 'arctan')
 
 def sinh(x):
     """Returns the hyperbolic sine of the given node, integer, or float"""
-    if not isinstance(x, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(x)}`")
-    if isinstance(x,(int,float)):
-        return np.sinh(x)
-    local_grads = [(x, 1*np.cosh(x.real))]
-    return Node(np.sinh(x.real), x.dual*np.cosh(x.real), child = local_grads)
+    if not isinstance(x, OPERANDS):
+        return _method(x, 'sinh')
+    if not isinstance(x, Node):
+        return _apply(_sinh, x)[0]
+    return _unary(x, _sinh, 'sinh')
 
 def cosh(x):
     """Returns the hyperbolic cosine of the given node, integer, or float"""
-    if not isinstance(x, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(x)}`")
-    if isinstance(x,(int,float)):
-        return np.cosh(x)
-    local_grads = [x, np.sinh(x.real)]
-    return Node(np.cosh(x.real), x.dual*np.sinh(x.real), child = local_grads)
+    if not isinstance(x, OPERANDS):
+        return _method(x, 'cosh')
+    if not isinstance(x, Node):
+        return _apply(_cosh, x)[0]
+    return _unary(x, _cosh, 'cosh')
 
 def tanh(x):
     """Returns the hyperbolic tangent of the given node, integer, or float"""
-    if not isinstance(x, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(x)}`")
-    if isinstance(x,(int,float)):
-        return np.tanh(x)
-    local_grads = 1/(np.cosh(x.real)**2)
-    return Node(np.tanh(x.real), x.dual/(np.cosh(x.real)**2), child = local_grads)
+    if not isinstance(x, OPERANDS):
+        return _method(x, 'tanh')
+    if not isinstance(x, Node):
+        return _apply(_tanh, x)[0]
+    return _unary(x, _tanh, 'tanh')
 
 def sqrt(x):
     """Returns the square root of the given node, integer, or float"""
-    if not isinstance(x, (int, float, Node)):
-        raise TypeError(f"Unsupported type `{type(x)}`")
-    if isinstance(x,(int,float)):
-        return np.sqrt(x)
-    local_grads = [(x, 1/(2*np.sqrt(x.real)))]
-    return Node(np.sqrt(x.real), x.dual/(2*np.sqrt(x.real)), child = local_grads)
+    if not isinstance(x, OPERANDS):
+        return _method(x, 'sqrt')
+    if not isinstance(x, Node):
+        return _apply(_sqrt, x)[0]
+    return _unary(x, _sqrt, 'sqrt')
 
 
 if __name__=='__main__': # pragma: no cover
@@ -0,0 +1,42 @@
+"""
+A module that defers importing NumPy until a value actually needs it.
+
+The modules a scalar function is differentiated with (node.py, functions.py, differentiate.py) refer to NumPy through
+`numpy`, a stand-in that imports NumPy the first time one of its attributes is used and keeps that attribute, so later
+uses are ordinary attribute lookups. Scalar values are handled by the math module, so reverse() at Python numbers and
+grad() at a single Python number never import NumPy, while arrays and NumPy scalars work as before. grad() at a list of
+values does import it: each input carries its whole tangent as an array and the Jacobian rows are arrays, as are the
+results of grad_batch(), hessian(), and the jvp and vjp functions.
+"""
+import importlib
+import sys
+
+class LazyModule:
+    """Stands in for a module, importing it the first time one of its attributes is used"""
+
+    def __init__(self, name):
+        self.__name = name
+
+    def __getattr__(self, attribute):
+        value = getattr(importlib.import_module(self.__name), attribute)
+        setattr(self, attribute, value)
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self.__name}'>"
+
+numpy = LazyModule('numpy')
+
+class _NumPyValueType(type):
+    """Metaclass of NumPyValue, checking instances against NumPy's types only once NumPy has been imported"""
+
+    def __instancecheck__(cls, value):
+        module = sys.modules.get('numpy')
+        return module is not None and isinstance(value, (module.number, module.ndarray))
+
+class NumPyValue(metaclass=_NumPyValueType):
+    """
+    NumPy scalars and arrays, for isinstance checks that do not import NumPy
+
+    No NumPy value can exist before something has imported NumPy, so while it is not imported nothing is an instance.
+    """
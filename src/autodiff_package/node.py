@@ -1,108 +1,148 @@
 """
 A module to define the Node data structure class and it's associated dunder methods. 
 """
-import numpy as np
+import gc
+import math
+import threading
+from sys import getrefcount
+try:
+    from autodiff_package.lazy import numpy as np, NumPyValue
+except:
+    from lazy import numpy as np, NumPyValue
+
+# Plain values a Node can be combined with: Python and NumPy scalars, and NumPy arrays for elementwise evaluation.
+# NumPy values are checked last, and without importing NumPy, so Python numbers never need it
+CONSTANTS = (int, float, NumPyValue)
+
+# While a function is traced for a compiled tape, every comparison made with a Node is logged as (operator, node,
+# other operand, result), so the branch it decided can be checked again at new inputs. Each thread has its own stack
+# of logs, one per trace in progress, and comparisons go to the innermost, so traces in other threads and traces
+# nested inside a traced function each keep their own comparisons
+_tracing = threading.local()
+
+def comparison_logs():
+    """Returns this thread's stack of comparison logs, to which a trace pushes its log and pops it when it is done"""
+    logs = getattr(_tracing, 'logs', None)
+    if logs is None:
+        logs = _tracing.logs = []
+    return logs
 
 class Node:
     """
-    A data structure containing a real value, a dual value, a reference to child nodes, and an id value. 
+    A data structure containing a real value, a dual value, references to parent nodes with their local partial derivatives, and an id value. 
     
     This is used for both forward and reverse mode differentiation, 
-    where forward uses self.real and self. dual, and reverse uses self.real, self.child, and self.id. 
+    where forward uses self.real and self. dual, and reverse uses self.real, self.parents, self.partials, and self.id. 
+    The real value may be a NumPy array, in which case every operation is applied elementwise.
+    Nodes use __slots__ and keep their parents and partials in two parallel tuples, so a large graph does not pay for
+    an instance dictionary and a list of pairs per operation.
     The module also has defined dunder methods that specify how to perform basic operations with Node data structures. 
     """
+
+    __slots__ = ('real', 'dual', 'parents', 'partials', 'id', 'op', 'const')
+
+    # NumPy defers to the reflected methods of a Node, so an array on the left of an operator combines with the
+    # whole Node elementwise rather than making an object array of one Node per element
+    __array_ufunc__ = None
     
-    def __init__(self, real, dual=1, child=None, id=None):
-        """Initializes a new Node with an inputted real value, dual value of 1, and a child and id of None"""
+    def __init__(self, real, dual=1, child=None, id=None, parents=(), partials=(), op=None, const=None):
+        """
+        Initializes a new Node with an inputted real value, dual value of 1, no parents, and an id of None
+
+        Nodes made by an operation also record the name of that operation in op, and the constant operand
+        it was combined with (if any) in const, so that a recorded graph can be evaluated again at new inputs.
+        """
         self.real = real
         self.dual = dual
-        self.child = child
+        if child:
+            parents = tuple(node for node, _ in child)
+            partials = tuple(loc_grad for _, loc_grad in child)
+        self.parents = parents
+        self.partials = partials
         self.id = id
+        self.op = op
+        self.const = const
+
+    @property
+    def child(self):
+        """The list of (parent node, local partial derivative) pairs this node was computed from, or None for an input"""
+        if not self.parents:
+            return None
+        return list(zip(self.parents, self.partials))
 
     def __add__(self, other):
         """Adds a node with another node, integer, or a float"""
-        if not isinstance(other, (int, float, Node)):
-            raise TypeError(f"Unsupported type `{type(other)}`")
+        if not isinstance(other, OPERANDS):
+            # Other types get the chance to handle the operation, as Tracers recording a tape do, and
+            # Python raises TypeError if none of them can
+            return NotImplemented
         
-        if isinstance(other, (int, float)):
-            local_grads = [(self, 1)]
-            return Node(other + self.real, self.dual, child = local_grads)
+        if not isinstance(other, Node):
+            return Node(other + self.real, self.dual, parents = (self,), partials = (1,), op = 'add', const = other)
         else:
-            local_grads = [(self, 1), (other, 1)]
-            return Node(self.real + other.real, self.dual + other.dual, child = local_grads)
+            return Node(self.real + other.real, self.dual + other.dual, parents = (self, other), partials = (1, 1), op = 'add')
 
 
     def __mul__(self, other):
         """"Multiplies a node with another node, integer, or a float"""
-        if not isinstance(other, (int, float, Node)):
-            raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(other, (int, float)):
-            local_grads = [(self, other)]
-            return Node(other * self.real, other * self.dual, child = local_grads)
+        if not isinstance(other, OPERANDS):
+            return NotImplemented
+        if not isinstance(other, Node):
+            return Node(other * self.real, other * self.dual, parents = (self,), partials = (other,), op = 'mul', const = other)
         else:
-            local_grads = [(self, other.real), (other, self.real)]
             return Node(
                 self.real * other.real,
                 self.real * other.dual + self.dual * other.real,
-                child = local_grads)
+                parents = (self, other), partials = (other.real, self.real), op = 'mul')
 
     def __sub__(self, other):
         """Subtracts a node, integer, or a float from a node"""
-        if not isinstance(other, (int, float, Node)):
-            raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(other, (int, float)):
-            local_grads = [(self, 1)]
-            return Node(self.real - other, self.dual, child = local_grads)
+        if not isinstance(other, OPERANDS):
+            return NotImplemented
+        if not isinstance(other, Node):
+            return Node(self.real - other, self.dual, parents = (self,), partials = (1,), op = 'sub', const = other)
         else:
-            local_grads = [(self, 1), (other, -1)]
-            return Node(self.real - other.real, self.dual - other.dual, child = local_grads)
+            return Node(self.real - other.real, self.dual - other.dual, parents = (self, other), partials = (1, -1), op = 'sub')
 
     def __pow__(self, other):
         """Raises a node to the power of another node, integer, or a float"""
-        if not isinstance(other, (int, float, Node)):
-            raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(other, (int, float)):
-            local_grads = [(self, other*(self.real ** (other - 1)))]
-            return Node(self.real ** other, other * self.real ** (other - 1) * self.dual, child = local_grads)
+        if not isinstance(other, OPERANDS):
+            return NotImplemented
+        if not isinstance(other, Node):
+            return Node(self.real ** other, other * self.real ** (other - 1) * self.dual, parents = (self,), partials = (other*(self.real ** (other - 1)),), op = 'pow', const = other)
         else:
-            local_grads = [(self, other.real*(self.real ** (other.real - 1))), (other, (self.real ** other.real) * np.log(self.real))]
-            return Node(self.real ** other.real, (self.real * other.real)**(other.real - 1) * self.dual + np.log(self.real) * self.real ** other.real * other.dual, child = local_grads)
+            return Node(self.real ** other.real, other.real * self.real ** (other.real - 1) * self.dual + _log(self.real) * self.real ** other.real * other.dual, parents = (self, other), partials = (other.real*(self.real ** (other.real - 1)), (self.real ** other.real) * _log(self.real)), op = 'pow')
     
     def __truediv__(self, other):
         """Divides a node by another node, integer, or float"""
-        if not isinstance(other, (int, float, Node)):
-            raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(other, (int, float)):
-            if other == 0:
+        if not isinstance(other, OPERANDS):
+            return NotImplemented
+        if not isinstance(other, Node):
+            if _any_zero(other):
                 raise ZeroDivisionError("division by zero")
-            local_grads = [(self, 1/other)]
-            return Node(self.real / other, self.dual / other, child = local_grads)
+            return Node(self.real / other, self.dual / other, parents = (self,), partials = (1/other,), op = 'div', const = other)
         else:
-            if other.real == 0:
+            if _any_zero(other.real):
                 raise ZeroDivisionError("division by zero")
-            local_grads = [(self, 1/other.real),(other, (-self.real)/(other.real ** 2))]
-            return Node(self.real / other.real, (self.dual*other.real - self.real*other.dual)/(other.real ** 2), child = local_grads)
+            return Node(self.real / other.real, (self.dual*other.real - self.real*other.dual)/(other.real ** 2), parents = (self, other), partials = (1/other.real, (-self.real)/(other.real ** 2)), op = 'div')
     
     def __rpow__(self, other):
         """Raises an integer or float to the power of a node"""
-        if not isinstance(other, (int, float, Node)):
+        if not isinstance(other, OPERANDS):
             raise TypeError(f"Unsupported type `{type(other)}`")
-        local_grads = [(self, (other ** self.real) * np.log(other))]
-        return Node(other ** self.real, other ** self.real * np.log(other) * self.dual, child = local_grads)
+        return Node(other ** self.real, other ** self.real * _log(other) * self.dual, parents = (self,), partials = ((other ** self.real) * _log(other),), op = 'rpow', const = other)
 
     def __rtruediv__(self, other):
         """Divides an integer or float by a node"""
-        if not isinstance(other, (int, float)):
+        if not isinstance(other, CONSTANTS):
             raise TypeError(f"Unsupported type `{type(other)}`")
-        local_grads = [(self, -other/(self.real**2))]
-        return Node(other/self.real, other/self.dual, child = local_grads)
+        return Node(other/self.real, -other * self.dual / (self.real**2), parents = (self,), partials = (-other/(self.real**2),), op = 'rdiv', const = other)
     
     def __rsub__(self, other):
         """Substracts a node from an integer or float"""
-        if not isinstance(other, (int, float)):
+        if not isinstance(other, CONSTANTS):
             raise TypeError(f"Unsupported type `{type(other)}`")
-        local_grads = [(self, -1)]
-        return Node(other - self.real, -self.dual, child = local_grads)
+        return Node(other - self.real, -self.dual, parents = (self,), partials = (-1,), op = 'rsub', const = other)
     
     def __radd__(self, other):
         """Adds a node to an integer or float"""
@@ -114,34 +154,218 @@ class Node:
     
     def __neg__(self):
         """Sets a node to have a negative value"""
-        local_grads = [(self, -1)]
-        return Node(-self.real, -self.dual, child = local_grads)
+        return Node(-self.real, -self.dual, parents = (self,), partials = (-1,), op = 'neg')
 
     def __gt__(self,other):
-        if not isinstance(other,(Node,int,float)):
+        if not isinstance(other, OPERANDS):
             raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(self,(int,float)):
+        if not isinstance(self, Node):
             return self.real > other
-        return self.real > other.real
+        result = self.real > other.real
+        logs = getattr(_tracing, 'logs', None)
+        if logs:
+            logs[-1].append(('gt', self, other, result))
+        return result
 
     def __lt__(self,other):
-        if not isinstance(other,(Node,int,float)):
+        if not isinstance(other, OPERANDS):
             raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(self,(int,float)):
+        if not isinstance(self, Node):
             return self.real < other
-        return self.real < other.real
+        result = self.real < other.real
+        logs = getattr(_tracing, 'logs', None)
+        if logs:
+            logs[-1].append(('lt', self, other, result))
+        return result
 
     def __ge__(self,other):
-        if not isinstance(other,(Node,int,float)):
+        if not isinstance(other, OPERANDS):
             raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(self,(int,float)):
+        if not isinstance(self, Node):
             return self.real >= other
-        return self.real >= other.real
+        result = self.real >= other.real
+        logs = getattr(_tracing, 'logs', None)
+        if logs:
+            logs[-1].append(('ge', self, other, result))
+        return result
 
     def __le__(self,other):
-        if not isinstance(other,(Node,int,float)):
+        if not isinstance(other, OPERANDS):
             raise TypeError(f"Unsupported type `{type(other)}`")
-        if isinstance(self,(int,float)):
+        if not isinstance(self, Node):
             return self.real <= other
-        return self.real <= other.real
+        result = self.real <= other.real
+        logs = getattr(_tracing, 'logs', None)
+        if logs:
+            logs[-1].append(('le', self, other, result))
+        return result
+
+# Everything a Node can be combined with
+OPERANDS = (Node,) + CONSTANTS
+
+def _log(value):
+    """Natural logarithm of a plain value, or of a Node when Nodes are nested to take higher derivatives"""
+    if isinstance(value, Node):
+        try:
+            from autodiff_package.functions import log
+        except:
+            from functions import log
+        return log(value)
+    if isinstance(value, (int, float)) and value > 0:
+        return math.log(value)
+    return np.log(value)
+
+def _any_zero(value):
+    """Whether a value, or any element of an array, is 0, without NumPy's dispatch for scalars"""
+    if isinstance(value, (int, float)):
+        return value == 0
+    return np.any(value == 0)
+
+def topological_order(roots):
+    """
+    Returns every node reachable from the given root nodes, ordered so that each node comes after all of its children
+
+    The graph is walked iteratively, so shared subexpressions are visited once and deep graphs
+    do not run into Python's recursion limit.
+    """
+    order = []
+    visited = set()
+    stack = [(root, False) for root in reversed(roots)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if node in visited:
+            continue
+        visited.add(node)
+        stack.append((node, True))
+        for child_node in node.parents:
+            if child_node not in visited:
+                stack.append((child_node, False))
+    return order
+
+class NodePool:
+    """
+    An arena for the graphs of functions that are differentiated over and over, as in reverse(..., pool=pool).
+
+    A graph of Nodes has no reference cycles, so it is freed by reference counting alone, and CPython's allocator hands
+    its memory straight to the Nodes of the next graph. What a large graph does cost is the cyclic garbage collector,
+    which is triggered again and again while the graph is allocated and then walks every Node alive. While a pool is
+    active (as a context manager, or inside reverse(..., pool=pool)) the collector is paused, and release(nodes) drops
+    the references of a swept graph in bulk, so the whole graph is freed at once instead of one deep chain at a time.
+    Released Nodes keep their values but lose their parents, so only graphs nothing else differentiates should be released.
+
+    Pausing the collector is process-wide: while any pool is active, no thread runs cyclic collections. Pools count
+    how many are active under a lock, so the collector is paused by the first pool entered in any thread and only
+    restored (if it was enabled then) when the last one exits, however their uses overlap.
+
+    With reuse=True, released Nodes that nothing else refers to are kept on a free list instead, and Nodes created in
+    the thread the pool is active in are taken from it before new ones are allocated. This needs a Python-level
+    Node.__new__, which the first reusing pool installs and which CPython cannot remove again, and which makes every
+    Node created afterwards about twice as slow to create as allocating it, so pools only free Nodes by default.
+    The free list holds on to as many Nodes as the largest graph released.
+
+    stats() reports the Nodes released, the largest graph, the collections run while the pool was active, and for
+    pools that reuse Nodes the Nodes allocated and reused, in total and for the latest call.
+    """
+
+    def __init__(self, reuse=False):
+        """Initializes a pool with no graphs released, which keeps released Nodes for reuse if reuse is True"""
+        self.reuse = reuse
+        self.calls = 0
+        self.released = 0
+        self.largest = 0
+        self.collections = 0
+        self.allocated = 0
+        self.reused = 0
+        self.last = {'released': 0, 'allocated': 0, 'reused': 0, 'collections': 0}
+        self._previous = []
+        self._free = []
+
+    def __enter__(self):
+        global _paused, _was_enabled
+        with _pause_lock:
+            if not _paused:
+                _was_enabled = gc.isenabled()
+                gc.disable()
+            _paused += 1
+            if self.reuse and '__new__' not in Node.__dict__:
+                Node.__new__ = _reused_new
+        self._previous.append((_collections(), self.allocated, self.reused, getattr(_reusing, 'pool', None)))
+        if self.reuse:
+            _reusing.pool = self
+        self.last = {'released': 0, 'allocated': 0, 'reused': 0, 'collections': 0}
+        return self
+
+    def __exit__(self, *exc):
+        global _paused
+        start, allocated, reused, _reusing.pool = self._previous.pop()
+        with _pause_lock:
+            _paused -= 1
+            if not _paused and _was_enabled:
+                gc.enable()
+        collections = _collections() - start
+        self.collections += collections
+        self.last['collections'] = collections
+        self.last['allocated'] = self.allocated - allocated
+        self.last['reused'] = self.reused - reused
+        self.calls += 1
+
+    def release(self, nodes):
+        """
+        Drops the parents and partial derivatives of the given list of Nodes, freeing the graph between them at once,
+        or keeping the Nodes only the list refers to for reuse
+        """
+        count = 0
+        if self.reuse:
+            # From the outputs back, so each Node has lost the references of the Nodes computed from it when it is reached.
+            # The list, the loop variable, and getrefcount's argument are then its only references
+            free = self._free
+            for node in reversed(nodes):
+                node.parents = node.partials = ()
+                count += 1
+                if getrefcount(node) == 3:
+                    free.append(node)
+        else:
+            for node in nodes:
+                node.parents = node.partials = ()
+                count += 1
+        self.released += count
+        self.largest = max(self.largest, count)
+        self.last['released'] += count
+
+    def stats(self):
+        """
+        Returns the calls made, the Nodes released, the largest graph released, the collections run, the Nodes
+        allocated and reused, and the counts for the latest call
+        """
+        return {'calls': self.calls,
+                'released': self.released,
+                'largest': self.largest,
+                'collections': self.collections,
+                'allocated': self.allocated,
+                'reused': self.reused,
+                'last': dict(self.last)}
+
+# The number of pools active in any thread, and whether the collector was enabled before the first of them paused it
+_pause_lock = threading.Lock()
+_paused = 0
+_was_enabled = True
+
+# The innermost pool reusing Nodes in each thread
+_reusing = threading.local()
+
+def _reused_new(cls, *args, **kwargs):
+    """Node.__new__ once a pool reuses Nodes, taking Nodes from the free list of the pool active in this thread"""
+    pool = getattr(_reusing, 'pool', None)
+    if pool is not None and cls is Node:
+        if pool._free:
+            pool.reused += 1
+            return pool._free.pop()
+        pool.allocated += 1
+    return object.__new__(cls)
 
+def _collections():
+    """The number of garbage collections run so far, over all generations"""
+    return sum(generation['collections'] for generation in gc.get_stats())
@@ -0,0 +1,115 @@
+"""
+A module that optimizes recorded tapes before they are evaluated repeatedly.
+
+optimize(tape) returns a smaller tape that computes the same outputs, using three passes:
+constant folding (operations whose parents are all constants become constants, and constants feeding an operation
+become its constant operand), common subexpression elimination (entries with the same operation, parents, and constant
+operand are merged), and dead code elimination (entries that no output depends on are dropped).
+"""
+import numpy as np
+try:
+    from autodiff_package.tape import Tape, OPS
+except:
+    from tape import Tape, OPS
+
+# Operations whose two parents can be swapped
+_COMMUTATIVE = ('add', 'mul')
+
+# The operation a two-parent operation becomes when its first parent is a constant, so the constant is its operand.
+# Operations not listed here (such as registered primitives) keep their constant parents
+_CONSTANT_FIRST = {'add': 'add', 'mul': 'mul', 'sub': 'rsub', 'div': 'rdiv', 'pow': 'rpow'}
+
+def optimize(tape):
+    """
+    Fold constants, merge common subexpressions, and drop dead entries of a tape
+
+    Parameters
+    ----------
+    tape :
+        The Tape to optimize. It is not modified
+
+    Returns
+    -------
+    Tape: optimized
+        A new tape with the same inputs, outputs, and kept entries, and its values and partial derivatives
+        computed at the values the original tape holds
+    Report: dict
+        The number of entries before and after, and how many were folded into constants, merged with an
+        identical entry, or removed because no output depended on them
+
+    Examples
+    --------
+    >>> tape = record(lambda x: f.sin(x[0]) * x[1] + f.sin(x[0]) * x[1] + 2 * 3, [1.0, 2.0])
+    >>> optimized, report = optimize(tape)
+    >>> print(report['before'], report['after'])
+    8 6
+    """
+    ops = tape.ops
+    parents = tape.parents[:tape.size].tolist()
+    const = tape.const[:tape.size].tolist()
+    values = tape.values[:tape.size].tolist()
+    input_set = set(tape.inputs.tolist())
+
+    # Folding and merging, in one pass in topological order. Each new entry is (op, parents, const, value)
+    entries = []
+    index = [0] * tape.size
+    seen = {}
+    folded = 0
+    merged = 0
+    for i in range(tape.size):
+        op = ops[i]
+        if i in input_set:
+            index[i] = len(entries)
+            entries.append(('input', (), None, values[i]))
+            continue
+
+        new_parents = tuple(index[p] for p in parents[i] if p >= 0)
+        operand = None if np.isnan(const[i]) else const[i]
+        if op != 'const' and all(entries[p][0] == 'const' for p in new_parents):
+            op, new_parents, operand = 'const', (), values[i]
+            folded += 1
+        elif len(new_parents) == 2 and op in _CONSTANT_FIRST and entries[new_parents[1]][0] == 'const':
+            new_parents, operand = new_parents[:1], entries[new_parents[1]][3]
+        elif len(new_parents) == 2 and op in _CONSTANT_FIRST and entries[new_parents[0]][0] == 'const':
+            op, new_parents, operand = _CONSTANT_FIRST[op], new_parents[1:], entries[new_parents[0]][3]
+        if op == 'const':
+            operand = values[i]
+        if op in _COMMUTATIVE and len(new_parents) == 2:
+            new_parents = tuple(sorted(new_parents))
+
+        key = (op, new_parents, operand)
+        if key in seen:
+            index[i] = seen[key]
+            merged += 1
+            continue
+        seen[key] = index[i] = len(entries)
+        entries.append((op, new_parents, operand, values[i]))
+
+    # Dead code elimination, keeping the inputs, outputs, and kept entries
+    live = [False] * len(entries)
+    for i in list(tape.inputs) + list(tape.outputs) + list(tape.kept):
+        live[index[i]] = True
+    for i in range(len(entries) - 1, -1, -1):
+        if live[i]:
+            for p in entries[i][1]:
+                live[p] = True
+
+    optimized = Tape(sum(live))
+    compact = {}
+    for i, (op, new_parents, operand, value) in enumerate(entries):
+        if live[i]:
+            compact[i] = optimized.append(op, value, [compact[p] for p in new_parents],
+                                          [0.0] * len(new_parents), operand)
+    optimized.inputs = np.array([compact[index[i]] for i in tape.inputs], dtype=np.int64)
+    optimized.outputs = np.array([compact[index[i]] for i in tape.outputs], dtype=np.int64)
+    optimized.kept = [compact[index[i]] for i in tape.kept]
+
+    # Recomputes every partial derivative, as folding changes which operand of an operation is a constant
+    if len(optimized.inputs):
+        optimized.forward(optimized.values[optimized.inputs])
+    report = {'before': tape.size,
+              'after': optimized.size,
+              'folded': folded,
+              'merged': merged,
+              'removed': len(entries) - optimized.size}
+    return optimized, report
@@ -0,0 +1,77 @@
+"""
+A module that splits the columns or rows of a Jacobian across the processes of a concurrent.futures executor.
+
+Functions written with lambdas cannot be pickled, so they are never sent to the workers. Instead the functions are
+recorded once on a Tape, which holds only NumPy arrays, and each worker receives the tape and a share of the work:
+a block of seed columns to sweep forward, or a block of outputs to sweep in reverse.
+"""
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+def _columns(tape, seed):
+    """Worker task: the tangents of every output along each column of seed"""
+    return tape.tangents(seed)
+
+def _rows(tape, outputs):
+    """Worker task: the gradient of each of the given outputs"""
+    return np.array([tape.gradient(j) for j in outputs]).reshape(len(outputs), len(tape.inputs))
+
+def _map(task, tape, blocks, workers, executor):
+    """Runs task on the tape and each block, in the given executor or in a new process pool, and returns the results in order"""
+    if executor is not None:
+        return [future.result() for future in [executor.submit(task, tape, block) for block in blocks]]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(task, [tape] * len(blocks), blocks))
+
+def _split(count, workers):
+    """Splits range(count) into at most workers contiguous blocks, without empty ones"""
+    return [block for block in np.array_split(np.arange(count), max(1, min(workers, count))) if len(block)]
+
+def parallel_jacobian(tape, seed=None, mode='forward', workers=None, executor=None):
+    """
+    Calculate the Jacobian of a recorded tape, splitting its columns (forward mode) or rows (reverse mode) across processes
+
+    Parameters
+    ----------
+    tape :
+        The Tape to differentiate, as returned by record
+    seed :
+        Optional matrix with one row per input and one column per direction to take derivatives in.
+        Defaults to the identity, giving the full Jacobian
+    mode :
+        'forward' to send each worker a block of seed columns, or 'reverse' to send each worker a block of outputs
+    workers :
+        The number of blocks to split the work into, and the size of the process pool if no executor is given.
+        Defaults to the number of CPUs
+    executor :
+        Optional concurrent.futures executor to submit the blocks to, which is left running afterwards
+
+    Returns
+    -------
+    Jacobian: array
+        The derivatives of every output, with one row per output and one column per column of seed
+
+    Examples
+    --------
+    >>> tape = record([lambda x: x[0] * x[1], lambda x: sin(x[0])], [2.0, 0.0])
+    >>> print(parallel_jacobian(tape, workers=2))
+    [[ 0.          2.        ]
+     [-0.41614684  0.        ]]
+    """
+    if mode not in ('forward', 'reverse'):
+        raise ValueError(f"Unknown mode `{mode}`")
+    if workers is None:
+        workers = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    n = len(tape.inputs)
+    seed = np.eye(n) if seed is None else np.asarray(seed, dtype=float).reshape(n, -1)
+
+    if mode == 'forward':
+        blocks = [seed[:, block] for block in _split(seed.shape[1], workers)]
+        results = _map(_columns, tape, blocks, workers, executor)
+        return np.concatenate(results, axis=1) if results else np.zeros((len(tape.outputs), seed.shape[1]))
+
+    blocks = [block.tolist() for block in _split(len(tape.outputs), workers)]
+    results = _map(_rows, tape, blocks, workers, executor)
+    jacobian = np.concatenate(results, axis=0) if results else np.zeros((0, n))
+    return jacobian @ seed
@@ -0,0 +1,140 @@
+"""
+A module for defining new primitive operations with their own derivative rules.
+
+@primitive(vjp=...) or @primitive(jvp=...) turns a function of plain values into an operation on Nodes, so a function
+such as erf, softplus, or a call into a compiled model becomes a single node of the graph with the derivative given,
+instead of many small operations. Because every mode of this package differentiates a Node through its local partial
+derivatives, the operation works with grad(), grad_batch(), and reverse() alike. Primitives of one or two
+arguments are also registered with tapes, so they can be recorded, optimized, compiled, and turned into generated code.
+"""
+import functools
+import inspect
+try:
+    from autodiff_package.node import Node, OPERANDS
+    from autodiff_package.tape import register_op, Tracer
+except:
+    from node import Node, OPERANDS
+    from tape import register_op, Tracer
+
+# The registered primitives: each name maps to a function taking the argument values and returning the value and a
+# tuple of the partial derivatives with respect to each argument
+PRIMITIVES = {}
+
+# The function each primitive was defined from, by name
+_DEFINITIONS = {}
+
+def _redefines(old, new):
+    """Whether a function is a new definition of another, as when a module is reloaded, rather than a different one"""
+    return (old.__module__, old.__qualname__) == (new.__module__, new.__qualname__) and '<lambda>' not in new.__qualname__
+
+class _Partials:
+    """
+    The partial derivatives of a primitive given only a jvp, found the first time they are used
+
+    Finding them takes one call to the jvp per argument, which forward mode never needs, as it calls the jvp once
+    with the tangents. Reverse mode and tapes iterate over or index them like the tuple of any other Node.
+    """
+
+    __slots__ = ('_find', '_values')
+
+    def __init__(self, find):
+        self._find = find
+        self._values = None
+
+    def _get(self):
+        if self._values is None:
+            self._values = self._find()
+            self._find = None
+        return self._values
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __getitem__(self, index):
+        return self._get()[index]
+
+    def __len__(self):
+        return len(self._get())
+
+def primitive(vjp=None, jvp=None, name=None):
+    """
+    Define a new primitive operation from a function of plain values and a rule for its derivative
+
+    Parameters
+    ----------
+    vjp :
+        Function vjp(g, value, *args) returning the derivative of the output with respect to each argument
+        multiplied by g (a tuple with one entry per argument, or a single entry for one argument)
+    jvp :
+        Function jvp(tangents, value, *args) returning the derivative of the output along the tangents,
+        which hold one tangent per argument. Used for forward mode when given, and otherwise the partial
+        derivatives are found by calling it once per argument
+    name :
+        The name of the operation on tapes and in generated code. Defaults to the name of the function. A name
+        already used by a different primitive raises ValueError, so two functions named `<lambda>` need names
+
+    Returns
+    -------
+    Decorator:
+        Wraps a function of plain values so that it takes Nodes, integers, floats, or arrays, and returns a
+        single Node whenever any argument is a Node
+
+    Examples
+    --------
+    >>> @primitive(vjp=lambda g, y, x: g * (1 - np.exp(-y)))
+    ... def softplus(x):
+    ...     return np.logaddexp(0, x)
+    >>> ans, jacobian = grad(lambda x: softplus(2 * x), 0.0)
+    >>> print(ans, jacobian)
+    [0.6931471805599453] [1.0]
+    """
+    if vjp is None and jvp is None:
+        raise ValueError('A primitive needs a vjp or a jvp')
+
+    def decorate(function):
+        op = name or function.__name__
+        defined = _DEFINITIONS.get(op)
+        if defined is not None and defined is not function and not _redefines(defined, function):
+            raise ValueError(f"A different primitive is already named `{op}`, give this one another name")
+
+        def partials(value, args):
+            """The partial derivatives of the output with respect to each argument"""
+            if vjp is not None:
+                result = vjp(1.0, value, *args)
+                return tuple(result) if isinstance(result, (tuple, list)) else (result,)
+            return tuple(jvp(tuple(1.0 if k == j else 0.0 for k in range(len(args))), value, *args)
+                         for j in range(len(args)))
+
+        def evaluate(*args):
+            value = function(*args)
+            return value, partials(value, args)
+
+        @functools.wraps(function)
+        def wrapper(*args):
+            if any(isinstance(arg, Tracer) for arg in args):
+                return Tracer.apply(op, evaluate, args)
+            for arg in args:
+                if not isinstance(arg, OPERANDS):
+                    raise TypeError(f"Unsupported type `{type(arg)}`")
+            if not any(isinstance(arg, Node) for arg in args):
+                return function(*args)
+
+            # Constant arguments become Nodes without parents, so tapes record them as constants
+            nodes = tuple(arg if isinstance(arg, Node) else Node(arg, 0) for arg in args)
+            values = [node.real for node in nodes]
+            value = function(*values)
+            if jvp is not None:
+                local = _Partials(lambda: partials(value, values))
+                dual = jvp(tuple(node.dual for node in nodes), value, *values)
+            else:
+                local = partials(value, values)
+                dual = sum(loc_grad * node.dual for loc_grad, node in zip(local, nodes))
+            return Node(value, dual, parents = nodes, partials = local, op = op)
+
+        parameters = inspect.signature(function).parameters.values()
+        if len(parameters) <= 2 and all(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters):
+            register_op(op, evaluate)
+        PRIMITIVES[op] = evaluate
+        _DEFINITIONS[op] = function
+        return wrapper
+    return decorate
@@ -0,0 +1,123 @@
+"""
+A module that profiles the graphs recorded by grad() and reverse(), to show which operations a slow function spends its time on.
+
+Inside `with profile() as p:` every graph that grad() or reverse() records is walked once it has been differentiated,
+counting the Nodes in the graph by operation and measuring its depth and fan-out, and the time spent building each graph (the
+forward pass) is kept apart from the time spent sweeping it (the backward pass). The reverse sweeps are timed per
+operation. Outside of a profile nothing is counted or timed, so grad() and reverse() only check that no profile is active.
+"""
+import contextlib
+import time
+from collections import Counter
+
+# The Profile that graphs are recorded into, or None when nothing is being profiled
+active = None
+
+class Profile:
+    """
+    The counts and timings of every graph differentiated inside a profile() block
+
+    Nodes are counted by the name of the operation that made them ('add', 'mul', 'pow', 'sin', ...), with inputs and
+    constants counted as 'input'. Only Nodes that an output depends on are part of its graph, so intermediate Nodes a
+    function discards are not counted: the counts are of the nodes in each graph, not of every Node created, which
+    would need a check in Node.__init__ on every operation whether or not anything is profiled.
+    """
+
+    def __init__(self):
+        """Initializes an empty profile"""
+        self.calls = 0
+        self.forward = 0.0
+        self.backward = 0.0
+        self.nodes = Counter()
+        self.sweep_time = Counter()
+        self.depth = 0
+        self.fan_out = 0
+        self.edges = 0
+
+    def sweep(self, order, root_node):
+        """The reverse sweep of _backward, timing the propagation through each node by its operation"""
+        for node in order:
+            node.id = 0
+        root_node.id = 1
+        clock = time.perf_counter
+        times = self.sweep_time
+        for node in reversed(order):
+            start = clock()
+            for child_node, loc_grad in zip(node.parents, node.partials):
+                child_node.id += loc_grad * node.id
+            times[node.op or 'input'] += clock() - start
+
+    def graph(self, order, forward, backward=0.0):
+        """Records a topologically ordered graph, and the seconds taken to build it and to sweep it"""
+        self.calls += 1
+        self.forward += forward
+        self.backward += backward
+        depth = {}
+        uses = Counter()
+        for node in order:
+            self.nodes[node.op or 'input'] += 1
+            depth[node] = 1 + max((depth[parent] for parent in node.parents), default=-1)
+            uses.update(node.parents)
+        self.depth = max(self.depth, max(depth.values(), default=0))
+        self.fan_out = max(self.fan_out, max(uses.values(), default=0))
+        self.edges += sum(uses.values())
+
+    def as_dict(self):
+        """Returns the profile as a dictionary of plain values"""
+        total = sum(self.nodes.values())
+        return {'calls': self.calls,
+                'forward_seconds': self.forward,
+                'backward_seconds': self.backward,
+                'nodes': total,
+                'edges': self.edges,
+                'depth': self.depth,
+                'max_fan_out': self.fan_out,
+                'mean_fan_out': self.edges / total if total else 0.0,
+                'ops': {op: {'nodes': count, 'sweep_seconds': self.sweep_time[op]}
+                        for op, count in self.nodes.most_common()}}
+
+    def to_json(self, **kwargs):
+        """Returns the profile as a JSON string, passing any keyword arguments on to json.dumps"""
+        import json
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def table(self):
+        """Returns the profile as a table of the operations, most Nodes first, followed by the totals"""
+        summary = self.as_dict()
+        total = summary['nodes'] or 1
+        lines = [f"{'op':>10} {'in graph':>10} {'share':>7} {'sweep ms':>10}"]
+        for op, row in summary['ops'].items():
+            lines.append(f"{op:>10} {row['nodes']:10d} {100 * row['nodes'] / total:6.1f}% {1000 * row['sweep_seconds']:10.3f}")
+        lines.append(f"{summary['calls']} graphs, {summary['nodes']} nodes in graph, depth {summary['depth']}, "
+                     f"fan-out {summary['mean_fan_out']:.2f} mean / {summary['max_fan_out']} max, "
+                     f"forward {1000 * summary['forward_seconds']:.3f} ms, backward {1000 * summary['backward_seconds']:.3f} ms")
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.table()
+
+@contextlib.contextmanager
+def profile():
+    """
+    Profile every graph grad() and reverse() record inside the block
+
+    Returns
+    -------
+    Profile:
+        The counts and timings, filled in as the block runs. An inner profile() block takes over
+        until it ends, so its graphs are not recorded in the outer one
+
+    Examples
+    --------
+    >>> with profile() as p:
+    ...     _ = reverse(lambda x: sin(x[0]) * x[1] ** 2, [1.0, 2.0])
+    >>> print(p.as_dict()['ops']['pow']['nodes'], p.depth)
+    1 2
+    """
+    global active
+    previous = active
+    active = Profile()
+    try:
+        yield active
+    finally:
+        active = previous
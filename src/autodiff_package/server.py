@@ -0,0 +1,154 @@
+"""
+A module that serves gradient evaluations to asyncio code, batching concurrent requests for the same function.
+
+A GradientServer holds registered functions. await server.submit(f_id, x) queues one point and returns its value and
+derivatives. Pending points for the same function are coalesced into one call to grad_batch. That call runs in an
+executor, off the event loop, when the batch is full or when its oldest request has waited max_latency seconds.
+At most max_pending requests are queued or running at once, and further submissions wait for room, which gives
+backpressure to callers.
+"""
+import asyncio
+import numpy as np
+try:
+    from autodiff_package.differentiate import grad_batch
+except:
+    from differentiate import grad_batch
+
+class GradientServer:
+    """
+    Batches asynchronous gradient requests for registered functions into vectorized evaluations
+
+    Parameters
+    ----------
+    max_batch :
+        The most points evaluated in one batch. A batch is run as soon as it is full
+    max_latency :
+        The most seconds a request waits for its batch to fill before the batch is run anyway
+    max_pending :
+        The most requests queued or running at once. Further submissions wait until a batch finishes
+    executor :
+        The concurrent.futures executor batches run in. Defaults to the event loop's default executor
+
+    Examples
+    --------
+    >>> async def main():
+    ...     async with GradientServer(max_latency=0.001) as server:
+    ...         server.register('f', lambda x: x[0] * sin(x[1]))
+    ...         return await asyncio.gather(*(server.submit('f', [i, 0.0]) for i in range(3)))
+    >>> print(asyncio.run(main())[2])
+    (0.0, array([0., 2.]))
+    """
+
+    def __init__(self, max_batch=256, max_latency=0.005, max_pending=4096, executor=None):
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.max_pending = max_pending
+        self.executor = executor
+        self.functions = {}
+        self.inputs = {}
+        self.batches = 0
+        self.requests = 0
+        self._pending = {}
+        self._timers = {}
+        self._running = set()
+        self._slots = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def register(self, f_id, function, n_inputs=None):
+        """
+        Registers a function under an id. The function must accept points whose inputs are NumPy arrays,
+        as grad_batch does, so it cannot branch on the values of its inputs
+
+        n_inputs is the number of values in each point, or 0 for a function of a single value. If it is None,
+        it is taken from the first point submitted for the function
+        """
+        self.functions[f_id] = function
+        if n_inputs is None:
+            self.inputs.pop(f_id, None)
+        else:
+            self.inputs[f_id] = n_inputs
+
+    async def submit(self, f_id, x):
+        """
+        Queues a point for evaluation and returns its value and derivatives once its batch has run
+
+        Parameters
+        ----------
+        f_id :
+            The id the function was registered under
+        x :
+            The point to evaluate at. Either a list or a single value, with as many values as the function takes.
+            A point of the wrong shape raises ValueError for this caller only
+
+        Returns
+        -------
+        Value:
+            The function evaluated at x (an array for a vector function)
+        Derivatives: array
+            The derivatives at x, as returned for one point by grad_batch
+        """
+        if f_id not in self.functions:
+            raise KeyError(f"No function registered as `{f_id}`")
+        # Points are checked here, so a malformed one is rejected alone rather than failing the batch it would join
+        x = np.asarray(x, dtype=float)
+        if x.ndim > 1:
+            raise ValueError(f"A point must be a list or a single value, not an array of shape {x.shape}")
+        n_inputs = self.inputs.setdefault(f_id, len(x) if x.ndim else 0)
+        if (len(x) if x.ndim else 0) != n_inputs:
+            raise ValueError(f"`{f_id}` takes points of {n_inputs} values" if n_inputs else f"`{f_id}` takes a single value")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        await self._slots.acquire()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(f_id, [])
+        pending.append((x, future))
+        self.requests += 1
+        if len(pending) >= self.max_batch:
+            self._flush(f_id)
+        elif f_id not in self._timers:
+            self._timers[f_id] = loop.call_later(self.max_latency, self._flush, f_id)
+        return await future
+
+    def _flush(self, f_id):
+        """Starts evaluating every pending request for a function as one batch"""
+        timer = self._timers.pop(f_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(f_id, [])
+        if batch:
+            task = asyncio.ensure_future(self._run(self.functions[f_id], batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, function, batch):
+        """Evaluates a batch in the executor and resolves the future of each of its requests"""
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        try:
+            X = np.stack([x for x, _ in batch])
+            values, jacobian = await loop.run_in_executor(self.executor, grad_batch, function, X)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result((values[i], jacobian[i]))
+        finally:
+            for _ in batch:
+                self._slots.release()
+
+    async def close(self):
+        """Runs every pending batch and waits for all running batches to finish"""
+        for f_id in list(self._pending):
+            self._flush(f_id)
+        while self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
@@ -0,0 +1,198 @@
+"""
+A module that computes sparse Jacobians with as few derivative passes as the sparsity of the Jacobian allows.
+
+sparsity_pattern(fun, val) traces the functions once and follows the parents of each output back to the inputs it
+depends on. color(pattern) then groups structurally orthogonal columns (columns with no nonzero row in common), or rows
+for reverse mode, with a greedy graph coloring. sparse_jacobian(fun, val) seeds each group of columns together, so the
+number of forward directions (or reverse sweeps) is the number of colors rather than the number of inputs (or outputs).
+"""
+import numpy as np
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+try:
+    from autodiff_package.node import Node, topological_order
+    from autodiff_package.differentiate import _sweep, _tangents
+except:
+    from node import Node, topological_order
+    from differentiate import _sweep, _tangents
+
+def _trace(fun, val):
+    """Evaluates every function once on Nodes with zero duals, returning the input Nodes and the list of outputs"""
+    if not isinstance(fun, list):
+        fun = [fun]
+    nodes = [Node(val[i], 0, id=0) for i in range(len(val))]
+    outputs = []
+    for f in fun:
+        output = f(nodes)
+        outputs.extend(output if isinstance(output, (list, tuple)) else [output])
+    return nodes, outputs
+
+def _pattern(nodes, outputs):
+    """Returns the row and column indices of the structural nonzeros of the Jacobian of a traced graph"""
+    roots = [output for output in outputs if isinstance(output, Node)]
+    order = topological_order(roots)
+
+    # Each node's set of inputs, built from its parents' sets in topological order
+    depends = {node: frozenset((i,)) for i, node in enumerate(nodes)}
+    empty = frozenset()
+    for node in order:
+        if node not in depends:
+            depends[node] = empty.union(*(depends[parent] for parent in node.parents))
+
+    rows = []
+    cols = []
+    for i, output in enumerate(outputs):
+        columns = sorted(depends[output]) if isinstance(output, Node) else []
+        rows.extend([i] * len(columns))
+        cols.extend(columns)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+def sparsity_pattern(fun, val):
+    """
+    Find which partial derivatives of function(s) can be nonzero, by tracing which inputs each output depends on
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function, which may return a list
+    val :
+        List of values to trace the functions at. Branches taken at other values are not seen
+
+    Returns
+    -------
+    Rows: array
+        The output index of each structural nonzero, in increasing order
+    Columns: array
+        The input index of each structural nonzero, increasing within each row
+
+    Examples
+    --------
+    >>> rows, cols = sparsity_pattern([lambda x: x[0] * x[1], lambda x: sin(x[2])], [1.0, 2.0, 3.0])
+    >>> print(rows, cols)
+    [0 0 1] [0 1 2]
+    """
+    return _pattern(*_trace(fun, val))
+
+def color(rows, cols, shape=None, mode='forward'):
+    """
+    Greedily color the columns (or rows) of a sparsity pattern so that no two of the same color share a nonzero row (or column)
+
+    Columns are colored in order of decreasing number of nonzeros, each taking the smallest color none of its
+    neighbours has, which keeps the number of colors close to the chromatic number for the banded and block
+    patterns that discretized equations produce.
+
+    Parameters
+    ----------
+    rows, cols :
+        The indices of the structural nonzeros, as returned by sparsity_pattern
+    shape :
+        The shape (m, n) of the Jacobian. Defaults to the largest indices in the pattern
+    mode :
+        'forward' to color columns, or 'reverse' to color rows
+
+    Returns
+    -------
+    Colors: array
+        The color of each column (or row), numbered from 0
+    """
+    if mode == 'reverse':
+        rows, cols = cols, rows
+        shape = shape[::-1] if shape is not None else None
+    elif mode != 'forward':
+        raise ValueError(f"Unknown mode `{mode}`")
+    m, n = shape if shape is not None else (int(rows.max(initial=-1)) + 1, int(cols.max(initial=-1)) + 1)
+
+    # The columns of each row, and the rows of each column
+    by_row = [[] for _ in range(m)]
+    by_col = [[] for _ in range(n)]
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        by_row[i].append(j)
+        by_col[j].append(i)
+
+    colors = np.full(n, -1, dtype=np.int64)
+    for j in sorted(range(n), key=lambda j: -len(by_col[j])):
+        taken = {colors[k] for i in by_col[j] for k in by_row[i]}
+        c = 0
+        while c in taken:
+            c += 1
+        colors[j] = c
+    return colors
+
+def _to_sparse(data, rows, cols, shape):
+    """Returns a SciPy CSR matrix, or the COO arrays (data, rows, cols, shape) if SciPy is not installed"""
+    if scipy is None:
+        return data, rows, cols, shape
+    return scipy.sparse.csr_matrix((data, (rows, cols)), shape=shape)
+
+def sparse_jacobian(fun, val, mode='forward'):
+    """
+    Calculate a sparse Jacobian, compressing structurally orthogonal columns (or rows) into one derivative pass
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function, which may return a list
+    val :
+        List of values to evaluate the derivatives at
+    mode :
+        'forward' to carry one tangent per color of columns through a single forward sweep, or 'reverse' to
+        run one reverse sweep per color of rows, both over a single recorded graph. Reverse is cheaper when there are
+        fewer row colors than column colors
+
+    Returns
+    -------
+    Function values: list
+        Each output evaluated at val
+    Jacobian:
+        A scipy.sparse CSR matrix with one row per output and one column per value. Without SciPy, the COO arrays
+        (data, rows, cols, shape) instead
+    Colors: int
+        The number of colors, which is the number of tangent directions (or reverse sweeps) that were needed
+
+    Examples
+    --------
+    >>> fun = [lambda x, i=i: x[i] ** 2 - x[i + 1] for i in range(3)]
+    >>> values, J, colors = sparse_jacobian(fun, [1.0, 2.0, 3.0, 4.0])
+    >>> print(colors)
+    2
+    """
+    if mode not in ('forward', 'reverse'):
+        raise ValueError(f"Unknown mode `{mode}`")
+    nodes, outputs = _trace(fun, val)
+    rows, cols = _pattern(nodes, outputs)
+    colors = color(rows, cols, (len(outputs), len(val)), mode)
+    values, data = _compressed(nodes, outputs, rows, cols, colors, mode)
+    return values, _to_sparse(data, rows, cols, (len(outputs), len(val))), int(colors.max(initial=-1)) + 1
+
+def _compressed(nodes, outputs, rows, cols, colors, mode):
+    """Returns the output values and the nonzeros of the Jacobian of a traced graph, given the coloring of its pattern"""
+    n = len(nodes)
+    k = int(colors.max(initial=-1)) + 1
+
+    order = topological_order([output for output in outputs if isinstance(output, Node)])
+    values = [output.real if isinstance(output, Node) else output for output in outputs]
+
+    if mode == 'forward':
+        # Every column of a color shares one tangent direction, carried through the graph already traced, so each
+        # nonzero is read off its row's tangent at its column's color
+        seed = np.zeros((n, max(k, 1)))
+        seed[np.arange(n), colors] = 1
+        _tangents(order, nodes, seed)
+        compressed = np.array([np.broadcast_to(output.id if isinstance(output, Node) else 0.0, (seed.shape[1],))
+                               for output in outputs])
+        data = compressed[rows, colors[cols]] if len(rows) else np.zeros(0)
+        return values, data
+
+    # One sweep per color of rows over the graph already traced, with the adjoints of every output of the color set to 1.
+    # As the rows of a color share no column, each input's adjoint belongs to the one row of the color that depends on it
+    data = np.zeros(len(rows))
+    for c in range(k):
+        roots = [outputs[i] for i in np.flatnonzero(colors == c)]
+        _sweep(order, roots, [1] * len(roots))
+        for e in np.flatnonzero(colors[rows] == c):
+            data[e] = nodes[cols[e]].id
+    return values, data
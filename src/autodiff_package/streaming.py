@@ -0,0 +1,116 @@
+"""
+A module that evaluates the values and derivatives of a function over datasets too large to hold in memory.
+
+iter_gradients(fun, source, chunk_size) reads the points of the source a chunk at a time, evaluates each chunk with
+one vectorized call to grad_batch, and yields the results before reading the next chunk, so at most one chunk of
+points and its results are held at once however many points there are. A source is an array (including an np.memmap,
+whose rows are only read from disk as they are reached), the path of a .npy file (opened memory-mapped), or any
+iterable of arrays of points, such as the shards of a CSV file. Results can also be written into output arrays as
+they are computed, and save_gradients writes them to .npy files memory-mapped in the same way.
+"""
+import os
+import numpy as np
+try:
+    from autodiff_package.differentiate import grad_batch
+except:
+    from differentiate import grad_batch
+
+def _chunks(source, chunk_size):
+    """Yields the points of a source as float arrays of at most chunk_size points"""
+    if isinstance(source, (str, os.PathLike)):
+        source = np.load(source, mmap_mode='r')
+    if hasattr(source, 'shape') and hasattr(source, '__getitem__'):
+        for start in range(0, source.shape[0], chunk_size):
+            yield np.asarray(source[start:start + chunk_size], dtype=float)
+        return
+    for block in source:
+        block = np.asarray(block, dtype=float)
+        for start in range(0, block.shape[0], chunk_size):
+            yield block[start:start + chunk_size]
+
+def iter_gradients(fun, source, chunk_size=1024, out=None):
+    """
+    Calculate the values and derivatives of a function at every point of a dataset, one chunk of points at a time
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax, and accept points
+        whose inputs are NumPy arrays, as grad_batch does. Can be either a list of lambda functions or a single one
+    source :
+        The points, with shape (N, n) for functions of a list of n values or (N,) for functions of a single value:
+        an array or np.memmap, the path of a .npy file, or an iterable of arrays of points
+    chunk_size :
+        The most points evaluated at once
+    out :
+        Optional pair of arrays (such as np.memmap) to write the values and derivatives of every point into,
+        with the shapes grad_batch would return for all N points
+
+    Yields
+    ------
+    Start: int
+        The index of the first point of the chunk
+    Values: array
+        The function evaluated at each point of the chunk, as returned by grad_batch
+    Jacobian: array
+        The derivatives at each point of the chunk, as returned by grad_batch
+
+    Examples
+    --------
+    >>> X = np.arange(6.0).reshape(3, 2)
+    >>> for start, values, jacobian in iter_gradients(lambda x: x[0] * x[1], X, chunk_size=2):
+    ...     print(start, values)
+    0 [0. 6.]
+    2 [20.]
+    """
+    if chunk_size < 1:
+        raise ValueError('The chunk size must be at least 1')
+    start = 0
+    for chunk in _chunks(source, chunk_size):
+        values, jacobian = grad_batch(fun, chunk)
+        stop = start + len(chunk)
+        if out is not None:
+            out[0][start:stop] = values
+            out[1][start:stop] = jacobian
+        yield start, values, jacobian
+        start = stop
+
+def save_gradients(fun, source, values_path, jacobian_path, chunk_size=1024):
+    """
+    Calculate the values and derivatives of a function at every point of a dataset, writing them to .npy files
+
+    The files are created memory-mapped from the shapes of the first chunk's results, and each chunk is written
+    and flushed before the next is read, so the results never need to fit in memory either.
+
+    Parameters
+    ----------
+    fun, source, chunk_size :
+        As for iter_gradients. The source must be an array, an np.memmap, or the path of a .npy file,
+        so that the number of points is known before the files are created
+    values_path :
+        The path of the .npy file to write the values to
+    jacobian_path :
+        The path of the .npy file to write the derivatives to
+
+    Returns
+    -------
+    Values: np.memmap
+        The values of every point, read back from values_path
+    Jacobian: np.memmap
+        The derivatives at every point, read back from jacobian_path
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = np.load(source, mmap_mode='r')
+    n_points = source.shape[0]
+    out = None
+    for start, values, jacobian in iter_gradients(fun, source, chunk_size):
+        if out is None:
+            out = (np.lib.format.open_memmap(values_path, mode='w+', dtype=float, shape=(n_points,) + values.shape[1:]),
+                   np.lib.format.open_memmap(jacobian_path, mode='w+', dtype=float, shape=(n_points,) + jacobian.shape[1:]))
+        out[0][start:start + len(values)] = values
+        out[1][start:start + len(values)] = jacobian
+        out[0].flush()
+        out[1].flush()
+    if out is None:
+        raise ValueError('The source has no points')
+    return out
@@ -0,0 +1,669 @@
+"""
+A module that defines the Tape class, an array-backed record (Wengert list) of a computational graph for reverse mode differentiation.
+
+Each operation of a graph is stored as one entry in preallocated NumPy arrays: its op code, the indices of its parents,
+its local partial derivatives, its constant operand, and its value. The reverse sweep then runs over integer indices
+instead of Node objects, and a tape can be inspected, saved to and loaded from disk, and replayed at new inputs.
+
+record() evaluates a function on Tracers, which append each operation to a list as it runs and keep no references to
+their parents, so no graph of Nodes is built and intermediate values are freed as soon as the function drops them.
+The list is turned into the arrays of the tape once, at the end.
+"""
+import math
+import numpy as np
+try:
+    from autodiff_package.node import Node, CONSTANTS, topological_order, _log, _any_zero
+    from autodiff_package import functions as _f
+except:
+    from node import Node, CONSTANTS, topological_order, _log, _any_zero
+    import functions as _f
+
+# Names of the operations a tape can hold. An entry's op code is its index in this tuple
+OPS = ('input', 'const',
+       'add', 'sub', 'rsub', 'mul', 'div', 'rdiv', 'pow', 'rpow', 'neg',
+       'sin', 'cos', 'tan', 'log', 'logbase', 'logistic',
+       'arcsin', 'arccos', 'arctan', 'sinh', 'cosh', 'tanh', 'sqrt')
+OPCODES = {name: code for code, name in enumerate(OPS)}
+_BUILTIN = len(OPS)
+
+# Value and partial derivatives of operations between two parents a and b
+_BINARY = {
+    'add': lambda a, b: (a + b, 1.0, 1.0),
+    'sub': lambda a, b: (a - b, 1.0, -1.0),
+    'mul': lambda a, b: (a * b, b, a),
+    'div': lambda a, b: (a / b, 1 / b, -a / b ** 2),
+    'pow': lambda a, b: (a ** b, b * a ** (b - 1), a ** b * np.log(a)),
+}
+
+# Value and partial derivative of operations on one parent a, with the constant operand c
+_UNARY = {
+    'add': lambda a, c: (a + c, 1.0),
+    'sub': lambda a, c: (a - c, 1.0),
+    'rsub': lambda a, c: (c - a, -1.0),
+    'mul': lambda a, c: (a * c, c),
+    'div': lambda a, c: (a / c, 1 / c),
+    'rdiv': lambda a, c: (c / a, -c / a ** 2),
+    'pow': lambda a, c: (a ** c, c * a ** (c - 1)),
+    'rpow': lambda a, c: (c ** a, c ** a * np.log(c)),
+    'neg': lambda a, c: (-a, -1.0),
+    'logbase': lambda a, c: tuple(v * _f._inverse_log(c) for v in _f._apply(_f._log, a)),
+}
+
+# The elementary functions run the kernels of functions.py, so a replayed tape computes exactly what was recorded
+for _name in ('sin', 'cos', 'tan', 'log', 'logistic', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh', 'tanh', 'sqrt'):
+    _UNARY[_name] = lambda a, c, kernel=getattr(_f, '_' + _name): _f._apply(kernel, a)
+
+def register_op(name, evaluate):
+    """
+    Adds an operation to the ones a tape can hold, with a function evaluate(*values) returning its value and a tuple
+    of its partial derivatives. The operation gets the next op code, so tapes saved with it can only be loaded after
+    registering the same operations in the same order. Registering a name again replaces its evaluate function
+    """
+    global OPS
+    if OPCODES.get(name, _BUILTIN) < _BUILTIN:
+        raise ValueError(f"Operation `{name}` is already defined")
+    if name not in OPCODES:
+        OPCODES[name] = len(OPS)
+        OPS = OPS + (name,)
+
+    def binary(a, b):
+        value, partials = evaluate(a, b)
+        return value, partials[0], partials[1]
+
+    def unary(a, c):
+        value, partials = evaluate(a)
+        return value, partials[0]
+
+    _BINARY[name] = binary
+    _UNARY[name] = unary
+
+# Sweeps over graphs with at least this many entries per level on average are vectorized level by level
+_VECTORIZE_WIDTH = 16
+
+# Entries recorded by Tracers are packed into an array, and entries swept in a loop are turned into Python lists,
+# this many at a time, so neither holds a Python object per entry of the whole tape
+_CHUNK = 4096
+
+class Tape:
+    """
+    An array-backed record of a computational graph with scalar values.
+
+    Entries are stored in topological order, with the inputs first. Entry i has the op code op[i], up to two parents
+    parents[i] (-1 where there is none) with local partial derivatives partials[i], the constant operand const[i]
+    (NaN where there is none), and the value values[i]. inputs and outputs hold the indices of the input and output entries.
+    """
+
+    def __init__(self, capacity=64):
+        """Initializes an empty tape with room for capacity entries"""
+        self.size = 0
+        self.op = np.zeros(capacity, dtype=np.int16)
+        self.parents = np.full((capacity, 2), -1, dtype=np.int64)
+        self.partials = np.zeros((capacity, 2))
+        self.const = np.full(capacity, np.nan)
+        self.values = np.zeros(capacity)
+        self.inputs = np.zeros(0, dtype=np.int64)
+        self.outputs = np.zeros(0, dtype=np.int64)
+        self.kept = []
+        self._levels = None
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"Tape({self.size} entries, {len(self.inputs)} inputs, {len(self.outputs)} outputs)"
+
+    def append(self, op, value, parents=(), partials=(), const=None):
+        """Appends an entry to the tape, growing the arrays if they are full, and returns its index"""
+        if self.size == len(self.op):
+            self._grow(2 * self.size)
+        i = self.size
+        self.op[i] = OPCODES[op]
+        self.values[i] = value
+        for k in range(len(parents)):
+            self.parents[i, k] = parents[k]
+            self.partials[i, k] = partials[k]
+        if const is not None:
+            self.const[i] = const
+        self.size += 1
+        self._levels = None
+        return i
+
+    def _grow(self, capacity):
+        """Resizes every array to hold capacity entries"""
+        capacity = max(capacity, 1)
+        for name, fill in (('op', 0), ('parents', -1), ('partials', 0.0), ('const', np.nan), ('values', 0.0)):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    @classmethod
+    def from_graph(cls, inputs, outputs, keep=()):
+        """
+        Records the graph of Nodes between the given input Nodes and output Nodes into a new tape
+
+        The arrays are allocated once, at the size of the graph, and then filled in topological order.
+        Outputs that are not Nodes are recorded as constants. Nodes in keep are recorded even if no output depends on them,
+        and their indices are returned in the kept attribute of the tape.
+        """
+        order = topological_order([node for node in outputs if isinstance(node, Node)] + list(keep))
+        input_set = set(inputs)
+        order = [node for node in order if node not in input_set]
+        constants = [output for output in outputs if not isinstance(output, Node)]
+
+        tape = cls(len(inputs) + len(order) + len(constants))
+        index = {}
+        for node in inputs:
+            index[node] = tape.append('input', _scalar(node.real))
+        for node in order:
+            if not node.parents:
+                index[node] = tape.append('const', _scalar(node.real), const=_scalar(node.real))
+                continue
+            if len(node.parents) > 2 or node.op not in OPCODES:
+                raise ValueError(f"Operation `{node.op}` cannot be recorded on a tape")
+            index[node] = tape.append(node.op, _scalar(node.real),
+                                      [index[parent] for parent in node.parents],
+                                      [_scalar(loc_grad) for loc_grad in node.partials],
+                                      None if node.const is None else _scalar(node.const))
+
+        output_index = []
+        for output in outputs:
+            if isinstance(output, Node):
+                output_index.append(index[output])
+            else:
+                output_index.append(tape.append('const', _scalar(output), const=_scalar(output)))
+        tape.inputs = np.array([index[node] for node in inputs], dtype=np.int64)
+        tape.outputs = np.array(output_index, dtype=np.int64)
+        tape.kept = [index[node] for node in keep]
+        return tape
+
+    @property
+    def ops(self):
+        """The name of the operation of each entry"""
+        return [OPS[code] for code in self.op[:self.size]]
+
+    def count_ops(self):
+        """Returns a dictionary with the number of entries of each operation on the tape"""
+        codes, counts = np.unique(self.op[:self.size], return_counts=True)
+        return {OPS[code]: int(count) for code, count in zip(codes, counts)}
+
+    @property
+    def output_values(self):
+        """The values of the output entries"""
+        return [float(value) for value in self.values[self.outputs]]
+
+    def forward(self, val):
+        """
+        Replays the tape at new input values, recomputing the value and local partial derivatives of every entry
+
+        Returns the new output values. The operations are not re-run through Python functions or Nodes,
+        so branches taken while recording are fixed.
+        """
+        val = np.atleast_1d(np.asarray(val, dtype=float))
+        if val.shape != self.inputs.shape:
+            raise ValueError('Value does not match the number of inputs of the tape')
+        self.values[self.inputs] = val
+
+        ops = self.op[:self.size].tolist()
+        parents = self.parents[:self.size].tolist()
+        const = self.const[:self.size].tolist()
+        values = self.values[:self.size].tolist()
+        partials = self.partials
+        for i, code in enumerate(ops):
+            if code <= 1:
+                continue
+            p0, p1 = parents[i]
+            if p1 >= 0:
+                values[i], partials[i, 0], partials[i, 1] = _BINARY[OPS[code]](values[p0], values[p1])
+            else:
+                values[i], partials[i, 0] = _UNARY[OPS[code]](values[p0], const[i])
+        self.values[:self.size] = values
+        return self.output_values
+
+    def levels(self):
+        """Returns the level of every entry: 0 for inputs and constants, and one more than its deepest parent otherwise"""
+        if self._levels is None:
+            levels = [0] * self.size
+            for start in range(0, self.size, _CHUNK):
+                end = min(start + _CHUNK, self.size)
+                for i, (p0, p1) in enumerate(self.parents[start:end].tolist(), start):
+                    if p0 >= 0:
+                        levels[i] = 1 + max(levels[p0], levels[p1] if p1 >= 0 else 0)
+            self._levels = np.array(levels, dtype=np.int32)
+        return self._levels
+
+    def adjoints(self, output=0):
+        """
+        Runs one reverse sweep from the given output and returns the adjoint (partial derivative of that output) of every entry
+
+        Wide graphs are swept one level at a time with vectorized NumPy operations, and deep graphs with a loop over indices.
+        """
+        adjoint = np.zeros(self.size)
+        adjoint[self.outputs[output]] = 1.0
+        levels = self.levels()
+        depth = int(levels.max()) if self.size else 0
+        if depth and self.size / depth >= _VECTORIZE_WIDTH:
+            by_level = np.argsort(levels, kind='stable')
+            bounds = np.searchsorted(levels[by_level], np.arange(depth + 2))
+            for level in range(depth, 0, -1):
+                entries = by_level[bounds[level]:bounds[level + 1]]
+                weight = adjoint[entries]
+                for k in range(2):
+                    parents = self.parents[entries, k]
+                    has_parent = parents >= 0
+                    np.add.at(adjoint, parents[has_parent], (self.partials[entries, k] * weight)[has_parent])
+            return adjoint
+
+        adjoint = adjoint.tolist()
+        for end in range(self.size, 0, -_CHUNK):
+            start = max(end - _CHUNK, 0)
+            parents = self.parents[start:end][::-1]
+            partials = self.partials[start:end][::-1]
+            for i, parent0, parent1, partial0, partial1 in zip(range(end - 1, start - 1, -1),
+                                                               parents[:, 0].tolist(), parents[:, 1].tolist(),
+                                                               partials[:, 0].tolist(), partials[:, 1].tolist()):
+                weight = adjoint[i]
+                if weight == 0:
+                    continue
+                if parent0 >= 0:
+                    adjoint[parent0] += partial0 * weight
+                    if parent1 >= 0:
+                        adjoint[parent1] += partial1 * weight
+        return np.array(adjoint)
+
+    def gradient(self, output=0):
+        """Returns the partial derivatives of the given output with respect to each input"""
+        return self.adjoints(output)[self.inputs]
+
+    def jacobian(self):
+        """Returns the Jacobian of the outputs with respect to the inputs, with one row per output"""
+        jacobian = np.zeros((len(self.outputs), len(self.inputs)))
+        for j in range(len(self.outputs)):
+            jacobian[j] = self.gradient(j)
+        return jacobian
+
+    def tangents(self, seed):
+        """
+        Runs one forward sweep carrying a tangent vector per column of seed, and returns the tangents of the outputs
+
+        seed has one row per input. The result has one row per output and one column per column of seed, so an
+        identity seed gives the Jacobian and a subset of its columns gives those columns of the Jacobian.
+        Entries are swept one level at a time, and a row of zeros past the last entry stands in for missing parents.
+        """
+        seed = np.asarray(seed, dtype=float).reshape(len(self.inputs), -1)
+        tangent = np.zeros((self.size + 1, seed.shape[1]))
+        tangent[self.inputs] = seed
+        levels = self.levels()
+        depth = int(levels.max()) if self.size else 0
+        by_level = np.argsort(levels, kind='stable')
+        bounds = np.searchsorted(levels[by_level], np.arange(depth + 2))
+        for level in range(1, depth + 1):
+            entries = by_level[bounds[level]:bounds[level + 1]]
+            tangent[entries] = (self.partials[entries, 0:1] * tangent[self.parents[entries, 0]]
+                                + self.partials[entries, 1:2] * tangent[self.parents[entries, 1]])
+        return tangent[self.outputs]
+
+    def to_dict(self):
+        """Returns the arrays of the tape, trimmed to its entries"""
+        return {'op': self.op[:self.size].copy(),
+                'parents': self.parents[:self.size].copy(),
+                'partials': self.partials[:self.size].copy(),
+                'const': self.const[:self.size].copy(),
+                'values': self.values[:self.size].copy(),
+                'inputs': self.inputs.copy(),
+                'outputs': self.outputs.copy(),
+                'kept': np.array(self.kept, dtype=np.int64),
+                'names': np.array(OPS)}
+
+    def save(self, file):
+        """Saves the tape to a .npz file"""
+        np.savez(file, **self.to_dict())
+
+    @classmethod
+    def load(cls, file):
+        """Loads a tape saved with Tape.save"""
+        with np.load(file) as data:
+            if tuple(data['names']) != OPS[:len(data['names'])]:
+                raise ValueError('Tape was saved with different op codes')
+            tape = cls(len(data['op']))
+            tape.size = len(data['op'])
+            for name in ('op', 'parents', 'partials', 'const', 'values', 'inputs', 'outputs'):
+                setattr(tape, name, data[name].copy())
+            # Tapes saved before guards were kept have none
+            tape.kept = [int(i) for i in data['kept']] if 'kept' in data else []
+        return tape
+
+def _scalar(value):
+    """Converts a Node value to a float, as tapes only hold scalar graphs"""
+    if np.ndim(value) != 0:
+        raise ValueError('Only graphs with scalar values can be recorded on a tape')
+    return float(value)
+
+_INPUT, _CONST = OPCODES['input'], OPCODES['const']
+_NAN = math.nan
+
+class _Recording:
+    """
+    The entries appended by the Tracers of one record() call
+
+    Each entry is a tuple (op code, parent, second parent, partial, second partial, constant, value, level), and
+    every _CHUNK of them are packed into one array of 8 columns. Nodes made outside of record(), such as ones a function
+    closes over, are recorded with the graph they were computed from the first time a Tracer is combined with them.
+    """
+
+    __slots__ = ('entries', 'offset', 'chunks', 'nodes')
+
+    def __init__(self):
+        self.entries = []
+        self.offset = 0
+        self.chunks = []
+        self.nodes = {}
+
+    def flush(self):
+        """Packs the entries appended since the last flush into an array"""
+        try:
+            chunk = np.array(self.entries, dtype=float).reshape(-1, 8)
+        except (TypeError, ValueError):
+            raise ValueError('Only graphs with scalar values can be recorded on a tape') from None
+        self.chunks.append(chunk)
+        self.offset += len(self.entries)
+        self.entries = []
+
+    def lift(self, node):
+        """Records a Node and the graph it was computed from, and returns the Tracer of the Node"""
+        if node not in self.nodes:
+            for parent in topological_order([node]):
+                if parent in self.nodes:
+                    continue
+                if not parent.parents:
+                    self.nodes[parent] = Tracer(self, _CONST, parent.real, const=parent.real)
+                    continue
+                if len(parent.parents) > 2 or parent.op not in OPCODES:
+                    raise ValueError(f"Operation `{parent.op}` cannot be recorded on a tape")
+                tracers = [self.nodes[grandparent] for grandparent in parent.parents] + [None]
+                partials = list(parent.partials) + [0.0]
+                self.nodes[parent] = Tracer(self, OPCODES[parent.op], parent.real, tracers[0], partials[0],
+                                            tracers[1], partials[1], _NAN if parent.const is None else parent.const)
+        return self.nodes[node]
+
+    def tape(self, inputs, outputs):
+        """Returns a tape of every entry recorded, with the given input Tracers and outputs"""
+        output_index = []
+        for output in outputs:
+            if isinstance(output, Node):
+                output = self.lift(output)
+            if not isinstance(output, Tracer):
+                output = Tracer(self, _CONST, output, const=output)
+            output_index.append(output.index)
+        self.flush()
+
+        # The arrays of the tape are filled one chunk at a time, dropping each chunk once it is copied
+        tape = Tape(self.offset)
+        tape.size = self.offset
+        levels = np.zeros(self.offset, dtype=np.int32)
+        self.chunks.reverse()
+        start = 0
+        while self.chunks:
+            chunk = self.chunks.pop()
+            end = start + len(chunk)
+            tape.op[start:end] = chunk[:, 0]
+            tape.parents[start:end] = chunk[:, 1:3]
+            tape.partials[start:end] = chunk[:, 3:5]
+            tape.const[start:end] = chunk[:, 5]
+            tape.values[start:end] = chunk[:, 6]
+            levels[start:end] = chunk[:, 7]
+            start = end
+        tape._levels = levels
+        tape.inputs = np.array([tracer.index for tracer in inputs], dtype=np.int64)
+        tape.outputs = np.array(output_index, dtype=np.int64)
+        return tape
+
+class Tracer:
+    """
+    A scalar value being recorded on a tape by record(), used in place of a Node.
+
+    Every operation on a Tracer computes its value and local partial derivatives, appends them as one entry to its
+    recording, and returns a new Tracer holding the index and level of that entry. Entries refer to their parents by
+    index only, so Tracers that are no longer used are freed during the evaluation instead of being kept by a graph,
+    and the levels the sweeps are planned with come with the tape instead of another pass over it.
+    The functions of this package reach Tracers through their elementary methods, as they do TaylorNodes.
+    """
+
+    __slots__ = ('real', 'index', 'level', 'recording')
+
+    _elementary = True
+
+    # NumPy defers to the reflected methods, as it does for Nodes
+    __array_ufunc__ = None
+
+    def __init__(self, recording, op, value, parent=None, partial=0.0, other=None, other_partial=0.0, const=_NAN):
+        """Appends an entry with the given op code, value, parent Tracers, partial derivatives and constant operand"""
+        self.real = value
+        self.recording = recording
+        entries = recording.entries
+        self.index = recording.offset + len(entries)
+        if parent is None:
+            self.level = 0
+            entries.append((op, -1, -1, 0.0, 0.0, const, value, 0))
+        elif other is None:
+            self.level = parent.level + 1
+            entries.append((op, parent.index, -1, partial, 0.0, const, value, self.level))
+        else:
+            self.level = (parent.level if parent.level > other.level else other.level) + 1
+            entries.append((op, parent.index, other.index, partial, other_partial, const, value, self.level))
+        if len(entries) == _CHUNK:
+            recording.flush()
+
+    def __repr__(self):
+        return f"Tracer({self.real!r}, index={self.index})"
+
+    def _operand(self, other):
+        """The Tracer of another operand, recording it first if it is a Node, or None if it is a constant"""
+        if isinstance(other, Tracer):
+            return other
+        if isinstance(other, Node):
+            return self.recording.lift(other)
+        if not isinstance(other, CONSTANTS):
+            raise TypeError(f"Unsupported type `{type(other)}`")
+        return None
+
+    def __add__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return Tracer(self.recording, _ADD, self.real + tracer.real, self, 1.0, tracer, 1.0)
+        return Tracer(self.recording, _ADD, other + self.real, self, 1.0, const=other)
+
+    def __radd__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return tracer.__add__(self)
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return Tracer(self.recording, _SUB, self.real - tracer.real, self, 1.0, tracer, -1.0)
+        return Tracer(self.recording, _SUB, self.real - other, self, 1.0, const=other)
+
+    def __rsub__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return tracer.__sub__(self)
+        return Tracer(self.recording, _RSUB, other - self.real, self, -1.0, const=other)
+
+    def __mul__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return Tracer(self.recording, _MUL, self.real * tracer.real, self, tracer.real, tracer, self.real)
+        return Tracer(self.recording, _MUL, other * self.real, self, other, const=other)
+
+    def __rmul__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return tracer.__mul__(self)
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            if _any_zero(tracer.real):
+                raise ZeroDivisionError("division by zero")
+            return Tracer(self.recording, _DIV, self.real / tracer.real, self, 1 / tracer.real,
+                          tracer, -self.real / tracer.real ** 2)
+        if _any_zero(other):
+            raise ZeroDivisionError("division by zero")
+        return Tracer(self.recording, _DIV, self.real / other, self, 1 / other, const=other)
+
+    def __rtruediv__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return tracer.__truediv__(self)
+        return Tracer(self.recording, _RDIV, other / self.real, self, -other / self.real ** 2, const=other)
+
+    def __pow__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            value = self.real ** tracer.real
+            return Tracer(self.recording, _POW, value, self, tracer.real * self.real ** (tracer.real - 1),
+                          tracer, value * _log(self.real))
+        return Tracer(self.recording, _POW, self.real ** other, self, other * self.real ** (other - 1), const=other)
+
+    def __rpow__(self, other):
+        tracer = self._operand(other)
+        if tracer is not None:
+            return tracer.__pow__(self)
+        value = other ** self.real
+        return Tracer(self.recording, _RPOW, value, self, value * _log(other), const=other)
+
+    def __neg__(self):
+        return Tracer(self.recording, _NEG, -self.real, self, -1.0)
+
+    def _compared(self, other):
+        tracer = self._operand(other)
+        return other if tracer is None else tracer.real
+
+    def __gt__(self, other):
+        return self.real > self._compared(other)
+
+    def __lt__(self, other):
+        return self.real < self._compared(other)
+
+    def __ge__(self, other):
+        return self.real >= self._compared(other)
+
+    def __le__(self, other):
+        return self.real <= self._compared(other)
+
+    def _unary(self, kernel, op):
+        value, derivative = _f._apply(kernel, self.real)
+        return Tracer(self.recording, op, value, self, derivative)
+
+    def sin(self):
+        return self._unary(_f._sin, _SIN)
+
+    def cos(self):
+        return self._unary(_f._cos, _COS)
+
+    def tan(self):
+        return self._unary(_f._tan, _TAN)
+
+    def exp(self):
+        # Recorded as e ** self, as exp() records a Node
+        value, derivative = _f._apply(_f._exp, self.real)
+        return Tracer(self.recording, _RPOW, value, self, derivative, const=math.e)
+
+    def log(self):
+        if _any_zero(self.real):
+            raise ValueError("Cannot take log of 0")
+        return self._unary(_f._log, _LOG)
+
+    def logbase(self, base):
+        scale = _f._inverse_log(base)
+        value, derivative = _f._apply(_f._log, self.real)
+        return Tracer(self.recording, _LOGBASE, value * scale, self, derivative * scale, const=base)
+
+    def logistic(self):
+        return self._unary(_f._logistic, _LOGISTIC)
+
+    def arcsin(self):
+        return self._unary(_f._arcsin, _ARCSIN)
+
+    def arccos(self):
+        return self._unary(_f._arccos, _ARCCOS)
+
+    def arctan(self):
+        return self._unary(_f._arctan, _ARCTAN)
+
+    def sinh(self):
+        return self._unary(_f._sinh, _SINH)
+
+    def cosh(self):
+        return self._unary(_f._cosh, _COSH)
+
+    def tanh(self):
+        return self._unary(_f._tanh, _TANH)
+
+    def sqrt(self):
+        return self._unary(_f._sqrt, _SQRT)
+
+    @staticmethod
+    def apply(op, evaluate, args):
+        """Records a primitive registered with register_op, applied to Tracers, Nodes and constants, and returns its Tracer"""
+        if op not in OPCODES:
+            raise ValueError(f"Operation `{op}` cannot be recorded on a tape")
+        recording = next(arg.recording for arg in args if isinstance(arg, Tracer))
+        tracers = []
+        for arg in args:
+            if isinstance(arg, Node):
+                arg = recording.lift(arg)
+            elif not isinstance(arg, Tracer):
+                arg = Tracer(recording, _CONST, arg, const=arg)
+            tracers.append(arg)
+        value, partials = evaluate(*[tracer.real for tracer in tracers])
+        if len(tracers) == 1:
+            return Tracer(recording, OPCODES[op], value, tracers[0], partials[0])
+        return Tracer(recording, OPCODES[op], value, tracers[0], partials[0], tracers[1], partials[1])
+
+(_ADD, _SUB, _RSUB, _MUL, _DIV, _RDIV, _POW, _RPOW, _NEG, _SIN, _COS, _TAN, _LOG, _LOGBASE, _LOGISTIC,
+ _ARCSIN, _ARCCOS, _ARCTAN, _SINH, _COSH, _TANH, _SQRT) = range(OPCODES['add'], OPCODES['sqrt'] + 1)
+
+def record(function, val):
+    """
+    Evaluate function(s) at specific input(s) and record their computational graph on a tape
+
+    Parameters
+    ----------
+    function :
+        The function to be recorded, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function,
+        and a function may return a list of outputs
+    val :
+        Value to evaluate the function at. Either a list or a single value
+
+    Returns
+    -------
+    Tape: tape
+        The recorded tape, with one input per value and one output per function output
+
+    Examples
+    --------
+    >>> tape = record(lambda x: x[0] * x[1] + x[0], [2, 3])
+    >>> print(tape.output_values, tape.gradient())
+    [8.0] [4. 2.]
+    """
+    recording = _Recording()
+    if isinstance(val, list):
+        inputs = [Tracer(recording, _INPUT, _scalar(v)) for v in val]
+        node_vals = inputs
+    else:
+        node_vals = Tracer(recording, _INPUT, _scalar(val))
+        inputs = [node_vals]
+
+    if not isinstance(function, list):
+        function = [function]
+
+    outputs = []
+    for f in function:
+        output = f(node_vals)
+        outputs.extend(output if isinstance(output, (list, tuple)) else [output])
+    return recording.tape(inputs, outputs)
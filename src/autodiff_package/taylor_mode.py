@@ -0,0 +1,369 @@
+"""
+A module for higher-order forward mode differentiation, with truncated Taylor series in place of dual numbers.
+
+A TaylorNode holds the Taylor coefficients c[0], ..., c[k] of a value x(t) = c[0] + c[1] t + ... + c[k] t^k as one
+NumPy array, where c[j] is the jth derivative divided by j!. Every operator of node.py and every function of
+functions.py maps the coefficients of its arguments to those of its result: products are truncated convolutions,
+and division and the elementary functions use the recurrences that follow from the differential equation each one
+satisfies (exp' = exp, sin' = cos, tan' = 1 + tan^2, ...). Each costs O(k^2) operations on arrays, so all k
+derivatives come out of one evaluation of the function, where nesting dual numbers costs 2^k. The coefficients may
+have more axes after the first, to expand many points at once elementwise.
+"""
+import math
+import numpy as np
+try:
+    from autodiff_package.node import CONSTANTS
+except:
+    from node import CONSTANTS
+
+def _weights(a):
+    """The coefficients of the derivative scaled by t, j * a[j], shaped to broadcast against a"""
+    return np.arange(len(a)).reshape((-1,) + (1,) * (a.ndim - 1)) * a
+
+def _convolve(a, b, n):
+    """The nth coefficient of the product of two series: the sum of a[j] * b[n - j]"""
+    return (a[:n + 1] * b[n::-1]).sum(axis=0)
+
+def _mul(a, b):
+    return np.array([_convolve(a, b, n) for n in range(len(a))])
+
+def _div(a, b):
+    """Series division, c = a / b, by solving a = b * c for one coefficient at a time"""
+    c = np.zeros(np.broadcast(a, b).shape)
+    if not len(c):
+        return c
+    c[0] = a[0] / b[0]
+    for n in range(1, len(c)):
+        c[n] = (a[n] - (b[1:n + 1] * c[n - 1::-1]).sum(axis=0)) / b[0]
+    return c
+
+def _integrate(y0, q):
+    """The series with constant term y0 whose derivative is the series q, one coefficient shorter"""
+    n = np.arange(1, len(q) + 1).reshape((-1,) + (1,) * (q.ndim - 1))
+    return np.concatenate([np.asarray(y0, dtype=float)[None], q / n])
+
+def _derivative(a):
+    """The series of the derivative, one coefficient shorter"""
+    return _weights(a)[1:]
+
+def _exp(a):
+    """exp(a), from y' = y a'"""
+    y = np.zeros(a.shape)
+    y[0] = np.exp(a[0])
+    w = _weights(a)
+    for n in range(1, len(a)):
+        y[n] = (w[1:n + 1] * y[n - 1::-1]).sum(axis=0) / n
+    return y
+
+def _trig(a, sign):
+    """sin(a) and cos(a) for sign -1, or sinh(a) and cosh(a) for sign 1, from s' = c a' and c' = sign s a'"""
+    s, c = np.zeros(a.shape), np.zeros(a.shape)
+    s[0], c[0] = (np.sinh(a[0]), np.cosh(a[0])) if sign > 0 else (np.sin(a[0]), np.cos(a[0]))
+    w = _weights(a)
+    for n in range(1, len(a)):
+        s[n] = (w[1:n + 1] * c[n - 1::-1]).sum(axis=0) / n
+        c[n] = sign * (w[1:n + 1] * s[n - 1::-1]).sum(axis=0) / n
+    return s, c
+
+def _tan(a, sign):
+    """tan(a) for sign 1, or tanh(a) for sign -1, from t' = (1 + sign t^2) a'"""
+    t, u = np.zeros(a.shape), np.zeros(a.shape)
+    t[0] = np.tan(a[0]) if sign > 0 else np.tanh(a[0])
+    w = _weights(a)
+    for n in range(1, len(a)):
+        # u holds 1 + sign t^2, whose coefficient n - 1 only needs t up to n - 1
+        u[n - 1] = (n == 1) + sign * _convolve(t, t, n - 1)
+        t[n] = (w[1:n + 1] * u[n - 1::-1]).sum(axis=0) / n
+    return t
+
+def _pow(a, p):
+    """a ** p for a constant p, from a y' = p y a'"""
+    if isinstance(p, int) and p >= 0:
+        # Repeated squaring, which also holds where a[0] is 0
+        y, base = np.zeros(a.shape), a
+        y[0] = 1
+        while p:
+            if p & 1:
+                y = _mul(y, base)
+            base = _mul(base, base)
+            p >>= 1
+        return y
+    y = np.zeros(np.broadcast(a, p).shape)
+    y[0] = (a[:1] ** p)[0]
+    j = np.arange(len(a)).reshape((-1,) + (1,) * (a.ndim - 1))
+    for n in range(1, len(a)):
+        y[n] = (((p + 1) * j[1:n + 1] - n) * a[1:n + 1] * y[n - 1::-1]).sum(axis=0) / (n * a[0])
+    return y
+
+def _log(a):
+    """log(a), from y' = a' / a"""
+    if np.any(a[0] == 0):
+        raise ValueError("Cannot take log of 0")
+    return _integrate(np.log(a[0]), _div(_derivative(a), a[:-1]))
+
+def _lift(value, like):
+    """The series of a constant: the value followed by zeros, as long as like and broadcast with its values"""
+    value = np.asarray(value, dtype=float)
+    c = np.zeros(like.shape[:1] + np.broadcast_shapes(like.shape[1:], value.shape))
+    c[0] = value
+    return c
+
+def _expand(a, ndim):
+    """The series a with axes added after the first, so that ndim - 1 axes follow it"""
+    return a.reshape(a.shape[:1] + (1,) * (ndim - a.ndim) + a.shape[1:])
+
+def _align(a, b):
+    """
+    Two series shaped so their values broadcast elementwise, as a constant of any shape does with the value of a series,
+    rather than along the first axis that holds the coefficients
+    """
+    ndim = max(a.ndim, b.ndim)
+    return _expand(a, ndim), _expand(b, ndim)
+
+def _series(value, step, order):
+    """The coefficients of value + step * t"""
+    c = np.zeros((order + 1,) + np.shape(np.broadcast(value, step)))
+    c[0] = value
+    if order:
+        c[1] = step
+    return c
+
+# The factorials that are finite as floats, 0! to 170!
+_EXACT_FACTORIALS = 171
+
+class TaylorNode:
+    """
+    A value together with its derivatives up to a fixed order, stored as the coefficients of its truncated Taylor series
+
+    TaylorNodes combine with each other and with integers, floats, and NumPy values through the same operators as Nodes,
+    and every function of functions.py accepts them. Comparisons compare the values, so functions may branch on them.
+    """
+
+    # NumPy defers to the reflected methods, as for Nodes
+    __array_ufunc__ = None
+
+    __slots__ = ('coefficients',)
+
+    # Marks the type for functions.py, which calls the method of the same name for sin, exp, and so on
+    _elementary = True
+
+    def __init__(self, coefficients):
+        """Initializes a TaylorNode from its coefficients, c[j] being the jth derivative divided by j!"""
+        self.coefficients = np.asarray(coefficients, dtype=float)
+
+    @property
+    def real(self):
+        """The value, the constant coefficient"""
+        return self.coefficients[0]
+
+    @property
+    def order(self):
+        """The highest derivative held"""
+        return len(self.coefficients) - 1
+
+    @property
+    def derivatives(self):
+        """
+        The value and its derivatives up to the order held: the coefficients times j!
+
+        j! is exact as a float up to 170!, and beyond it (where it overflows) each coefficient is scaled through the
+        logarithms instead, so a derivative is only inf where its own value overflows
+        """
+        c = self.coefficients
+        shape = (-1,) + (1,) * (c.ndim - 1)
+        exact = min(len(c), _EXACT_FACTORIALS)
+        factorials = np.array([math.factorial(j) for j in range(exact)], dtype=float).reshape(shape)
+        if exact == len(c):
+            return c * factorials
+        log_factorials = np.array([math.lgamma(j + 1) for j in range(exact, len(c))]).reshape(shape)
+        with np.errstate(divide='ignore', over='ignore'):
+            large = np.where(c[exact:] == 0, 0.0, np.sign(c[exact:]) * np.exp(np.log(np.abs(c[exact:])) + log_factorials))
+        return np.concatenate([c[:exact] * factorials, large])
+
+    def _other(self, other):
+        """The coefficients of this node and of another operand, aligned to broadcast with each other"""
+        if isinstance(other, TaylorNode):
+            return _align(self.coefficients, other.coefficients)
+        if isinstance(other, CONSTANTS):
+            return _align(self.coefficients, _lift(other, self.coefficients))
+        raise TypeError(f"Unsupported type `{type(other)}`")
+
+    def _constant(self, other):
+        """The coefficients of this node and a constant, shaped to scale every coefficient by the constant elementwise"""
+        other = np.asarray(other, dtype=float)
+        return _expand(self.coefficients, other.ndim + 1), other[None]
+
+    def __repr__(self):
+        return f"TaylorNode({self.coefficients!r})"
+
+    def __add__(self, other):
+        a, b = self._other(other)
+        return TaylorNode(a + b)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        a, b = self._other(other)
+        return TaylorNode(a - b)
+
+    def __rsub__(self, other):
+        a, b = self._other(other)
+        return TaylorNode(b - a)
+
+    def __mul__(self, other):
+        if isinstance(other, CONSTANTS):
+            a, c = self._constant(other)
+            return TaylorNode(a * c)
+        return TaylorNode(_mul(*self._other(other)))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if isinstance(other, CONSTANTS):
+            a, c = self._constant(other)
+            if np.any(c == 0):
+                raise ZeroDivisionError("division by zero")
+            return TaylorNode(a / c)
+        a, b = self._other(other)
+        if np.any(b[0] == 0):
+            raise ZeroDivisionError("division by zero")
+        return TaylorNode(_div(a, b))
+
+    def __rtruediv__(self, other):
+        if np.any(self.coefficients[0] == 0):
+            raise ZeroDivisionError("division by zero")
+        a, b = self._other(other)
+        return TaylorNode(_div(b, a))
+
+    def __pow__(self, other):
+        if isinstance(other, TaylorNode):
+            return (other * self.log()).exp()
+        if not isinstance(other, CONSTANTS):
+            raise TypeError(f"Unsupported type `{type(other)}`")
+        if np.ndim(other) == 0 and float(other).is_integer() and other >= 0:
+            return TaylorNode(_pow(self.coefficients, int(other)))
+        return TaylorNode(_pow(*self._constant(other)))
+
+    def __rpow__(self, other):
+        if not isinstance(other, CONSTANTS):
+            raise TypeError(f"Unsupported type `{type(other)}`")
+        return (self * np.log(other)).exp()
+
+    def __neg__(self):
+        return TaylorNode(-self.coefficients)
+
+    def __gt__(self, other):
+        return self.real > (other.real if isinstance(other, TaylorNode) else other)
+
+    def __lt__(self, other):
+        return self.real < (other.real if isinstance(other, TaylorNode) else other)
+
+    def __ge__(self, other):
+        return self.real >= (other.real if isinstance(other, TaylorNode) else other)
+
+    def __le__(self, other):
+        return self.real <= (other.real if isinstance(other, TaylorNode) else other)
+
+    def sin(self):
+        return TaylorNode(_trig(self.coefficients, -1)[0])
+
+    def cos(self):
+        return TaylorNode(_trig(self.coefficients, -1)[1])
+
+    def tan(self):
+        return TaylorNode(_tan(self.coefficients, 1))
+
+    def exp(self):
+        return TaylorNode(_exp(self.coefficients))
+
+    def log(self):
+        return TaylorNode(_log(self.coefficients))
+
+    def logbase(self, base):
+        return self.log() / np.log(base)
+
+    def logistic(self):
+        return 1 / (1 + (-self).exp())
+
+    def arcsin(self):
+        a = self.coefficients
+        return TaylorNode(_integrate(np.arcsin(a[0]), _div(_derivative(a), _pow(_lift(1, a) - _mul(a, a), 0.5)[:-1])))
+
+    def arccos(self):
+        a = self.coefficients
+        return TaylorNode(_integrate(np.arccos(a[0]), -_div(_derivative(a), _pow(_lift(1, a) - _mul(a, a), 0.5)[:-1])))
+
+    def arctan(self):
+        a = self.coefficients
+        return TaylorNode(_integrate(np.arctan(a[0]), _div(_derivative(a), (_lift(1, a) + _mul(a, a))[:-1])))
+
+    def sinh(self):
+        return TaylorNode(_trig(self.coefficients, 1)[0])
+
+    def cosh(self):
+        return TaylorNode(_trig(self.coefficients, 1)[1])
+
+    def tanh(self):
+        return TaylorNode(_tan(self.coefficients, -1))
+
+    def sqrt(self):
+        return TaylorNode(_pow(self.coefficients, 0.5))
+
+def taylor(fun, val, order, direction=None, coefficients=False):
+    """
+    Calculate the derivatives of function(s) up to a given order along a direction, in one forward pass
+
+    Parameters
+    ----------
+    fun :
+        The function to be differentiated, must be inputted using Python's lambda syntax
+        Can be either a list of lambda functions (a vector function), or a single lambda function
+    val :
+        Value to expand the function around. Either a list or a single value (which may be a NumPy array,
+        to expand around every point of it at once)
+    order :
+        The highest derivative to calculate
+    direction :
+        The direction to differentiate in, with the same dimension as val. Defaults to 1 for a single value,
+        and must be given for a list of values
+    coefficients :
+        Whether to return the Taylor coefficients, the jth derivative divided by j!, in place of the derivatives.
+        At high orders these often stay finite where the derivatives overflow
+
+    Returns
+    -------
+    Derivatives: array
+        The derivatives of f(val + t * direction) with respect to t at t = 0, from the value (the 0th derivative)
+        up to the given order, with shape (order + 1,), or (m, order + 1) for a vector function with m outputs.
+        Dividing the jth derivative by j! gives the Taylor coefficients, which are returned if coefficients is True
+
+    Examples
+    --------
+    >>> print(taylor(lambda x: exp(2 * x), 0.0, 4))
+    [ 1.  2.  4.  8. 16.]
+    >>> print(taylor(lambda x: x[0] * x[1], [1.0, 2.0], 2, direction=[1.0, 1.0]))
+    [2. 3. 2.]
+    """
+    if isinstance(val, list):
+        if direction is None or np.shape(direction) != np.shape(val):
+            raise ValueError('A direction of the same dimension as the values is needed for a list of values')
+        inputs = [TaylorNode(_series(val[i], direction[i], order)) for i in range(len(val))]
+    else:
+        inputs = TaylorNode(_series(val, 1.0 if direction is None else direction, order))
+    constant = np.zeros((order + 1,) + (() if isinstance(val, list) else np.shape(val)))
+
+    is_funlist = isinstance(fun, list)
+    derivatives = []
+    for f in (fun if is_funlist else [fun]):
+        outputs = f(inputs)
+        if isinstance(outputs, (list, tuple)):
+            is_funlist = True
+        else:
+            outputs = [outputs]
+        for output in outputs:
+            if not isinstance(output, TaylorNode):
+                output = TaylorNode(_lift(output, constant))
+            derivatives.append(output.coefficients if coefficients else output.derivatives)
+    return np.array(derivatives) if is_funlist else derivatives[0]
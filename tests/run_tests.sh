@@ -13,6 +13,21 @@ tests=(
     # test_dualnums.py
     test_node.py
     test_functions.py
+    test_tape.py
+    test_compiled.py
+    test_optimize.py
+    test_codegen.py
+    test_sparse.py
+    test_auto.py
+    test_parallel.py
+    test_server.py
+    test_checkpoint.py
+    test_primitives.py
+    test_profiling.py
+    test_import.py
+    test_taylor.py
+    test_cache.py
+    test_streaming.py
 )
 
 # gets present directory, goes back, then goes into src.
@@ -0,0 +1,60 @@
+"""
+This module contains tests for choosing forward or reverse mode automatically.
+"""
+
+import pytest
+import numpy as np
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from auto import jacobian, estimate
+from differentiate import grad
+import functions as f
+
+
+class TestAuto:
+    """These are test methods for the cost model and the Jacobians it picks a mode for."""
+
+    def test_estimate(self):
+        """This is the test for the cost model preferring forward mode for few inputs and reverse mode for few outputs."""
+        assert min(estimate(1000, 1, 100).items(), key=lambda c: c[1])[0] == 'reverse'
+        assert min(estimate(1, 1000, 100).items(), key=lambda c: c[1])[0] == 'forward'
+        costs = estimate(2000, 2000, 100, (3, 40))
+        assert min(costs, key=costs.get) == 'sparse forward'
+
+    def test_jacobian(self):
+        """This is the test for every mode giving the Jacobian from grad(), with the chosen mode reported."""
+        x = [0.5, 1.5, -2.0]
+        fun = [lambda z: z[0] * f.sin(z[1]) + z[2] ** 2, lambda z: [f.exp(z[0]) / z[1], 4.0]]
+        expected_values, expected = grad(fun, x)
+        expected = np.array([np.broadcast_to(row, 3) for row in expected])
+        for mode in ('auto', 'forward', 'reverse', 'sparse'):
+            values, J, plan = jacobian(fun, x, mode)
+            assert values == pytest.approx(expected_values)
+            assert J == pytest.approx(expected)
+            assert plan['inputs'] == 3 and plan['outputs'] == 3
+            assert plan['cost'] == plan['costs'][plan['mode']]
+            assert plan['mode'] == mode or mode in ('auto', 'sparse')
+
+        # A scalar loss of many inputs, and many outputs of a single value
+        values, J, plan = jacobian(lambda z: sum(z[i] * z[i] for i in range(1000)), list(np.ones(1000)))
+        assert plan['mode'] == 'reverse'
+        assert J == pytest.approx(2 * np.ones((1, 1000)))
+        values, J, plan = jacobian(lambda z: [f.sin(z) * k for k in range(1000)], 0.5)
+        assert plan['mode'] == 'forward'
+        assert J[:, 0] == pytest.approx(np.cos(0.5) * np.arange(1000))
+
+        # Every mode runs on the graph recorded to choose it, so the function is evaluated once
+        calls = []
+        def fun1(z):
+            calls.append(1)
+            return [z[0] * z[1], f.sin(z[2])]
+        for mode in ('auto', 'forward', 'reverse', 'sparse'):
+            calls.clear()
+            values, J, plan = jacobian(fun1, x, mode)
+            assert J == pytest.approx(np.array([[1.5, 0.5, 0.0], [0.0, 0.0, np.cos(-2.0)]]))
+            assert len(calls) == 1
+
+        with pytest.raises(ValueError):
+            jacobian(fun, x, 'sideways')
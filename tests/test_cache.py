@@ -0,0 +1,181 @@
+"""
+This module contains tests for caching the results of grad and reverse.
+"""
+
+import pytest
+import numpy as np
+import threading
+import types
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from cache import GradientCache, cached_reverse, cached_grad, default_cache
+from differentiate import grad, reverse
+import functions as f
+from functions import sin, exp, log, sqrt
+from test_import import run
+
+scale = 2.0
+
+# A module of the program holding settings, as in `import config`
+config = types.ModuleType('config')
+config.scale = 2.0
+
+class TestCache:
+    """
+    These are test methods for GradientCache.
+    """
+
+    def test_hits_and_copies(self):
+        """
+        This is the test that a repeated call is answered from the cache, with a result that can be changed freely.
+        """
+        cache = GradientCache()
+        fun = [lambda x: x[0] * f.sin(x[1]), lambda x: [f.exp(x[0]), x[1] ** 2]]
+        expected = reverse(fun, [1.0, 2.0])
+        first = cache.reverse(fun, [1.0, 2.0])
+        first[1][0][0] = 'changed'
+        assert cache.reverse(fun, [1.0, 2.0]) == expected
+        assert cache.reverse(fun, [1.0, 2.5]) == reverse(fun, [1.0, 2.5])
+        assert cache.reverse(fun, [1.0, 2.0], seed=[1, 1]) == reverse(fun, [1.0, 2.0], seed=[1, 1])
+        assert cache.grad(fun, [1.0, 2.0])[0] == pytest.approx(expected[0])
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['size']) == (1, 4, 4)
+
+        # Arrays are inputs like any other, and cached_grad uses the default cache
+        X = np.array([0.5, 1.5])
+        default_cache.clear()
+        assert cached_grad(lambda x: f.sin(x) * x, X)[1][0] == pytest.approx(np.cos(X) * X + np.sin(X))
+        X[0] = 1.0
+        assert cached_grad(lambda x: f.sin(x) * x, X)[1][0] == pytest.approx(np.cos(X) * X + np.sin(X))
+
+    def test_state_changes(self):
+        """
+        This is the test that results are not reused once a closure, global, or default argument changes.
+        """
+        global scale
+        cache = GradientCache()
+        offset = [1.0]
+        fun = lambda x, k=3.0: scale * x * offset[0] + k
+        assert cache.reverse(fun, 2.0) == ([7.0], [2.0])
+        scale = 5.0
+        assert cache.reverse(fun, 2.0) == ([13.0], [5.0])
+        offset[0] = 2.0
+        assert cache.reverse(fun, 2.0) == ([23.0], [10.0])
+        fun.__defaults__ = (0.0,)
+        assert cache.reverse(fun, 2.0) == ([20.0], [10.0])
+        assert cache.stats()['hits'] == 0
+        scale = 2.0
+
+        # Attributes read from a module of the program are part of the state
+        settings = GradientCache()
+        fun1 = lambda x: config.scale * x
+        assert settings.reverse(fun1, 1.0) == ([2.0], [2.0])
+        config.scale = 5.0
+        assert settings.reverse(fun1, 1.0) == ([5.0], [5.0])
+        config.scale = 2.0
+        assert settings.reverse(fun1, 1.0) == ([2.0], [2.0])
+        assert settings.stats()['hits'] == 1
+
+        # A function reading an object that cannot be fingerprinted must be declared pure
+        lock = threading.Lock()
+        with pytest.raises(ValueError):
+            cache.reverse(lambda x: x * 2 if lock else x, 1.0)
+        assert cache.reverse(lambda x: x * 2 if lock else x, 1.0, pure=True) == ([2.0], [2.0])
+
+        # Functions given a name share their results, and can be invalidated by it
+        for _ in range(3):
+            cached_reverse(lambda x: x ** 2, 3.0, name='square', pure=True, cache=cache)
+        assert cache.stats()['hits'] == 2
+        cache.invalidate(name='square')
+        cached_reverse(lambda x: x ** 2, 3.0, name='square', pure=True, cache=cache)
+        assert cache.stats()['hits'] == 2
+        cache.invalidate(fun)
+        cache.invalidate()
+        assert cache.stats()['size'] == 0 and cache.stats()['bytes'] == 0
+
+    def test_input_keys(self):
+        """
+        This is the test that floats are keyed by their bits, and that read-only arrays are hashed once.
+        """
+        import cache as c
+        cache = GradientCache()
+        fun = lambda x: x * 2
+        cache.reverse(fun, float('nan'))
+        cache.reverse(fun, float('nan'))
+        assert cache.stats()['hits'] == 1
+        assert cache.reverse(fun, -0.0) == ([-0.0], [2]) and cache.reverse(fun, 0.0) == ([0.0], [2])
+        assert cache.stats()['hits'] == 1 and cache.stats()['size'] == 3
+
+        # A read-only array is recognised by its identity until it is freed, and a writable one is hashed again
+        weights = np.arange(4.0)
+        fun1 = lambda x: x * weights[1]
+        cache.reverse(fun1, 1.0)
+        assert not any(entry[0]() is weights for entry in c._FROZEN.values())
+        weights[1] = 3.0
+        assert cache.reverse(fun1, 1.0) == ([3.0], [3.0])
+        weights.setflags(write=False)
+        assert cache.reverse(fun1, 1.0) == ([3.0], [3.0]) and cache.stats()['hits'] == 2
+        assert any(entry[0]() is weights for entry in c._FROZEN.values())
+        assert cache.reverse(fun1, 1.0) == ([3.0], [3.0]) and cache.stats()['hits'] == 3
+        frozen = len(c._FROZEN)
+        del fun1, weights
+        cache.clear()
+        assert len(c._FROZEN) == frozen - 1
+
+    def test_library_functions(self):
+        """
+        This is the test that functions of the package imported by name are keyed by themselves, not by their globals.
+        """
+        cache = GradientCache()
+        fun = lambda x: sin(x[0]) * x[1] + exp(x[0]) * log(x[1]) - sqrt(x[1]) * np.cos(1.0)
+        expected = reverse(fun, [1.0, 2.0])
+        assert cache.reverse(fun, [1.0, 2.0]) == expected
+        assert cache.reverse(fun, [1.0, 2.0]) == expected
+        assert cached_reverse(lambda x: sin(x[0]) * x[1], [1.0, 2.0], cache=cache)[1][0] == \
+            pytest.approx([np.cos(1.0) * 2.0, np.sin(1.0)])
+        assert cache.stats()['hits'] == 1
+
+        # The same through the package, in a new interpreter so its modules are not imported twice here
+        run('from autodiff_package import sin, exp, cached_reverse\n'
+            'for _ in range(2):\n'
+            '    assert cached_reverse(lambda x: sin(x[0]) * x[1] + exp(x[1]), [0.0, 0.0]) == ([1.0], [[0.0, 1.0]])\n')
+
+    def test_eviction_and_threads(self):
+        """
+        This is the test for least recently used eviction by count and by bytes, and for sharing a cache between threads.
+        """
+        cache = GradientCache(maxsize=2)
+        fun = lambda x: x * x
+        for x in (1.0, 2.0, 1.0, 3.0):
+            cache.reverse(fun, x)
+        assert cache.stats()['evictions'] == 1
+        cache.reverse(fun, 1.0)
+        cache.reverse(fun, 2.0)
+        assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 4
+
+        small = GradientCache(max_bytes=1000)
+        small.reverse(fun, 1.0)
+        size = small.stats()['bytes']
+        assert 0 < size <= 1000
+        for x in range(2, 20):
+            small.reverse(fun, float(x))
+        assert small.stats()['bytes'] <= 1000 and small.stats()['evictions'] > 0
+
+        shared = GradientCache()
+        errors = []
+        def work(i):
+            try:
+                for x in range(50):
+                    assert shared.reverse(fun, float(x % 10)) == ([float(x % 10) ** 2], [2.0 * (x % 10)])
+            except Exception as error:
+                errors.append(error)
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        stats = shared.stats()
+        assert stats['hits'] + stats['misses'] == 200 and stats['size'] == 10
@@ -0,0 +1,56 @@
+"""
+This module contains tests for checkpointed reverse mode.
+"""
+
+import pytest
+import numpy as np
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from checkpoint import checkpoint_reverse
+from differentiate import reverse
+import functions as f
+
+STEP = lambda s: [s[0] + 0.01 * s[1], s[1] - 0.01 * f.sin(s[0])]
+LOSS = lambda s: s[0] * s[1] + f.exp(s[1])
+
+
+def unrolled(x, n):
+    """The loop written out, for reverse() to record in one graph"""
+    for _ in range(n):
+        x = STEP(x)
+    return LOSS(x)
+
+
+class TestCheckpoint:
+    """These are test methods for checkpointed gradients of time-stepping loops."""
+
+    def test_checkpoint_reverse(self):
+        """This is the test for every snapshot budget giving the gradient of the unrolled loop."""
+        for n in (0, 1, 2, 7, 60):
+            expected_ans, expected_jac = reverse(lambda x: unrolled(x, n), [1.0, 0.5])
+            for snapshots in (None, 0, 1, 3, 100):
+                value, gradient, report = checkpoint_reverse(STEP, LOSS, [1.0, 0.5], n, snapshots)
+                assert value == pytest.approx(expected_ans[0])
+                assert gradient == pytest.approx(expected_jac[0])
+                assert report['held'] <= report['snapshots']
+
+        value, gradient, _ = checkpoint_reverse(lambda x: f.sin(x), lambda x: 2 * x, 0.5, 3)
+        assert gradient == pytest.approx(2 * np.cos(np.sin(np.sin(0.5))) * np.cos(np.sin(0.5)) * np.cos(0.5))
+
+    def test_report(self):
+        """This is the test for the number of recomputed steps following the binomial schedule."""
+        # 1000 steps need 4 repetitions with 10 snapshots, as binomial(14, 10) = 1001, so each step is recomputed at most 4 times
+        _, _, report = checkpoint_reverse(STEP, LOSS, [1.0, 0.5], 1000, snapshots=10)
+        assert report['held'] == 10
+        assert report['recomputed'] <= 4 * 1000
+        assert report['overhead'] == report['recomputed'] / 1000
+
+        # The forward pass places the first snapshots, so with one per step nothing is recomputed
+        _, _, report = checkpoint_reverse(STEP, LOSS, [1.0, 0.5], 200, snapshots=500)
+        assert report['recomputed'] == 0 and report['held'] == 199
+
+        # Without snapshots, every step is recomputed from the initial state
+        _, _, report = checkpoint_reverse(STEP, LOSS, [1.0, 0.5], 10, snapshots=0)
+        assert report['recomputed'] == 45 and report['held'] == 0
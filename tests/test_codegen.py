@@ -0,0 +1,95 @@
+"""
+This module contains tests for generating code from tapes.
+"""
+
+import pytest
+import numpy as np
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from tape import record
+from codegen import generate, compile_tape
+import codegen
+from differentiate import reverse
+from compiled import compile
+import functions as f
+
+# The functions used in test_differentiate.py, and one using every elementary function
+FUNCTIONS = [
+    (lambda z: 3.0 * z[0] + -2 * z[1] ** 2 + 5, [4, -3, 5]),
+    (lambda z: z[2] ** 2 + f.log(z[0]), [4, -3, 5]),
+    (lambda x: 1/2 * x[0] ** 2 - f.logbase(x[1],2) + x[2], [6, 4, -3]),
+    (lambda x: x[0] * x[1] + x[2], [6, 4, -3]),
+    (lambda z: [z[0] ** 3, z[0] + z[0]/2 - 3, 3.0 * z[0] * z[0] + 2.5 * z[0] + 2.0], [4]),
+    (lambda x: [f.sin(x[0]) * f.cos(x[1]) + f.tan(x[0] * x[1]), f.exp(x[0]) / f.sqrt(x[1]) - 2 ** x[0],
+                f.arcsin(x[0]) + f.arccos(x[0] / 2) * f.arctan(x[1]), f.sinh(x[0]) - f.cosh(x[1]) * f.tanh(x[0]),
+                f.logistic(x[0] - x[1]) + x[1] ** x[0] - 3 / x[0] + (-x[1]) - (1 - x[0])], [0.3, 1.7]),
+]
+
+
+class TestCodegen:
+    """These are test methods for generated code, checked against reverse()."""
+
+    def test_compile_tape(self):
+        """This is the test for generated scalar code matching reverse() at the recorded and at new inputs."""
+        for fun, x in FUNCTIONS:
+            evaluate = compile_tape(record(fun, x))
+            for point in (x, [v * 0.9 for v in x]):
+                ans, jac, kept = evaluate(point)
+                expected_ans, expected_jac = reverse(fun, point)
+                assert ans == pytest.approx(expected_ans)
+                assert np.array(jac) == pytest.approx(np.array(expected_jac))
+                assert kept == []
+
+        # Tapes with the same operations share one compiled function
+        assert compile_tape(record(FUNCTIONS[0][0], [1, 2, 3])) is compile_tape(record(FUNCTIONS[0][0], [4, 5, 6]))
+
+    def test_negative_base(self):
+        """This is the test for powers of a negative or zero constant, whose derivatives are NaN as in reverse()."""
+        for fun in (lambda x: (-2) ** x[0] * x[1], lambda x: 0 ** x[1] + x[0], lambda x: f.logbase(x[0], -3) + x[1]):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                expected_ans, expected_jac = reverse(fun, [2.0, 3.0])
+                for evaluate in (compile_tape(record(fun, [2.0, 3.0])), compile(fun, 2)):
+                    ans, jac = evaluate([2.0, 3.0])[:2]
+                    assert ans == pytest.approx(expected_ans, nan_ok=True)
+                    assert np.array(jac) == pytest.approx(np.array(expected_jac), nan_ok=True)
+            assert np.isnan(expected_jac[0]).any()
+
+    def test_cache(self, monkeypatch):
+        """This is the test that only the most recently used compiled functions are kept."""
+        monkeypatch.setattr(codegen, '_CACHE', codegen.OrderedDict())
+        monkeypatch.setattr(codegen, '_CACHE_SIZE', 2)
+        tapes = [record(lambda x: x * c, 2.0) for c in (3.0, 4.0, 5.0)]
+        first = compile_tape(tapes[0])
+        compile_tape(tapes[1])
+        assert compile_tape(tapes[0]) is first
+        compile_tape(tapes[2])
+        assert len(codegen._CACHE) == 2
+        assert compile_tape(tapes[0]) is first
+        assert compile_tape(tapes[1])([2.0]) == ([8.0], [[4.0]], [])
+
+    def test_numpy(self):
+        """This is the test for generated NumPy code evaluating many points at once."""
+        fun, x = FUNCTIONS[-1]
+        evaluate = compile_tape(record(fun, x), backend='numpy')
+        points = np.array([[0.3, 1.7], [0.1, 0.5], [0.6, 2.2]])
+        ans, jac, _ = evaluate([points[:, 0], points[:, 1]])
+        for i, point in enumerate(points):
+            expected_ans, expected_jac = reverse(fun, list(point))
+            assert [a[i] for a in ans] == pytest.approx(expected_ans)
+            assert np.array([[np.broadcast_to(g, 3)[i] for g in row] for row in jac]) == pytest.approx(np.array(expected_jac))
+
+        with pytest.raises(ValueError):
+            generate(record(fun, x), backend='fortran')
+
+    def test_source(self):
+        """This is the test for the generated source being straight-line code without Nodes."""
+        source = generate(record(lambda x: x[0] * f.sin(x[1]) + 1, [2.0, 0.5]))
+        assert 'Node' not in source
+        assert 'math.sin(v1)' in source
+        assert source.startswith('def evaluate(x):')
+
+        compiled = compile(lambda x: f.exp(x[0]) * x[1] if x[0] > 0 else x[1], 2, backend='tape')
+        assert compiled([0.0, 2.0]) == ([2.0], [[0.0, 1.0]])
+        assert compiled([1.0, 2.0])[1][0] == pytest.approx([2 * np.e, np.e])
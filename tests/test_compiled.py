@@ -0,0 +1,117 @@
+"""
+This module contains tests for compiled functions.
+"""
+
+import pytest
+import numpy as np
+
+import sys
+import threading
+sys.path.append('../src/autodiff_package/')
+
+from compiled import compile
+from differentiate import reverse
+import functions as f
+
+
+class TestCompiled:
+    """These are test methods for tracing, replaying, and retracing compiled functions."""
+
+    def test_replay(self):
+        """This is the test for replaying a compiled function at new inputs without calling it again."""
+        calls = []
+        def fun0(x):
+            calls.append(1)
+            return [x[0] * f.sin(x[1]) + x[2] ** 2, f.exp(x[0]) / x[2]]
+
+        compiled = compile(fun0, 3)
+        for x in ([1.0, 2.0, 3.0], [0.5, -1.0, 2.0], [2.0, 0.1, -4.0]):
+            ans, jac = compiled(x)
+            expected_ans, expected_jac = reverse(fun0, x)
+            assert ans == pytest.approx(expected_ans)
+            assert np.array(jac) == pytest.approx(np.array(expected_jac))
+
+        assert compiled.trace_count == 1
+        assert len(calls) == 4
+
+        compiled1 = compile(lambda x: x ** 3, None)
+        assert compiled1(2) == ([8.0], [12.0])
+        assert compiled1(3) == ([27.0], [27.0])
+
+        with pytest.raises(ValueError):
+            compiled([1.0, 2.0])
+
+    def test_guards(self):
+        """This is the test for retracing only when a guarded branch changes."""
+        def fun0(x):
+            y = x[0] * x[1]
+            if y > 1:
+                return y + x[0]
+            if x[1] < x[0]:
+                return y - x[1]
+            return -y
+
+        compiled = compile(fun0, 2)
+        assert compiled([2, 3]) == ([8.0], [[4.0, 2.0]])
+        assert compiled([3, 4]) == ([15.0], [[5.0, 3.0]])
+        assert compiled.trace_count == 1
+
+        assert compiled([0.5, 0.25]) == ([-0.125], [[0.25, -0.5]])
+        assert compiled.trace_count == 2
+        assert compiled([0.25, 0.5]) == ([-0.125], [[-0.5, -0.25]])
+        assert compiled.trace_count == 3
+
+        # Earlier branches are still cached
+        assert compiled([1, 2]) == ([3.0], [[3.0, 1.0]])
+        assert compiled([0.5, 0.25]) == ([-0.125], [[0.25, -0.5]])
+        assert compiled.trace_count == 3
+
+        # A trace of another branch that fails at the new inputs is a guard miss, not an error
+        compiled1 = compile(lambda x: f.log(x) if x > 0 else -x)
+        assert compiled1(2.0) == ([pytest.approx(np.log(2))], [0.5])
+        assert compiled1(-1.0) == ([1.0], [-1.0])
+        assert compiled1(3.0) == ([pytest.approx(np.log(3))], [pytest.approx(1 / 3)])
+        assert compiled1.trace_count == 2
+
+        compiled2 = compile(lambda x: f.sqrt(x[0]) if x[0] > 0 else x[1], 2)
+        assert compiled2([4.0, 1.0]) == ([2.0], [[0.25, 0.0]])
+        assert compiled2([-4.0, 1.0]) == ([1.0], [[0.0, 1.0]])
+        assert compiled2.trace_count == 2
+
+    def test_trace_logs(self):
+        """This is the test for tracing in several threads at once, inside another trace, and at inputs the trace fails at."""
+        barrier = threading.Barrier(2)
+        def fun0(x):
+            first = x > 0
+            barrier.wait(timeout=10)
+            second = x < 10
+            barrier.wait(timeout=10)
+            return x * 2 if first and second else -x
+
+        compiled = [compile(fun0), compile(fun0)]
+        threads = [threading.Thread(target=c, args=(x,)) for c, x in zip(compiled, (1.0, 2.0))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for c in compiled:
+            assert [guard[0] for guard in c.traces[0][1]] == ['gt', 'lt']
+
+        inner = compile(lambda x: x * x if x > 0 else -x)
+        def fun1(x):
+            scale = inner(2.0)[0][0]
+            if x > 0:
+                return x * scale
+            return -x
+        outer = compile(fun1)
+        assert outer(1.0) == ([4.0], [4.0])
+        assert outer(-1.0) == ([1.0], [-1.0])
+        assert outer.trace_count == 2
+
+        # A trace that fails at the inputs it was made at is not cached
+        compiled1 = compile(lambda x: f.log(x))
+        with np.errstate(invalid='ignore'), pytest.raises(ValueError):
+            compiled1(-1.0)
+        assert compiled1.traces == []
+        assert compiled1(2.0) == ([pytest.approx(np.log(2))], [0.5])
+        assert compiled1.trace_count == 2
@@ -9,7 +9,7 @@ import numpy as np
 #from autodiff_package.dualnums import DualNumber
 
 
-from differentiate import grad, reverse
+from differentiate import grad, grad_batch, reverse, hvp, hessian, jvp, vjp, jvp_batch, vjp_batch
 import functions as f
 
 class TestDifferentiate:
@@ -142,3 +142,259 @@ class TestDifferentiate:
 
         with pytest.raises(ValueError):
             grad(fun5,x1,seed1)
+
+    def test_reverse_shared_graph(self):
+        """Tests that reverse handles deep graphs with heavily shared subexpressions"""
+        depth = 60
+        def fun0(z):
+            y = z
+            for _ in range(depth):
+                y = 0.5 * (y * y) + y * 0.5
+            return y
+
+        ans0, jac0 = reverse(fun0, 1.0)
+        assert ans0[0] == 1.0
+        assert jac0[0] == pytest.approx(1.5 ** depth)
+
+        def fun1(z):
+            y = z[0]
+            for _ in range(20000):
+                y = y + z[1]
+            return y
+
+        ans1, jac1 = reverse(fun1, [1, 2])
+        assert ans1[0] == 40001
+        assert jac1[0] == [1, 20000]
+
+        ans2, jac2 = reverse(lambda z: 3, [1, 2])
+        assert ans2[0] == 3
+        assert jac2[0] == [0, 0]
+
+    def test_reverse_vector_output(self):
+        """Tests that reverse handles a single function returning several outputs that share intermediates"""
+        x0 = [1, 2]
+        calls = []
+        def fun0(z):
+            calls.append(1)
+            shared = z[0] * z[1]
+            return [shared + z[0], shared * shared, 4]
+
+        ans0, jac0 = reverse(fun0, x0)
+        assert len(calls) == 1
+        assert ans0 == [3, 4, 4]
+        assert jac0[0] == [3, 1]
+        assert jac0[1] == [8, 4]
+        assert jac0[2] == [0, 0]
+
+        ans1, jac1 = reverse([fun0, lambda z: z[1] ** 2], x0, [1, 0])
+        assert ans1 == [3, 4, 4, 4]
+        assert jac1 == [3, 8, 0, 0]
+
+    def test_grad_vector_tangents(self):
+        """Tests that grad evaluates each function once, carrying every partial derivative in the dual"""
+        x0 = list(np.linspace(0.5, 2, 50))
+        calls = []
+        def fun0(z):
+            calls.append(1)
+            total = 0
+            for i in range(len(z)):
+                total = total + (i + 1) * z[i] ** 2 + f.logistic(z[i])
+            return total
+
+        ans0, jac0 = grad(fun0, x0)
+        assert len(calls) == 1
+        x = np.array(x0)
+        sigma = 1 / (1 + np.exp(-x))
+        assert jac0[0] == pytest.approx(2 * np.arange(1, 51) * x + sigma * (1 - sigma))
+
+        # A seed matrix gives one directional derivative per column
+        seed0 = [[1, 0], [0, 2], [1, 1]]
+        ans1, jac1 = grad([lambda z: z[0] * z[1] + 2 / z[2], lambda z: [z[0] ** z[1], 1]], [2, 3, 4], seed0)
+        assert ans1 == [6.5, 8, 1]
+        assert jac1[0] == pytest.approx([3 - 1/8, 4 - 1/8])
+        assert jac1[1] == pytest.approx([12, 16 * np.log(2)])
+        assert list(jac1[2]) == [0, 0]
+
+    def test_grad_batch(self):
+        """Tests that grad_batch evaluates a function and its derivatives at many points with one vectorized pass"""
+        X = np.array([[1.0, 2.0, 0.5], [3.0, 4.0, 0.25], [0.5, 1.5, 1.0]])
+        fun0 = lambda z: z[0] * f.sin(z[1]) + f.log(z[2]) / z[0] - 3
+        values0, jac0 = grad_batch(fun0, X)
+
+        assert values0.shape == (3,)
+        assert jac0.shape == (3, 3)
+        for point, value, row in zip(X, values0, jac0):
+            ans, jac = grad(fun0, list(point))
+            assert value == pytest.approx(ans[0])
+            assert row == pytest.approx(jac[0])
+
+        values1, jac1 = grad_batch([fun0, lambda z: z[1] + 2, lambda z: 5], X)
+        assert values1.shape == (3, 3)
+        assert jac1.shape == (3, 3, 3)
+        assert values1[:, 1] == pytest.approx(X[:, 1] + 2)
+        assert jac1[:, 1] == pytest.approx(np.tile([0, 1, 0], (3, 1)))
+        assert values1[:, 2] == pytest.approx([5, 5, 5])
+        assert not jac1[:, 2].any()
+
+        values2, jac2 = grad_batch(lambda z: z ** 3, np.array([1.0, 2.0, np.float64(3)]))
+        assert values2 == pytest.approx([1, 8, 27])
+        assert jac2 == pytest.approx([3, 12, 27])
+
+        # Arrays on the left of an operator are combined with the Node, not turned into an array of Nodes
+        weights = np.array([1.0, 2.0, 3.0])
+        values3, jac3 = grad_batch(lambda z: weights * z[0] + weights - z[1] / weights + 2 ** z[0], X)
+        assert values3 == pytest.approx(weights * X[:, 0] + weights - X[:, 1] / weights + 2 ** X[:, 0])
+        assert jac3[:, 0] == pytest.approx(weights + np.log(2) * 2 ** X[:, 0])
+        assert jac3[:, 1] == pytest.approx(-1 / weights)
+        assert not jac3[:, 2].any()
+
+        with pytest.raises(ValueError):
+            grad_batch(fun0, np.ones((2, 2, 2)))
+
+    def test_reverse_tape(self):
+        """Tests that the tape backend of reverse matches the graph backend"""
+        x1 = [4, -3, 5]
+        fun0 = [lambda z: 3.0 * z[0] + -2 * z[1] ** 2 + 5, lambda z: [z[2] ** 2 + f.log(z[0]), f.arctan(z[1]) * z[2]]]
+
+        for seed in (None, [3, 0, 1]):
+            ans0, jac0 = reverse(fun0, x1, seed)
+            ans1, jac1 = reverse(fun0, x1, seed, backend='tape')
+            assert ans1 == pytest.approx(ans0)
+            assert np.array(jac1) == pytest.approx(np.array(jac0))
+
+        ans2, jac2 = reverse(lambda z: z ** 3, 4, backend='tape')
+        assert ans2 == [64]
+        assert jac2 == [48]
+
+        with pytest.raises(ValueError):
+            reverse(fun0, x1, backend='unknown')
+
+    def test_hessian(self):
+        """Tests the Hessian and Hessian-vector products against analytic second derivatives"""
+        x0 = [1.5, 0.5]
+        fun0 = lambda z: z[0] ** 3 * z[1] + f.sin(z[0] * z[1]) + f.log(z[1]) / z[0]
+        a, b = x0
+        H0 = np.array([[6*a*b - b**2*np.sin(a*b) + 2*np.log(b)/a**3, 3*a**2 + np.cos(a*b) - a*b*np.sin(a*b) - 1/(a**2*b)],
+                       [3*a**2 + np.cos(a*b) - a*b*np.sin(a*b) - 1/(a**2*b), -a**2*np.sin(a*b) - 1/(a*b**2)]])
+        g0 = np.array([3*a**2*b + b*np.cos(a*b) - np.log(b)/a**2, a**3 + a*np.cos(a*b) + 1/(a*b)])
+
+        value0, grad0, hess0 = hessian(fun0, x0)
+        assert value0 == pytest.approx(fun0(x0))
+        assert grad0 == pytest.approx(g0)
+        assert hess0 == pytest.approx(H0)
+
+        value1, grad1, prod1 = hvp(fun0, x0, [2, -1])
+        assert value1 == pytest.approx(value0)
+        assert grad1 == pytest.approx(g0)
+        assert prod1 == pytest.approx(H0 @ [2, -1])
+
+        # Powers of nodes, elementary functions, and inputs the function does not depend on
+        fun1 = lambda z: z[0] ** z[1] + f.exp(z[0]) + f.tanh(z[1])
+        _, _, hess1 = hessian(fun1, [2.0, 3.0, 1.0])
+        t = np.tanh(3)
+        assert hess1 == pytest.approx(np.array([[12 + np.exp(2), 4 + 12*np.log(2), 0],
+                                       [4 + 12*np.log(2), 8*np.log(2)**2 - 2*t*(1 - t**2), 0],
+                                       [0, 0, 0]]))
+
+        assert hessian(lambda z: z ** 3, 2.0) == (8.0, 12.0, 12.0)
+        assert hvp(lambda z: z ** 3, 2.0, 2.0)[2] == 24.0
+        value2, grad2, hess2 = hessian(lambda z: 5.0, [1.0, 2.0])
+        assert value2 == 5.0
+        assert not grad2.any() and not hess2.any()
+
+        with pytest.raises(ValueError):
+            hvp(fun0, x0, [1, 2, 3])
+
+    def test_jvp_vjp(self):
+        """Tests Jacobian-vector and vector-Jacobian products, single and batched, against the full Jacobian"""
+        x0 = [0.5, 1.5, -2.0]
+        fun0 = [lambda z: z[0] * f.sin(z[1]) + z[2] ** 2, lambda z: [f.exp(z[0]) / z[1], 4.0]]
+        ans0, jac0 = reverse(fun0, x0)
+        J = np.array(jac0, dtype=float)
+        v = np.array([1.0, -2.0, 0.5])
+        u = np.array([2.0, 1.0, 3.0])
+
+        ans1, prod1 = jvp(fun0, x0, list(v))
+        assert ans1 == pytest.approx(ans0)
+        assert prod1 == pytest.approx(J @ v)
+        ans2, prod2 = vjp(fun0, x0, u)
+        assert ans2 == pytest.approx(ans0)
+        assert prod2 == pytest.approx(u @ J)
+
+        V = np.array([v, 2 * v, [0, 0, 1]])
+        assert jvp_batch(fun0, x0, V)[1] == pytest.approx(V @ J.T)
+        U = np.array([u, [1, 0, 0]])
+        assert vjp_batch(fun0, x0, U)[1] == pytest.approx(U @ J)
+
+        # A single value, and cotangents that do not match the outputs
+        assert jvp(lambda z: z ** 3, 2.0, 0.5) == ([8.0], [6.0])
+        assert vjp(lambda z: z ** 3, 2.0, 0.5) == ([8.0], 6.0)
+        assert vjp_batch(lambda z: z ** 3, 2.0, [[1.0], [2.0]])[1] == pytest.approx([12.0, 24.0])
+        with pytest.raises(ValueError):
+            vjp(fun0, x0, [1.0, 2.0])
+        with pytest.raises(ValueError):
+            jvp(fun0, x0, [1.0, 2.0])
+
+    def test_reverse_pool(self):
+        """Tests reverse with a NodePool against reverse without one, and that the collector is restored afterwards"""
+        import gc
+        from node import NodePool
+        x0 = [0.5, 1.5, -2.0]
+        fun0 = [lambda z: z[0] * f.sin(z[1]) + z[2] ** 2, lambda z: [f.exp(z[0]) / z[1], 4.0]]
+        pool = NodePool()
+        assert reverse(fun0, x0, pool=pool) == reverse(fun0, x0)
+        assert reverse(fun0, x0, seed=[1, 0, 1], pool=pool) == reverse(fun0, x0, seed=[1, 0, 1])
+        assert gc.isenabled()
+
+        stats = pool.stats()
+        assert stats['calls'] == 2
+        assert stats['last']['released'] == stats['released'] / 2
+        assert stats['largest'] == 7
+        assert stats['last']['collections'] == 0
+
+        # A graph too long to free one Node at a time
+        def chain(z):
+            y = z
+            for _ in range(100_000):
+                y = y * 1.0
+            return y
+        assert reverse(chain, 2.0, pool=pool) == ([2.0], [1.0])
+        assert pool.stats()['last']['released'] == 100_001
+
+        # A reusing pool takes the Nodes of the next graph from the last one, except those still referred to
+        pool = NodePool(reuse=True)
+        assert reverse(chain, 2.0, pool=pool) == ([2.0], [1.0])
+        assert pool.stats()['last']['allocated'] == 100_000 and pool.stats()['last']['reused'] == 0
+        assert reverse(chain, 2.0, pool=pool) == ([2.0], [1.0])
+        assert pool.stats()['last']['allocated'] == 1 and pool.stats()['last']['reused'] == 99_999
+        assert reverse(fun0, x0, pool=pool) == reverse(fun0, x0)
+        assert pool.stats()['last']['allocated'] == 0 and pool.stats()['allocated'] == 100_001
+
+        # The collector stays paused in nested pools, and stays off if it was off
+        with pool:
+            with NodePool():
+                assert not gc.isenabled()
+            assert not gc.isenabled()
+        assert gc.isenabled()
+        gc.disable()
+        try:
+            reverse(fun0, x0, pool=pool)
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+        # Pools overlapping across threads restore the collector only when the last one exits
+        import threading
+        entered, exited = threading.Event(), threading.Event()
+        def other():
+            with NodePool():
+                entered.set()
+                exited.wait()
+        thread = threading.Thread(target=other)
+        with NodePool():
+            thread.start()
+            entered.wait()
+        assert not gc.isenabled()
+        exited.set()
+        thread.join()
+        assert gc.isenabled()
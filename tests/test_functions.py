@@ -101,6 +101,11 @@ class TestFunctions:
         assert d1.dual == 1 / 2 / np.log(4) * 3
         assert d1.child == [(d0, 1/2/np.log(4))]
         assert i3 == 0.5
+        # Base 1 divides by log(1) = 0, giving inf or NaN with a warning rather than an error
+        with pytest.warns(RuntimeWarning):
+            d2 = fun.logbase(d0,1)
+            assert d2.real == np.inf and d2.dual == np.inf
+            assert np.isnan(fun.logbase(1,1)) and fun.logbase(0.5,1) == -np.inf
         with pytest.raises(TypeError):
             fun.logbase(s0,d0)
         with pytest.raises(TypeError):
@@ -167,7 +172,7 @@ class TestFunctions:
 
         assert d1.real == pytest.approx(27.308232836)
         assert d1.dual == pytest.approx(27.2899172)
-        assert d1.child == [d0, np.sinh(4)]
+        assert d1.child == [(d0, math.sinh(4))]
         assert i1 == pytest.approx(27.308232836)
     
     def test_tanh(x):
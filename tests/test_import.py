@@ -0,0 +1,80 @@
+"""
+This module contains tests for the import time of autodiff_package, and for importing NumPy only when it is needed.
+"""
+
+import pytest
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+def run(code, *options):
+    """Runs code in a new interpreter that can import autodiff_package, and returns its standard error"""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, *options, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return result.stderr
+
+def import_times(code):
+    """The cumulative import time in microseconds of every module imported by code, from python -X importtime"""
+    times = {}
+    for line in run(code, '-X', 'importtime').splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+class TestImport:
+    """
+    These are test methods for the startup cost of the package.
+    """
+
+    def test_import_time(self):
+        """
+        This is the test that importing the package does not import NumPy, asyncio, or multiprocessing, and stays fast.
+        """
+        times = import_times('import autodiff_package')
+        assert 'autodiff_package' in times
+        for heavy in ('numpy', 'asyncio', 'multiprocessing', 'concurrent.futures', 'json'):
+            assert heavy not in times
+        assert times['autodiff_package'] < 100_000
+
+    def test_scalar_path(self):
+        """
+        This is the test that reverse mode at Python numbers, and forward mode at a single one, never import NumPy,
+        while forward mode at a list of values, whose tangents and Jacobian rows are arrays, does.
+        """
+        run('import sys\n'
+            'import autodiff_package as ad\n'
+            'f = lambda x: ad.sin(x[0]) * x[1] ** 2 / x[0] + ad.logbase(x[1], 2) + 2 ** x[0] - ad.exp(-x[1])\n'
+            'ad.reverse(f, [1.0, 2.0])\n'
+            'ad.grad(lambda x: ad.log(x) * ad.tanh(x) - 1 / x, 0.5)\n'
+            'with ad.profile() as p:\n'
+            '    ad.reverse([f, lambda x: x[0] > x[1]], [3.0, 2.0], pool=ad.NodePool())\n'
+            'assert "numpy" not in sys.modules, "NumPy was imported"\n'
+            'ans, jacobian = ad.grad(f, [1.0, 2.0])\n'
+            'assert "numpy" in sys.modules\n'
+            'assert max(abs(a - b) for a, b in zip(jacobian[0], ad.reverse(f, [1.0, 2.0])[1][0])) < 1e-12\n')
+
+    def test_lazy_attributes(self):
+        """
+        This is the test that everything imported on first use is still available from the package.
+        """
+        run('import autodiff_package as ad\n'
+            'import numpy as np\n'
+            'assert ad.grad(lambda x: ad.sin(x) * np.float32(2), np.float32(0.0))[1] == [2.0]\n'
+            'tape = ad.record(lambda x: x[0] * x[1], [2.0, 3.0])\n'
+            'assert isinstance(tape, ad.Tape) and callable(ad.compile) and callable(ad.GradientServer)\n'
+            'assert callable(ad.optimize)\n'
+            'import autodiff_package.optimization as optimization, autodiff_package.taylor_mode as taylor_mode\n'
+            'assert optimization.optimize is ad.optimize and taylor_mode.TaylorNode is ad.TaylorNode\n'
+            'assert callable(ad.taylor) and callable(ad.optimize)\n'
+            'from autodiff_package import *\n'
+            'assert callable(sparse_jacobian) and callable(primitive)\n'
+            'try:\n'
+            '    ad.missing\n'
+            'except AttributeError:\n'
+            '    pass\n'
+            'else:\n'
+            '    raise AssertionError\n')
@@ -95,7 +95,7 @@ class TestNode:
         d3 = d0 ** i0
 
         assert d2.real == 16
-        assert d2.dual == 1536 + np.log(2)*80
+        assert d2.dual == 96 + np.log(2)*80
         assert d2.child == [(d0, 32), (d1, 16 * np.log(2))]
         assert d3.child == [(d0, 5120)]
         assert d3.real == 1024
@@ -165,7 +165,7 @@ class TestNode:
         d1 = i0 / d0
 
         assert d1.real == 2
-        assert d1.dual == 4/3
+        assert d1.dual == -3
         assert d1.child == [(d0, -1)]
         with pytest.raises(TypeError):
             s0 / d0
@@ -222,6 +222,25 @@ class TestNode:
         assert d1.dual == -3
         assert d1.child == [(d0, -1)]
 
+    def test_array(self):
+        """This is the test for Nodes holding NumPy arrays and NumPy scalars."""
+        d0 = Node(np.array([1.0, 2.0]), np.array([1.0, 0.0]))
+        d1 = Node(np.array([3.0, 4.0]), np.array([0.0, 1.0]))
+        a0 = np.array([2.0, 0.5])
+
+        d2 = d0 * d1 + a0
+        d3 = d0 / d1 - np.int64(1)
+        d4 = np.float64(2) ** d0
+
+        assert list(d2.real) == [5, 8.5]
+        assert list(d2.dual) == [3, 2]
+        assert d3.real == pytest.approx([-2/3, -0.5])
+        assert d3.dual == pytest.approx([1/3, -1/8])
+        assert list(d4.real) == [2, 4]
+        assert list(d0 < d1) == [True, True]
+        with pytest.raises(ZeroDivisionError):
+            d0 / np.array([1.0, 0.0])
+
     def test_lt(self):
         """This is the test for the __lt__ method."""
         i0 = 0
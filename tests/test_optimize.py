@@ -0,0 +1,70 @@
+"""
+This module contains tests for optimizing tapes.
+"""
+
+import pytest
+import numpy as np
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from node import Node
+from tape import record
+from optimization import optimize
+from compiled import compile
+import functions as f
+
+
+class TestOptimize:
+    """These are test methods for constant folding, common subexpression elimination, and dead code elimination."""
+
+    def test_merge(self):
+        """This is the test for merging repeated subexpressions."""
+        fun0 = lambda x: [f.sin(x[0]) * x[1] + x[1] * f.sin(x[0]), f.sin(x[0]) * x[1] - x[2]]
+        tape = record(fun0, [1.0, 2.0, 3.0])
+        optimized, report = optimize(tape)
+
+        assert report == {'before': 11, 'after': 7, 'folded': 0, 'merged': 4, 'removed': 0}
+        assert optimized.ops == ['input', 'input', 'input', 'sin', 'mul', 'add', 'sub']
+        assert optimized.output_values == tape.output_values
+        assert optimized.jacobian() == pytest.approx(tape.jacobian())
+
+    def test_fold(self):
+        """This is the test for folding constants and dropping dead entries."""
+        c0 = Node(2.0, 0)
+        fun0 = lambda x: 3 / (c0 * x[0]) + f.exp(c0 * 1.5) - c0 ** x[1]
+        tape = record(fun0, [1.0, 2.0])
+        optimized, report = optimize(tape)
+
+        assert report['folded'] == 2
+        assert report['removed'] == 3
+        assert optimized.count_ops().get('const', 0) == 0
+        assert sorted(optimized.ops) == sorted(['input', 'input', 'mul', 'rdiv', 'add', 'rpow', 'sub'])
+        for x in ([1.0, 2.0], [0.5, -1.0]):
+            assert optimized.forward(x) == pytest.approx(tape.forward(x))
+            assert optimized.gradient() == pytest.approx(tape.gradient())
+
+        constant, report = optimize(record(lambda x: c0 * 2 + 1, [1.0]))
+        assert constant.ops == ['input', 'const']
+        assert constant.output_values == [5.0]
+        assert constant.gradient() == [0]
+
+    def test_compiled(self):
+        """This is the test for compiled functions using optimized tapes, keeping the entries their guards compare."""
+        def fun0(x):
+            y = f.cos(x[0]) * x[1]
+            unused = f.cos(x[0]) * x[1] + 1
+            if unused > 0:
+                return y * y
+            return y + y
+
+        compiled = compile(fun0, 2)
+        ans, jac = compiled([0.5, 2.0])
+        assert compiled.report['merged'] == 2
+        y = np.cos(0.5) * 2.0
+        assert ans[0] == pytest.approx(y * y)
+        assert jac[0] == pytest.approx([-2 * y * np.sin(0.5) * 2.0, 2 * y * np.cos(0.5)])
+
+        ans, jac = compiled([3.0, 2.0])
+        assert compiled.trace_count == 2
+        assert ans[0] == pytest.approx(2 * np.cos(3.0) * 2.0)
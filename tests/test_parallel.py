@@ -0,0 +1,55 @@
+"""
+This module contains tests for splitting Jacobians across processes.
+"""
+
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from tape import record
+from parallel import parallel_jacobian
+from differentiate import grad, reverse
+import functions as f
+
+FUNCTIONS = [lambda z: z[0] * f.sin(z[1]) + z[2] ** 2, lambda z: [f.exp(z[0]) / z[1], 4.0, z[1] ** z[0]]]
+X = [0.5, 1.5, -2.0]
+
+
+class TestParallel:
+    """These are test methods for parallel Jacobians, checked against the serial ones."""
+
+    def test_tangents(self):
+        """This is the test for forward sweeps over a tape matching its reverse sweeps."""
+        tape = record(FUNCTIONS, X)
+        assert tape.tangents(np.eye(3)) == pytest.approx(tape.jacobian())
+        assert tape.tangents([1, 0, 2])[:, 0] == pytest.approx(tape.jacobian() @ [1, 0, 2])
+
+    def test_parallel_jacobian(self):
+        """This is the test for every split of columns or rows giving the same Jacobian."""
+        tape = record(FUNCTIONS, X)
+        with ThreadPoolExecutor(2) as executor:
+            for mode in ('forward', 'reverse'):
+                for workers in (1, 2, 5):
+                    jacobian = parallel_jacobian(tape, mode=mode, workers=workers, executor=executor)
+                    assert jacobian == pytest.approx(tape.jacobian())
+
+        with pytest.raises(ValueError):
+            parallel_jacobian(tape, mode='sideways')
+
+    def test_workers(self):
+        """This is the test for grad() and reverse() with lambdas running in a process pool."""
+        expected_ans, expected_jac = grad(FUNCTIONS, X)
+        ans, jac = grad(FUNCTIONS, X, workers=2)
+        assert ans == pytest.approx(expected_ans)
+        assert np.array(jac) == pytest.approx(np.array([np.broadcast_to(row, 3) for row in expected_jac]))
+
+        ans, jac = reverse(FUNCTIONS, X, [1, 0, 2], workers=2)
+        assert ans == pytest.approx(expected_ans)
+        assert jac == pytest.approx(reverse(FUNCTIONS, X, [1, 0, 2])[1])
+
+        with ThreadPoolExecutor(2) as executor:
+            assert grad(lambda z: z ** 2, 3.0, executor=executor) == ([9.0], [6.0])
+            assert grad(FUNCTIONS, X, [1, 0, 2], executor=executor)[1] == pytest.approx(grad(FUNCTIONS, X, [1, 0, 2])[1])
@@ -0,0 +1,116 @@
+"""
+This module contains tests for user-defined primitive operations.
+"""
+
+import pytest
+import numpy as np
+import math
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from primitives import primitive
+from differentiate import grad, grad_batch, reverse
+from tape import record
+from optimization import optimize
+from compiled import compile
+
+@primitive(vjp=lambda g, y, x: g * (1 - np.exp(-y)))
+def softplus(x):
+    return np.logaddexp(0, x)
+
+@primitive(jvp=lambda t, y, a, b: (a * t[0] + b * t[1]) / y)
+def hypot(a, b):
+    return np.hypot(a, b)
+
+@primitive(vjp=lambda g, y, a, b, c: (g * b * c, g * a * c, g * a * b))
+def product(a, b, c):
+    return a * b * c
+
+FUNCTION = lambda x: softplus(x[0]) * hypot(x[0], x[1]) + hypot(3.0, x[1])
+X = [0.5, 2.0]
+
+# The derivatives of FUNCTION at X, written out
+r = np.hypot(*X)
+s = np.logaddexp(0, X[0])
+EXPECTED = [1 / (1 + np.exp(-X[0])) * r + s * X[0] / r, s * X[1] / r + X[1] / np.hypot(3.0, X[1])]
+
+
+class TestPrimitives:
+    """These are test methods for primitives in every mode and backend."""
+
+    def test_modes(self):
+        """This is the test for a primitive matching its derivative in forward and reverse mode."""
+        assert softplus(0.0) == pytest.approx(np.log(2))
+        for mode in (grad, reverse):
+            ans, jac = mode(FUNCTION, X)
+            assert ans[0] == pytest.approx(s * r + np.hypot(3.0, X[1]))
+            assert np.array(jac[0], dtype=float) == pytest.approx(EXPECTED)
+
+        ans, jac = grad(lambda x: product(x[0], x[1], 2.0), [3.0, 4.0])
+        assert jac[0] == pytest.approx([8.0, 6.0])
+        ans, jac = reverse(lambda x: product(x[0], x[1], x[0]), [3.0, 4.0])
+        assert jac[0] == pytest.approx([24.0, 9.0])
+
+        values, jacobian = grad_batch(FUNCTION, np.array([X, [1.0, 3.0]]))
+        assert jacobian[0] == pytest.approx(EXPECTED)
+
+    def test_tape(self):
+        """This is the test for primitives being recorded, replayed, optimized, and compiled as single entries."""
+        tape = record(FUNCTION, X)
+        assert tape.count_ops() == {'input': 2, 'const': 1, 'hypot': 2, 'softplus': 1, 'mul': 1, 'add': 1}
+        assert tape.gradient() == pytest.approx(EXPECTED)
+        tape.forward([1.0, 3.0])
+        assert tape.gradient() == pytest.approx(grad(FUNCTION, [1.0, 3.0])[1][0])
+
+        optimized, report = optimize(record(FUNCTION, X))
+        assert 'hypot' in optimized.ops
+        assert optimized.gradient() == pytest.approx(EXPECTED)
+
+        for backend in ('codegen', 'tape'):
+            ans, jac = compile(FUNCTION, 2, backend=backend)(X)
+            assert jac[0] == pytest.approx(EXPECTED)
+
+        with pytest.raises(ValueError):
+            record(lambda x: product(x[0], x[1], x[0]), [3.0, 4.0])
+
+    def test_errors(self):
+        """This is the test for primitives without a derivative rule, shadowing built-in operations, or given other types."""
+        with pytest.raises(ValueError):
+            primitive()
+        with pytest.raises(ValueError):
+            primitive(vjp=lambda g, y, x: g * math.cos(x), name='sin')(math.sin)
+        with pytest.raises(TypeError):
+            softplus("string")
+
+        # Two different functions cannot share a name, or the second would replace the first on tapes
+        primitive(vjp=lambda g, y, x: 2 * g, name='double')(lambda x: 2 * x)
+        with pytest.raises(ValueError):
+            primitive(vjp=lambda g, y, x: 3 * g, name='double')(lambda x: 3 * x)
+        primitive(vjp=lambda g, y, x: g)(lambda x: x)
+        with pytest.raises(ValueError):
+            primitive(vjp=lambda g, y, x: g)(lambda x: x + 0)
+        def redefine():
+            @primitive(vjp=lambda g, y, x: g)
+            def softplus(x):
+                return x
+        with pytest.raises(ValueError):
+            redefine()
+
+    def test_jvp_calls(self):
+        """This is the test that the partials of a primitive given a jvp are only found when reverse mode needs them."""
+        calls = []
+        def jvp(t, y, a, b):
+            calls.append(t)
+            return b * t[0] + a * t[1]
+
+        @primitive(jvp=jvp, name='counted_product')
+        def counted_product(a, b):
+            return a * b
+
+        ans, jacobian = grad(lambda x: counted_product(x[0], x[1]), [2.0, 3.0])
+        assert ans == [6.0] and jacobian[0] == pytest.approx([3.0, 2.0])
+        assert len(calls) == 1
+        calls.clear()
+        assert reverse(lambda x: counted_product(x[0], x[1]), [2.0, 3.0]) == ([6.0], [[3.0, 2.0]])
+        assert len(calls) == 3
@@ -0,0 +1,60 @@
+"""
+This module contains tests for profiling the graphs of grad and reverse.
+"""
+
+import pytest
+import numpy as np
+import json
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+import profiling
+from profiling import profile
+from differentiate import grad, reverse
+import functions as f
+
+class TestProfile:
+    """
+    These are test methods for the profile context manager.
+    """
+
+    def test_reverse(self):
+        """
+        This is the test for the counts, depth, fan-out, and timings of a reverse mode graph.
+        """
+        fun = lambda x: f.sin(x[0]) * x[1] ** 2 + x[0] / x[1]
+        expected = reverse(fun, [1.0, 2.0])
+        with profile() as p:
+            assert reverse(fun, [1.0, 2.0]) == expected
+        assert profiling.active is None
+
+        # Two inputs, sin, pow, mul, div, and add
+        summary = p.as_dict()
+        assert summary['calls'] == 1
+        assert {op: row['nodes'] for op, row in summary['ops'].items()} == \
+            {'input': 2, 'sin': 1, 'pow': 1, 'mul': 1, 'div': 1, 'add': 1}
+        assert summary['depth'] == 3
+        assert summary['max_fan_out'] == 2
+        assert summary['edges'] == 8
+        assert summary['forward_seconds'] > 0 and summary['backward_seconds'] > 0
+        assert json.loads(p.to_json()) == summary
+        assert 'depth 3' in p.table() and 'sin' in str(p)
+
+    def test_grad_and_nesting(self):
+        """
+        This is the test for profiling forward mode, and for profile blocks inside each other.
+        """
+        with profile() as outer:
+            grad(lambda x: f.exp(x) * x, 1.0)
+            with profile() as inner:
+                grad([lambda x: x[0] * x[1], lambda x: x[0] + 1.0], [1.0, 2.0])
+            assert profiling.active is outer
+        assert outer.calls == 1 and outer.nodes == {'input': 1, 'rpow': 1, 'mul': 1}
+        assert outer.backward == 0
+        assert inner.calls == 2 and inner.nodes == {'input': 3, 'mul': 1, 'add': 1}
+
+        # A function returning a constant has an empty graph
+        with profile() as p:
+            reverse(lambda x: 4.0, 1.0)
+        assert p.as_dict()['nodes'] == 0 and p.depth == 0
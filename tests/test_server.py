@@ -0,0 +1,71 @@
+"""
+This module contains tests for the asynchronous gradient server.
+"""
+
+import pytest
+import asyncio
+import numpy as np
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from server import GradientServer
+from differentiate import grad
+import functions as f
+
+FUNCTION = lambda x: x[0] * f.sin(x[1]) + f.exp(x[0] / 4)
+
+
+def serve(points, f_id='f', **options):
+    """Submits every point at once to a new server and returns the results and the server"""
+    async def main():
+        async with GradientServer(**options) as server:
+            server.register('f', FUNCTION)
+            results = await asyncio.gather(*(server.submit(f_id, x) for x in points), return_exceptions=True)
+        return results, server
+    return asyncio.run(main())
+
+
+class TestServer:
+    """These are test methods for batching, backpressure, and errors in the gradient server."""
+
+    def test_submit(self):
+        """This is the test for concurrent requests being coalesced into one batch matching grad()."""
+        points = [[0.1 * i, 0.3 * i] for i in range(10)]
+        results, server = serve(points, max_latency=0.01)
+        assert server.batches == 1 and server.requests == 10
+        for x, (value, derivatives) in zip(points, results):
+            expected_ans, expected_jac = grad(FUNCTION, x)
+            assert value == pytest.approx(expected_ans[0])
+            assert derivatives == pytest.approx(expected_jac[0])
+
+    def test_limits(self):
+        """This is the test for full batches running at once and submissions waiting for room."""
+        points = [[0.1 * i, 0.3 * i] for i in range(10)]
+        results, server = serve(points, max_batch=4, max_latency=0.05)
+        assert server.batches == 3
+
+        results, server = serve(points, max_pending=3, max_latency=0.001)
+        assert server.batches >= 4
+        assert [value for value, _ in results] == pytest.approx([grad(FUNCTION, x)[0][0] for x in points])
+
+    def test_errors(self):
+        """This is the test for unknown functions and malformed points raising only in their own caller."""
+        results, _ = serve([[1.0, 2.0]], f_id='g')
+        assert isinstance(results[0], KeyError)
+
+        results, server = serve([[1.0, 2.0], [1.0, 2.0, 3.0], [[1.0, 2.0]], ['a', 2.0], 1.0, [0.5, 1.5]])
+        assert all(isinstance(result, ValueError) for result in results[1:5])
+        assert results[0][0] == pytest.approx(grad(FUNCTION, [1.0, 2.0])[0][0])
+        assert results[5][0] == pytest.approx(grad(FUNCTION, [0.5, 1.5])[0][0])
+        assert server.batches == 1 and server.requests == 2
+
+        async def main():
+            async with GradientServer(max_latency=0.001) as server:
+                server.register('f', FUNCTION, n_inputs=2)
+                server.register('g', lambda x: x ** 2, n_inputs=0)
+                return await asyncio.gather(server.submit('f', [1.0]), server.submit('g', 3.0),
+                                            server.submit('g', [3.0]), return_exceptions=True)
+        results = asyncio.run(main())
+        assert isinstance(results[0], ValueError) and isinstance(results[2], ValueError)
+        assert results[1][0] == pytest.approx(9.0) and results[1][1] == pytest.approx(6.0)
@@ -0,0 +1,66 @@
+"""
+This module contains tests for sparse Jacobians.
+"""
+
+import pytest
+import numpy as np
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from sparse import sparsity_pattern, color, sparse_jacobian
+from differentiate import grad
+import functions as f
+
+def dense(J):
+    """Converts a sparse Jacobian, either a SciPy matrix or COO arrays, to a dense array"""
+    if hasattr(J, 'toarray'):
+        return J.toarray()
+    data, rows, cols, shape = J
+    A = np.zeros(shape)
+    A[rows, cols] = data
+    return A
+
+# The residuals of a discretized 1D equation, each depending on a point and its two neighbours
+N = 50
+RESIDUALS = [lambda u, i=i: u[i - 1] - 2 * u[i] + u[i + 1] + f.sin(u[i]) ** 2 for i in range(1, N - 1)]
+
+
+class TestSparse:
+    """These are test methods for sparsity detection, coloring, and compressed Jacobians."""
+
+    def test_sparsity_pattern(self):
+        """This is the test for tracing which inputs each output depends on."""
+        rows, cols = sparsity_pattern([lambda x: x[0] * x[1], lambda x: [f.sin(x[2]), 3.0, x[1] + x[1]]], [1.0, 2.0, 3.0])
+        assert rows.tolist() == [0, 0, 1, 3]
+        assert cols.tolist() == [0, 1, 2, 1]
+
+    def test_color(self):
+        """This is the test for no two columns (or rows) of a color sharing a nonzero."""
+        rows, cols = sparsity_pattern(RESIDUALS, list(np.ones(N)))
+        for mode in ('forward', 'reverse'):
+            colors = color(rows, cols, (N - 2, N), mode)
+            assert colors.max() + 1 == 3
+            a, b = (rows, cols) if mode == 'forward' else (cols, rows)
+            seen = set(zip(a.tolist(), colors[b].tolist()))
+            assert len(seen) == len(a)
+
+        with pytest.raises(ValueError):
+            color(rows, cols, mode='sideways')
+
+    def test_sparse_jacobian(self):
+        """This is the test for compressed Jacobians matching the dense Jacobian from grad()."""
+        x = list(np.linspace(0.1, 2, N))
+        expected_values, expected = grad(RESIDUALS, x)
+        for mode in ('forward', 'reverse'):
+            values, J, colors = sparse_jacobian(RESIDUALS, x, mode)
+            assert colors == 3
+            assert values == pytest.approx(expected_values)
+            assert dense(J) == pytest.approx(np.array(expected))
+
+        # Constant outputs and inputs no output depends on
+        for mode in ('forward', 'reverse'):
+            values, J, colors = sparse_jacobian(lambda x: [x[0] * x[2], 3.0], [2.0, 1.0, 5.0], mode)
+            assert values == [10.0, 3.0]
+            assert dense(J) == pytest.approx(np.array([[5.0, 0, 2.0], [0, 0, 0]]))
+            assert colors == (2 if mode == 'forward' else 1)
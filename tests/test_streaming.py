@@ -0,0 +1,72 @@
+"""
+This module contains tests for streaming the values and derivatives of a function over large datasets.
+"""
+
+import pytest
+import numpy as np
+import tracemalloc
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from streaming import iter_gradients, save_gradients
+from differentiate import grad_batch
+import functions as f
+
+fun = [lambda x: x[0] * f.sin(x[1]), lambda x: [f.exp(x[0]) / x[1], x[1] ** 2]]
+
+class TestStreaming:
+    """
+    These are test methods for iter_gradients and save_gradients.
+    """
+
+    def test_sources(self, tmp_path):
+        """
+        This is the test that every kind of source gives the results of grad_batch on all points at once.
+        """
+        X = np.random.default_rng(0).uniform(0.5, 2.0, size=(1000, 2))
+        values, jacobian = grad_batch(fun, X)
+        np.save(tmp_path / 'points.npy', X)
+        memmap = np.load(tmp_path / 'points.npy', mmap_mode='r')
+        shards = (X[i:i + 300] for i in range(0, 1000, 300))
+
+        for source in (X, memmap, tmp_path / 'points.npy', str(tmp_path / 'points.npy'), shards):
+            chunks = list(iter_gradients(fun, source, chunk_size=128))
+            assert [start for start, _, _ in chunks][:3] == [0, 128, 256]
+            assert max(len(chunk) for _, chunk, _ in chunks) == 128
+            assert np.concatenate([v for _, v, _ in chunks]) == pytest.approx(values)
+            assert np.concatenate([j for _, _, j in chunks]) == pytest.approx(jacobian)
+
+        # A function of a single value, written into output arrays
+        x = np.linspace(0.1, 1.0, 50)
+        out = (np.zeros(50), np.zeros(50))
+        for _ in iter_gradients(lambda z: f.log(z) * z, x, chunk_size=7, out=out):
+            pass
+        assert out[0] == pytest.approx(np.log(x) * x)
+        assert out[1] == pytest.approx(np.log(x) + 1)
+
+        with pytest.raises(ValueError):
+            next(iter_gradients(fun, X, chunk_size=0))
+
+    def test_save_gradients(self, tmp_path):
+        """
+        This is the test for writing results to .npy files, and that memory does not grow with the number of points.
+        """
+        def peak(n):
+            X = np.lib.format.open_memmap(tmp_path / f'points{n}.npy', mode='w+', dtype=float, shape=(n, 2))
+            X[:] = 1.5
+            X.flush()
+            del X
+            tracemalloc.start()
+            values, jacobian = save_gradients(fun, tmp_path / f'points{n}.npy', tmp_path / f'values{n}.npy',
+                                              tmp_path / f'jacobian{n}.npy', chunk_size=500)
+            result = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert values.shape == (n, 3) and jacobian.shape == (n, 3, 2)
+            saved = np.load(tmp_path / f'jacobian{n}.npy', mmap_mode='r')
+            assert saved[-1] == pytest.approx(grad_batch(fun, np.full((1, 2), 1.5))[1][0])
+            return result
+
+        small, large = peak(5_000), peak(50_000)
+        assert large < 2 * small
+        assert large < 50_000 * 3 * 3 * 8
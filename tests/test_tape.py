@@ -0,0 +1,137 @@
+"""
+This module contains tests for the Tape class and the record function.
+"""
+
+import pytest
+import numpy as np
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from tape import Tape, record, OPS
+from node import Node
+from differentiate import reverse
+import functions as f
+
+
+class TestTape:
+    """These are test methods for recording, sweeping, replaying, and saving tapes."""
+
+    def test_record(self):
+        """This is the test for recording a graph onto a tape."""
+        tape = record([lambda x: x[0] * x[1] + 3, lambda x: [f.sin(x[0]), 2]], [2, 5])
+
+        assert len(tape) == 6
+        assert tape.ops == ['input', 'input', 'mul', 'add', 'sin', 'const']
+        assert list(tape.inputs) == [0, 1]
+        assert tape.output_values == pytest.approx([13, np.sin(2), 2])
+        assert tape.count_ops()['input'] == 2
+        assert tape.jacobian() == pytest.approx(np.array([[5, 2], [np.cos(2), 0], [0, 0]]))
+
+        with pytest.raises(ValueError):
+            record(lambda x: x * 2, np.array([1.0, 2.0]))
+
+    def test_sweep(self):
+        """This is the test for the reverse sweep, on deep and on wide graphs."""
+        def deep(x):
+            y = x[0]
+            for _ in range(500):
+                y = f.sin(y) + x[1] * 0.001
+            return y
+
+        def wide(x):
+            terms = [f.exp(x[i % 3] / (i + 1)) * x[(i + 1) % 3] for i in range(256)]
+            while len(terms) > 1:
+                terms = [terms[i] + terms[i + 1] for i in range(0, len(terms), 2)]
+            return terms[0]
+
+        x0 = [0.3, 0.7, -0.2]
+        for fun in (deep, wide):
+            tape = record(fun, x0)
+            ans, jac = reverse(fun, x0)
+            assert tape.output_values[0] == pytest.approx(ans[0])
+            assert tape.gradient() == pytest.approx(jac[0])
+
+        assert record(wide, x0).levels().max() == 11
+
+    def test_tracer(self):
+        """This is the test for recording straight onto a tape past one chunk of entries, and with Nodes closed over."""
+        def deep(x):
+            y = x[0]
+            for _ in range(3000):
+                y = f.sin(y) * x[1] + 0.5
+            return y
+
+        tape = record(deep, [0.3, 0.9])
+        assert len(tape) == 9002
+        assert tape.gradient() == pytest.approx(reverse(deep, [0.3, 0.9])[1][0])
+        levels = tape.levels().copy()
+        tape._levels = None
+        assert list(tape.levels()) == list(levels)
+
+        c = Node(2.0)
+        tape = record(lambda x: c * x + f.sin(c) - c ** x, 1.5)
+        assert tape.ops == ['input', 'const', 'mul', 'sin', 'add', 'pow', 'sub']
+        assert tape.output_values == pytest.approx([3 + np.sin(2) - 2 ** 1.5])
+        assert tape.gradient() == pytest.approx([2 - 2 ** 1.5 * np.log(2)])
+
+        with pytest.raises(TypeError):
+            record(lambda x: x + 'a', 1.0)
+
+    def test_forward(self):
+        """This is the test for replaying a tape at new inputs."""
+        fun = lambda x: [x[0] ** x[1] / f.log(x[1]), 2 ** x[0] - f.logbase(x[1], 3), 4 / f.tanh(x[0]) - x[1] ** 2]
+        tape = record(fun, [1.5, 2.5])
+        for x in ([1.5, 2.5], [0.7, 3.1], [2.0, 1.5]):
+            values = tape.forward(x)
+            ans, jac = reverse(fun, x)
+            assert values == pytest.approx(ans)
+            assert tape.jacobian() == pytest.approx(np.array(jac))
+
+        with pytest.raises(ValueError):
+            tape.forward([1, 2, 3])
+
+    def test_save(self, tmp_path):
+        """This is the test for saving and loading a tape."""
+        tape = record(lambda x: f.sqrt(x) * f.cos(x), 2.0)
+        tape.save(tmp_path / 'tape.npz')
+        loaded = Tape.load(tmp_path / 'tape.npz')
+
+        assert loaded.ops == tape.ops
+        assert loaded.output_values == tape.output_values
+        assert loaded.forward([3.0]) == tape.forward([3.0])
+        assert loaded.gradient() == pytest.approx(tape.gradient())
+        assert loaded.kept == []
+
+        # Entries kept as guards are saved with the tape
+        x = Node(2.0)
+        guard = f.sin(x)
+        tape = Tape.from_graph([x], [x * 3], keep=[guard])
+        tape.save(tmp_path / 'kept.npz')
+        loaded = Tape.load(tmp_path / 'kept.npz')
+        assert loaded.kept == tape.kept
+        assert loaded.values[loaded.kept] == pytest.approx([np.sin(2.0)])
+
+    def test_logistic(self):
+        """This is the test that the logistic partial stays finite far from zero."""
+        with np.errstate(over='ignore'):
+            tape = record(lambda x: f.logistic(x), 800.0)
+            assert tape.gradient() == pytest.approx([0.0])
+            tape.forward([-800.0])
+            assert tape.gradient() == pytest.approx([0.0])
+        tape.forward([0.5])
+        assert tape.gradient() == pytest.approx([np.exp(-0.5) / (1 + np.exp(-0.5)) ** 2])
+
+    def test_append(self):
+        """This is the test for appending entries past the initial capacity."""
+        tape = Tape(1)
+        x = tape.append('input', 2.0)
+        y = tape.append('mul', 6.0, [x], [3.0], 3.0)
+        z = tape.append('add', 8.0, [x, y], [1.0, 1.0])
+        tape.inputs = np.array([x])
+        tape.outputs = np.array([z])
+
+        assert len(tape) == 3
+        assert tape.gradient() == pytest.approx([4])
+        assert tape.forward([1.0]) == [4.0]
+        assert 'const' in OPS
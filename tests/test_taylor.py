@@ -0,0 +1,119 @@
+"""
+This module contains tests for Taylor mode higher-order differentiation.
+"""
+
+import pytest
+import numpy as np
+import math
+
+import sys
+sys.path.append('../src/autodiff_package/')
+
+from taylor_mode import taylor, TaylorNode
+from differentiate import grad, hessian
+import functions as f
+
+class TestTaylor:
+    """
+    These are test methods for TaylorNode and taylor.
+    """
+
+    def test_series(self):
+        """
+        This is the test for derivatives of known series, through every kind of recurrence.
+        """
+        k = 10
+        assert taylor(lambda x: f.exp(2 * x), 0.0, k) == pytest.approx([2.0 ** j for j in range(k + 1)])
+        assert taylor(f.sin, 0.0, k) == pytest.approx([0, 1, 0, -1] * 2 + [0, 1, 0])
+        assert taylor(f.cosh, 0.0, k) == pytest.approx([1, 0] * 5 + [1])
+        assert taylor(lambda x: 1 / (1 - x), 0.0, k) == pytest.approx([math.factorial(j) for j in range(k + 1)])
+        assert taylor(lambda x: f.log(1 + x), 0.0, k)[1:] == \
+            pytest.approx([(-1) ** (j + 1) * math.factorial(j - 1) for j in range(1, k + 1)])
+        assert taylor(f.tan, 0.0, 7) == pytest.approx([0, 1, 0, 2, 0, 16, 0, 272])
+        assert taylor(f.tanh, 0.0, 7) == pytest.approx([0, 1, 0, -2, 0, 16, 0, -272])
+        assert taylor(f.arctan, 0.0, 7) == pytest.approx([0, 1, 0, -2, 0, 24, 0, -720])
+        assert taylor(f.arcsin, 0.0, 5) == pytest.approx([0, 1, 0, 1, 0, 9])
+        assert taylor(f.arccos, 0.0, 3) == pytest.approx([math.pi / 2, -1, 0, -1])
+        assert taylor(f.sqrt, 1.0, 3) == pytest.approx([1, 0.5, -0.25, 0.375])
+        assert taylor(lambda x: x ** 3, 0.0, 4) == pytest.approx([0, 0, 0, 6, 0])
+        assert taylor(lambda x: x ** 3.0, 0.0, 4) == pytest.approx([0, 0, 0, 6, 0])
+        assert taylor(lambda x: x ** -1, 1.0, 3) == pytest.approx([1, -1, 2, -6])
+        assert taylor(lambda x: 2 ** x, 0.0, 3) == pytest.approx([math.log(2) ** j for j in range(4)])
+        assert taylor(lambda x: f.logbase(x, 10), 1.0, 2) == pytest.approx([0, 1 / math.log(10), -1 / math.log(10)])
+        assert taylor(f.logistic, 0.0, 3) == pytest.approx([0.5, 0.25, 0, -0.125])
+
+    def test_against_first_and_second_order(self):
+        """
+        This is the test that the first two derivatives along a direction match grad and hessian.
+        """
+        fun = lambda x: f.sin(x[0]) * x[1] ** x[0] / (1 + x[2] * x[2]) - f.sinh(x[1]) + f.cos(x[2]) * 3.0
+        x0, v = [0.4, 1.3, -0.7], np.array([0.5, -1.0, 2.0])
+        ans, jac = grad(fun, x0, list(v))
+        H = hessian(fun, x0)[2]
+        series = taylor(fun, x0, 4, direction=list(v))
+        assert series[0] == pytest.approx(ans[0])
+        assert series[1] == pytest.approx(jac[0])
+        assert series[2] == pytest.approx(v @ H @ v)
+
+    def test_arrays_and_outputs(self):
+        """
+        This is the test for expanding many points at once, vector functions, constant outputs, and branching.
+        """
+        X = np.array([0.0, 0.5, 1.0])
+        D = taylor([lambda x: f.exp(x), lambda x: [4.0, x * x]], X, 3)
+        assert D.shape == (3, 4, 3)
+        assert D[0] == pytest.approx(np.tile(np.exp(X), (4, 1)))
+        assert D[1] == pytest.approx(np.array([[4.0] * 3, [0] * 3, [0] * 3, [0] * 3]))
+        assert D[2] == pytest.approx(np.array([X ** 2, 2 * X, [2] * 3, [0] * 3]))
+
+        relu = lambda x: x * x if x > 0 else -x
+        assert taylor(relu, 1.0, 2) == pytest.approx([1, 2, 2])
+        assert taylor(relu, -1.0, 2) == pytest.approx([1, -1, 0])
+
+        node = TaylorNode([1.0, 2.0, 3.0])
+        assert node.order == 2 and node.real == 1.0
+        assert node.derivatives == pytest.approx([1, 2, 6])
+        assert (node - 1).coefficients == pytest.approx([0, 2, 3])
+        assert (5 - node).coefficients == pytest.approx([4, -2, -3])
+        assert (-node * 2).coefficients == pytest.approx([-2, -4, -6])
+
+        # Constant arrays combine with the value of a series elementwise, on either side of an operator
+        w = np.array([1.0, 2.0, 3.0])
+        assert taylor(lambda x: x * w, 0.5, 2) == pytest.approx(np.array([0.5 * w, w, 0 * w]))
+        assert taylor(lambda x: w / x - x / w, 0.5, 1) == pytest.approx(np.array([w / 0.5 - 0.5 / w, -w / 0.25 - 1 / w]))
+        assert taylor(lambda x: w - x ** w + f.logbase(x, w + 1), 0.5, 1) == \
+            pytest.approx(np.array([w - 0.5 ** w + np.log(0.5) / np.log(w + 1), -w * 0.5 ** (w - 1) + 2 / np.log(w + 1)]))
+        assert taylor(lambda x: f.sin(x) * w[:2, None], X, 1) == \
+            pytest.approx(np.array([np.sin(X) * w[:2, None], np.cos(X) * w[:2, None]]))
+
+    def test_high_order(self):
+        """
+        This is the test for orders whose factorials overflow as floats.
+        """
+        k = 400
+        derivatives = taylor(lambda x: 1 / (1 - x), 0.0, k)
+        assert derivatives[170] == pytest.approx(float(math.factorial(170)))
+        assert np.isinf(derivatives[171:]).all()
+        assert taylor(lambda x: f.exp(x / 100), 0.0, k) == pytest.approx([0.01 ** j for j in range(k + 1)])
+        assert not taylor(lambda x: x * x, 1.0, k)[3:].any()
+
+        coefficients = taylor(lambda x: 1 / (1 - x), 0.0, k, coefficients=True)
+        assert coefficients == pytest.approx(np.ones(k + 1))
+        assert taylor(f.sin, 0.0, 5, coefficients=True) == pytest.approx([0, 1, 0, -1 / 6, 0, 1 / 120])
+
+    def test_errors(self):
+        """
+        This is the test for the errors raised by taylor and TaylorNode.
+        """
+        with pytest.raises(ValueError):
+            taylor(lambda x: x[0], [1.0, 2.0], 2)
+        with pytest.raises(ValueError):
+            taylor(f.log, 0.0, 2)
+        with pytest.raises(ZeroDivisionError):
+            taylor(lambda x: 1 / x, 0.0, 2)
+        with pytest.raises(ZeroDivisionError):
+            taylor(lambda x: x / 0, 1.0, 2)
+        with pytest.raises(TypeError):
+            taylor(lambda x: x + 'a', 1.0, 2)
+        with pytest.raises(TypeError):
+            f.sin('a')